@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+"""
+amr.py
+块结构自适应网格加密（两层，Berger–Oliger 子循环），包在 AbsorbingGaugeSolver 外面：
+  * 粗网格按 tile×tile 个粗格划成固定的块；指示量（能量密度或 |∇A|）超过阈值的块及其邻近 buffer 块
+    加密 ratio 倍，所有细块堆成一个批量数组 (n_tiles, F+2, F+2)，F = tile·ratio，步进一次向量化完成；
+  * 时间子循环：粗网格走一步 dt，细块走 ratio 步 dt/ratio；
+    细块幽灵格来自相邻细块（若已加密），否则由粗网格守恒线性插值、并在 A^n 与 A^{n+1} 间按时间线性插值；
+  * 粗细传递是守恒的：
+      - 限制（restriction）：被覆盖的粗格取 r×r 个细格的平均（A 与 V）；
+      - 回流修正（refluxing，Berger–Colella）：粗细界面外侧的粗格改用细网格界面通量的时空平均，
+        使复合网格上的 ΣV·面积在无源、无阻尼区域逐位守恒（见 verify_amr.py）；
+      - 新建细块用守恒线性延拓（r×r 个细格平均回到粗格值）。
+  * 细块只放在 γ=0 的内部区域（离吸收层至少一个粗格），外源条目所在粗格若被加密，该条目均匀注入对应的 r×r 个细格，
+    保持单位时间注入的 ∫V 与粗网格相同。
+用法示例：
+  base = AbsorbingGaugeSolver(96, 96, 9.6, 9.6)
+  amr = AMRGaugeSolver(base, ratio=2, tile=8, threshold=0.05)
+  amr.run(800)
+  Bz = amr.composite("Bz")          # 细分辨率的复合图像（粗区域按 ratio 重复）
+"""
+import numpy as np
+
+import stencils as st
+
+
+class AMRGaugeSolver:
+    """
+    两层块结构 AMR。base 为粗网格上的 AbsorbingGaugeSolver（非批量）；
+    indicator="energy" 按能量密度、"gradient" 按 |∇A|²，threshold 为相对最大值的比例；
+    regrid_every 个粗步重新选一次加密块；refine_source=True 时含外源（base.sources）的块始终加密；
+    reflux=False 可关闭回流修正（仅用于对比守恒性）。
+    """
+
+    def __init__(self, base, ratio=2, tile=8, indicator="energy", threshold=0.05, buffer=1,
+                 regrid_every=4, refine_source=True, reflux=True):
+        if base.batch is not None:
+            raise NotImplementedError("AMR 暂不支持批量系综")
+        if base.Nx % tile or base.Ny % tile:
+            raise ValueError("粗网格尺寸必须是 tile 的整数倍")
+        if base.dx != base.dy:
+            raise NotImplementedError("AMR 暂只支持正方形网格（dx = dy）")
+        if indicator not in ("energy", "gradient"):
+            raise ValueError(f"未知的加密指示量：{indicator!r}（可选 'energy' 或 'gradient'）")
+        self.base = base
+        self.r = ratio
+        self.T = tile
+        self.F = tile * ratio
+        self.indicator = indicator
+        self.threshold = threshold
+        self.buffer = buffer
+        self.regrid_every = max(1, regrid_every)
+        self.refine_source = refine_source
+        self.reflux = reflux
+        self.dx_f = base.dx / ratio
+        self.dt_f = base.dt / ratio
+        self.diag_every = base.diag_every
+        base.diag_every = 0                        # 诊断改由复合网格统一做
+
+        # 可加密的块：块及其外扩一个粗格都在 γ=0 区域，且不贴域边界
+        ntx, nty = base.Nx // tile, base.Ny // tile
+        self.ntiles = (ntx, nty)
+        calm = np.asarray(base.gamma) == 0
+        self.eligible = np.zeros((ntx, nty), dtype=bool)
+        for i in range(ntx):
+            for j in range(nty):
+                i0, j0 = i*tile - 1, j*tile - 1
+                if i0 >= 0 and j0 >= 0 and i0 + tile + 2 <= base.Nx and j0 + tile + 2 <= base.Ny:
+                    self.eligible[i, j] = calm[i0:i0 + tile + 2, j0:j0 + tile + 2].all()
+        # 含外源条目的块（refine_source 时始终加密）
+        self.source_tiles = np.zeros((ntx, nty), dtype=bool)
+        for c in range(2):
+            e = base.sources.entries(c)
+            if e is not None:
+                self.source_tiles[e[0] // tile, e[1] // tile] = True
+
+        self.tiles = np.zeros((0, 2), dtype=int)
+        self.tile_id = -np.ones((ntx, nty), dtype=int)
+        self._A_old = [np.empty_like(base._Px), np.empty_like(base._Py)]
+        self._set_tiles(self._flag_tiles())
+
+    # ===== 状态访问 =====
+    @property
+    def n(self):
+        return self.base.n
+
+    @property
+    def t(self):
+        return self.base.t
+
+    @property
+    def shape(self):
+        return self.base.shape
+
+    @property
+    def Bz_diag(self):
+        return self.base.Bz_diag
+
+    @property
+    def En_diag(self):
+        return self.base.En_diag
+
+    @property
+    def energy_steps(self):
+        return self.base.energy_steps
+
+    @property
+    def energy_all_hist(self):
+        return self.base.energy_all_hist
+
+    @property
+    def energy_inner_hist(self):
+        return self.base.energy_inner_hist
+
+    # ===== 索引工具 =====
+    def _cflat(self, I, J):
+        """粗网格物理格 (I, J) 在带幽灵格数组展平后的下标"""
+        return (I + 1) * (self.base.Ny + 2) + (J + 1)
+
+    def _fflat(self, t, a, b):
+        """细块 t 的带幽灵格下标 (a, b) 展平后的下标"""
+        W = self.F + 2
+        return (t * W + a) * W + b
+
+    def _coarse_stencil(self, gi, gj):
+        """
+        细网格全局下标 (gi, gj) 的守恒线性插值模板：
+        所在粗格 c 及其 x/y 两侧邻居的展平下标与偏移 (ox, oy)，值 = c + ½(xp−xm)·ox + ½(yp−ym)·oy
+        """
+        r = self.r
+        I, J = gi // r, gj // r
+        ox = ((gi % r) + 0.5) / r - 0.5
+        oy = ((gj % r) + 0.5) / r - 0.5
+        return (self._cflat(I, J), self._cflat(I + 1, J), self._cflat(I - 1, J),
+                self._cflat(I, J + 1), self._cflat(I, J - 1), ox, oy)
+
+    @staticmethod
+    def _interp(flat, sten):
+        c, xp, xm, yp, ym, ox, oy = sten
+        return flat[c] + 0.5*(flat[xp] - flat[xm])*ox + 0.5*(flat[yp] - flat[ym])*oy
+
+    # ===== 选块 =====
+    def _flag_tiles(self):
+        b = self.base
+        if self.indicator == "energy":
+            ind = b.energy_density()
+        else:
+            b._fill_ghosts()
+            ind = np.zeros(b.shape)
+            w = np.empty(b.shape)
+            for P in (b._Px, b._Py):
+                for d in (st.ddx, st.ddy):
+                    d(P, w, b.dx, b.periodic); w *= w; ind += w
+        T = self.T
+        ntx, nty = self.ntiles
+        peak = ind.max()
+        cell = ind > self.threshold * peak if peak > 0 else np.zeros(b.shape, dtype=bool)
+        flags = cell.reshape(ntx, T, nty, T).any(axis=(1, 3))
+        for _ in range(self.buffer):                 # 向四邻块外扩
+            grown = flags.copy()
+            grown[1:] |= flags[:-1]; grown[:-1] |= flags[1:]
+            grown[:, 1:] |= flags[:, :-1]; grown[:, :-1] |= flags[:, 1:]
+            flags = grown
+        if self.refine_source:
+            flags |= self.source_tiles
+        return flags & self.eligible
+
+    def _set_tiles(self, flags):
+        """按新的块集合重建细块数据与所有索引表；保留的块直接拷贝旧数据，新块由粗网格延拓"""
+        old_tiles, old_id = self.tiles, self.tile_id
+        old = getattr(self, "fP", None), getattr(self, "fV", None)
+        tiles = np.argwhere(flags)
+        self.tiles = tiles
+        self.tile_id = -np.ones(self.ntiles, dtype=int)
+        self.tile_id[tuple(tiles.T)] = np.arange(len(tiles))
+        n, F, r, T = len(tiles), self.F, self.r, self.T
+        b = self.base
+
+        f = b.dtype
+        self.fP = [np.zeros((n, F + 2, F + 2), dtype=f) for _ in range(2)]
+        self.fV = [np.zeros((n, F, F), dtype=f) for _ in range(2)]
+        self._flap = np.zeros((n, F, F), dtype=f)
+        self._fw = np.zeros((n, F, F), dtype=f)
+        self._avg = np.zeros((n, T, T), dtype=f)
+        self._src = [None, None]
+        if n == 0:
+            self._ghost_fine = self._ghost_coarse = None
+            self._faces = None
+            return
+
+        # ---- 新块：守恒线性延拓；旧块：原样保留 ----
+        t_idx, a_idx, b_idx = np.meshgrid(np.arange(n), np.arange(F), np.arange(F), indexing='ij')
+        gi = tiles[t_idx, 0] * F + a_idx
+        gj = tiles[t_idx, 1] * F + b_idx
+        sten = self._coarse_stencil(gi, gj)
+        for P, V, Pc, Vc in zip(self.fP, self.fV, (b._Px, b._Py), (b.Vx, b.Vy)):
+            P[:, 1:-1, 1:-1] = self._interp(Pc.ravel(), sten)
+            Vc_pad = st.padded(b.shape, f)
+            st.interior(Vc_pad)[...] = Vc
+            V[...] = self._interp(Vc_pad.ravel(), sten)
+        if old[0] is not None:
+            for k, (ti, tj) in enumerate(tiles):
+                j = old_id[ti, tj]
+                if j >= 0:
+                    for c in range(2):
+                        self.fP[c][k] = old[0][c][j]
+                        self.fV[c][k] = old[1][c][j]
+
+        # ---- 幽灵格：来自相邻细块，或来自粗网格插值 ----
+        g_t, g_a, g_b = [], [], []
+        for a in range(1, F + 1):                     # 不需要角点（5 点模板与中心差分都用不到）
+            for aa, bb in ((a, 0), (a, F + 1), (0, a), (F + 1, a)):
+                g_a.append(aa); g_b.append(bb)
+        g_a, g_b = np.array(g_a), np.array(g_b)
+        g_t = np.repeat(np.arange(n), len(g_a))
+        g_a, g_b = np.tile(g_a, n), np.tile(g_b, n)
+        gi = tiles[g_t, 0] * F + g_a - 1
+        gj = tiles[g_t, 1] * F + g_b - 1
+        nb = self.tile_id[gi // F, gj // F]
+        dst = self._fflat(g_t, g_a, g_b)
+        fine = nb >= 0
+        src = self._fflat(nb[fine], gi[fine] - tiles[nb[fine], 0] * F + 1,
+                          gj[fine] - tiles[nb[fine], 1] * F + 1)
+        self._ghost_fine = (dst[fine], src)
+        self._ghost_coarse = (dst[~fine], self._coarse_stencil(gi[~fine], gj[~fine]))
+
+        # ---- 粗细界面：每个粗面记录外侧粗格、内侧粗格及 r 对 (细边格, 细幽灵格) ----
+        outs, ins, edge, ghost = [], [], [], []
+        for k, (ti, tj) in enumerate(tiles):
+            for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                if self.tile_id[ti + di, tj + dj] >= 0:
+                    continue
+                for m in range(T):
+                    if di:
+                        I_in = ti*T + (0 if di < 0 else T - 1)
+                        J_in = tj*T + m
+                        a_e, a_g = (1, 0) if di < 0 else (F, F + 1)
+                        e = [self._fflat(k, a_e, 1 + r*m + q) for q in range(r)]
+                        g = [self._fflat(k, a_g, 1 + r*m + q) for q in range(r)]
+                    else:
+                        I_in = ti*T + m
+                        J_in = tj*T + (0 if dj < 0 else T - 1)
+                        b_e, b_g = (1, 0) if dj < 0 else (F, F + 1)
+                        e = [self._fflat(k, 1 + r*m + q, b_e) for q in range(r)]
+                        g = [self._fflat(k, 1 + r*m + q, b_g) for q in range(r)]
+                    ins.append(self._cflat(I_in, J_in))
+                    outs.append(self._cflat(I_in + di, J_in + dj))
+                    edge.append(e); ghost.append(g)
+        self._faces = (np.array(outs), np.array(ins), np.array(edge), np.array(ghost))
+        self._flux_f = [np.zeros(len(outs)) for _ in range(2)]
+
+        # ---- 被覆盖的粗格与外源 ----
+        I = tiles[:, 0, None, None]*T + np.arange(T)[None, :, None]
+        J = tiles[:, 1, None, None]*T + np.arange(T)[None, None, :]
+        self._covered = (I, J)
+        # 落在细块上的外源条目 → 对应的 r×r 个细格 (块, 行, 列, 权重, 源编号)，每个分量一组
+        self._src = [None, None]
+        p, q = np.divmod(np.arange(r*r), r)
+        for c in range(2):
+            e = b.sources.entries(c)
+            if e is None:
+                continue
+            i, j, w, sid = e
+            k = self.tile_id[i // T, j // T]
+            m = k >= 0
+            if not m.any():
+                continue
+            rep = lambda a: np.repeat(a[m], r*r)
+            self._src[c] = (rep(k), rep(i % T)*r + np.tile(p, m.sum()),
+                            rep(j % T)*r + np.tile(q, m.sum()), rep(w), rep(sid))
+
+    # ===== 步进 =====
+    def _fill_fine_ghosts(self, theta):
+        """细块幽灵格：细块之间直接拷贝；粗细边界取 (1−θ)A^n + θA^{n+1} 的守恒线性插值"""
+        if not len(self.tiles):
+            return
+        (fd, fs), (cd, sten) = self._ghost_fine, self._ghost_coarse
+        for P, Pc, Pold in zip(self.fP, (self.base._Px, self.base._Py), self._A_old):
+            flat = P.reshape(-1)
+            flat[fd] = flat[fs]
+            if len(cd):
+                val = self._interp(Pc.reshape(-1), sten)
+                if theta < 1.0:
+                    val *= theta
+                    val += (1.0 - theta) * self._interp(Pold.reshape(-1), sten)
+                flat[cd] = val
+
+    def _fine_substep(self, k):
+        b, dtf = self.base, self.dt_f
+        self._fill_fine_ghosts(k / self.r)
+        if self.reflux:
+            _, _, edge, ghost = self._faces
+            for P, acc in zip(self.fP, self._flux_f):
+                flat = P.reshape(-1)
+                acc += np.mean(flat[edge] - flat[ghost], axis=1) / self.dx_f
+        for c, (P, V) in enumerate(zip(self.fP, self.fV)):
+            lap = st.laplacian(P, self._flap, self.dx_f, periodic=True)
+            lap *= b.c**2
+            if self._src[c] is not None:
+                K, I, J, w, sid = self._src[c]
+                amps = b.sources.amplitudes((b.n + k / self.r) * b.dt)
+                np.add.at(lap, (K, I, J), w * amps[sid])
+            lap *= dtf
+            V += lap
+            np.multiply(V, dtf, out=self._fw)
+            P[:, 1:-1, 1:-1] += self._fw
+
+    def _restrict(self):
+        """被覆盖的粗格 ← r×r 细格平均（A 与 V）；按 r² 个跨步切片累加，避免整块重排拷贝"""
+        r, acc = self.r, self._avg
+        I, J = self._covered
+        b = self.base
+        for src, dst in ((self.fP[0][:, 1:-1, 1:-1], st.interior(b._Px)),
+                         (self.fP[1][:, 1:-1, 1:-1], st.interior(b._Py)),
+                         (self.fV[0], b.Vx), (self.fV[1], b.Vy)):
+            acc[...] = 0.0
+            for p in range(r):
+                for q in range(r):
+                    acc += src[:, p::r, q::r]
+            acc *= 1.0 / (r*r)
+            dst[I, J] = acc
+
+    def _advance(self):
+        b = self.base
+        if not len(self.tiles):
+            b._advance()
+            return
+        outs, ins, _, _ = self._faces
+        for Pold, Pc in zip(self._A_old, (b._Px, b._Py)):
+            Pold[...] = Pc
+        # 粗网格界面通量（与粗步所用的 A^n 一致）
+        flux_c = [(Pc.reshape(-1)[ins] - Pc.reshape(-1)[outs]) / b.dx for Pc in (b._Px, b._Py)]
+        for acc in self._flux_f:
+            acc[...] = 0.0
+
+        b._advance()
+        for k in range(self.r):
+            self._fine_substep(k)
+        self._restrict()
+
+        if self.reflux:
+            # 外侧粗格：用细通量的时空平均替换粗通量（界面外侧 γ=0，gain = dt）
+            out_int = np.unravel_index(outs, b._Px.shape)
+            rows, cols = out_int[0] - 1, out_int[1] - 1
+            for c, (Pc, Vc) in enumerate(((b._Px, b.Vx), (b._Py, b.Vy))):
+                dV = b.c**2 * b.dt * (self._flux_f[c] / self.r - flux_c[c]) / b.dx
+                np.add.at(Vc, (rows, cols), dV)
+                np.add.at(st.interior(Pc), (rows, cols), b.dt * dV)
+
+    def step(self, n=1):
+        for _ in range(n):
+            self._advance()
+            self.base.n += 1
+            if self.base.n % self.regrid_every == 0:
+                flags = self._flag_tiles()
+                if not np.array_equal(flags, self.tile_id >= 0):
+                    self._set_tiles(flags)
+            if self.diag_every and self.base.n % self.diag_every == 0:
+                self.diagnose()
+        return self
+
+    def run(self, steps, callback=None, every=1):
+        for _ in range(steps):
+            self.step()
+            if callback is not None and self.n % every == 0:
+                callback(self)
+        return self
+
+    # ===== 诊断 =====
+    def _fine_fields(self):
+        """细块上的 (Bz, 𝓔)，形状 (n_tiles, F, F)"""
+        self._fill_fine_ghosts(1.0)
+        Bz = np.empty_like(self._flap)
+        En = np.empty_like(self._flap)
+        Px, Py = self.fP
+        st.Bz_from_A(Px, Py, Bz, self._fw, self.dx_f, periodic=True)
+        st.energy_density(Px, Py, self.fV[0], self.fV[1], En, self._fw, self.dx_f, self.base.c,
+                          periodic=True)
+        return Bz, En
+
+    def composite(self, name="Bz"):
+        """细分辨率的复合图像：粗区域按 ratio 重复，加密块处为细网格的值"""
+        b, r, F = self.base, self.r, self.F
+        coarse = b.Bz() if name == "Bz" else b.energy_density()
+        img = np.repeat(np.repeat(coarse, r, axis=0), r, axis=1)
+        if len(self.tiles):
+            Bz, En = self._fine_fields()
+            fine = Bz if name == "Bz" else En
+            for k, (ti, tj) in enumerate(self.tiles):
+                img[ti*F:(ti + 1)*F, tj*F:(tj + 1)*F] = fine[k]
+        return img
+
+    def conserved_sum(self):
+        """复合网格上的 (ΣVx·面积, ΣVy·面积)：未覆盖粗格 + 细格"""
+        b = self.base
+        uncovered = np.ones(b.shape, dtype=bool)
+        if len(self.tiles):
+            uncovered[self._covered] = False
+        return tuple(np.sum(Vc[uncovered]) * b.dx**2 + np.sum(Vf) * self.dx_f**2
+                     for Vc, Vf in zip((b.Vx, b.Vy), self.fV))
+
+    def diagnose(self):
+        """复合能量：未覆盖粗格 + 细块（细块都在内部区域）；返回 (Bz, En, E_all, E_inner)（粗网格图像）"""
+        b = self.base
+        Bz, En = b.Bz(out=b.Bz_diag), b.energy_density(out=b.En_diag)
+        uncovered = np.ones(b.shape, dtype=bool)
+        if len(self.tiles):
+            uncovered[self._covered] = False
+            _, En_f = self._fine_fields()
+            e_fine = np.sum(En_f, dtype=np.float64) * self.dx_f**2
+        else:
+            e_fine = 0.0
+        dA = b.dx * b.dy
+        inner = np.zeros(b.shape, dtype=bool)
+        inner[b.inner] = True
+        e_all = np.sum(En[uncovered], dtype=np.float64) * dA + e_fine
+        e_inner = np.sum(En[uncovered & inner], dtype=np.float64) * dA + e_fine
+        b.energy_steps.append(b.n)
+        b.energy_all_hist.append(e_all)
+        b.energy_inner_hist.append(e_inner)
+        return Bz, En, e_all, e_inner
+
+    @property
+    def cell_count(self):
+        """实际推进的格点数（粗格 + 细格），用于和均匀细网格比较开销"""
+        return self.base.Nx * self.base.Ny + len(self.tiles) * self.F**2
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+backends.py
+差分核的可替换后端。求解器只通过 backend 对象调用下列核（见 gauge_solver.GaugeSolver 的 backend 参数）：
+  laplacian_rows(P, out, r0, r1, dx, periodic, dy)      5 点拉普拉斯（行条带）
+  damped_update(P_rows, V, lap, damp, gain, dt)          V ← damp·V + gain·lap，A ← A + dt·V（lap 被覆盖）
+  fused_diagnostics(Px, Py, Ex, Ey, Bz, En, tmp, ...)    Bz 与能量密度 + 全域 / 内部能量
+融合后端（fused = True）另外提供整步核，一次遍历完成每个格点的全部更新、不产生中间数组：
+  leapfrog_step(P, P_prev, k, dx, dy)                    A⁻ ← 2A − A⁻ + k∇²A（就地，只读 A）
+  damped_wave_step(P, V, P_out, damp, gain, c2, dt, dx, dy, periodic)
+                                                         V ← damp·V + gain·c²∇²A，A_out ← A + dt·V
+后端：
+  * "numpy"：缺省，即 stencils.py 中的就地 NumPy 核；
+  * "numba"：Numba 编译的融合核（parallel=True，按行并行）；未安装 Numba 时给出警告并自动退回 NumPy；
+  * "auto"：有 Numba 用 Numba，否则 NumPy。
+融合核内逐格点的运算次序与 NumPy 核相同，两者结果在舍入误差以内一致（见 verify_backends.py）。
+"""
+import warnings
+
+import numpy as np
+
+import stencils as st
+
+
+class NumpyBackend:
+    """纯 NumPy 后端：整场向量化表达式，写入调用方预分配的缓冲"""
+    name = "numpy"
+    fused = False
+
+    laplacian_rows = staticmethod(st.laplacian_rows)
+    fused_diagnostics = staticmethod(st.fused_diagnostics)
+
+    @staticmethod
+    def damped_update(P_rows, V, lap, damp, gain, dt):
+        lap *= gain
+        V *= damp
+        V += lap
+        np.multiply(V, dt, out=lap)
+        P_rows += lap
+
+
+def _lead3(a):
+    """把任意前导维度压成一个批量轴 (B, …)（连续数组时是视图）"""
+    return a.reshape(-1, *a.shape[-2:])
+
+
+def _lap_coef(dx, dy, f):
+    """5 点核的系数 (−4, 1/dx², dy²/dx², 1/dy², 是否各向异性)，按场的精度 f 给出（与 stencils.laplacian 一致）"""
+    dy = dx if dy is None else dy
+    return f(-4.0), f(1.0 / (dx*dx)), f((dy*dy) / (dx*dx)), f(1.0 / (dy*dy)), dy != dx
+
+
+def _build_numba_kernels():
+    import numba as nb
+
+    @nb.njit(inline="always")
+    def lap5(P, b, i, j, m4, ix, r, iy, aniso):
+        # P 中 (i+1, j+1) 为中心；运算次序与 stencils.laplacian 相同
+        C = P[b, i + 1, j + 1]
+        if aniso:
+            v = P[b, i + 2, j + 1] + P[b, i, j + 1]
+            v = v - C
+            v = v - C
+            v = v * r
+            v = v + P[b, i + 1, j + 2]
+            v = v + P[b, i + 1, j]
+            v = v - C
+            v = v - C
+            return v * iy
+        v = C * m4
+        v = v + P[b, i + 2, j + 1]
+        v = v + P[b, i, j + 1]
+        v = v + P[b, i + 1, j + 2]
+        v = v + P[b, i + 1, j]
+        return v * ix
+
+    @nb.njit(parallel=True, cache=True)
+    def laplacian(P, out, m4, ix, r, iy, aniso, r0, nx_all, periodic):
+        # P: (B, 行数 + 2, Ny + 2) 的条带（含上下 halo 行），out: (B, 行数, Ny)
+        B, nx, ny = out.shape
+        for k in nb.prange(B * nx):
+            b, i = k // nx, k % nx
+            edge_row = not periodic and (r0 + i == 0 or r0 + i == nx_all - 1)
+            for j in range(ny):
+                if edge_row or (not periodic and (j == 0 or j == ny - 1)):
+                    out[b, i, j] = 0.0
+                else:
+                    out[b, i, j] = lap5(P, b, i, j, m4, ix, r, iy, aniso)
+
+    @nb.njit(parallel=True, cache=True)
+    def leapfrog(P, Q, m4, ix, r, iy, aniso, kk, m1):
+        B, nx, ny = P.shape[0], P.shape[1] - 2, P.shape[2] - 2
+        for k in nb.prange(B * nx):
+            b, i = k // nx, k % nx
+            for j in range(ny):
+                v = lap5(P, b, i, j, m4, ix, r, iy, aniso)
+                v = v * kk
+                a = P[b, i + 1, j + 1]
+                q = Q[b, i + 1, j + 1] * m1
+                q = q + a
+                q = q + a
+                Q[b, i + 1, j + 1] = q + v
+
+    @nb.njit(parallel=True, cache=True)
+    def damped_wave(P, V, Pout, damp, gain, m4, ix, r, iy, aniso, c2, dt, periodic):
+        B, nx, ny = V.shape
+        for k in nb.prange(B * nx):
+            b, i = k // nx, k % nx
+            edge_row = not periodic and (i == 0 or i == nx - 1)
+            for j in range(ny):
+                if edge_row or (not periodic and (j == 0 or j == ny - 1)):
+                    v = m4 - m4                      # 同精度的 0（字面量 0.0 会把整条链提升为 float64）
+                else:
+                    v = lap5(P, b, i, j, m4, ix, r, iy, aniso)
+                v = v * c2
+                v = v * gain[i, j]
+                w = V[b, i, j] * damp[i, j] + v
+                V[b, i, j] = w
+                Pout[b, i + 1, j + 1] = P[b, i + 1, j + 1] + w * dt
+
+    @nb.njit(parallel=True, cache=True)
+    def bz_energy(Px, Py, Ex, Ey, Bz, En, hx, hy, c2, half, periodic):
+        # hx = 0.5/dx，hy = 0.5/dy；非周期时最外一圈的法向差分取 0（与 stencils.ddx / ddy 一致）
+        B, nx, ny = Bz.shape
+        for k in nb.prange(B * nx):
+            b, i = k // nx, k % nx
+            xin = periodic or (i != 0 and i != nx - 1)
+            for j in range(ny):
+                yin = periodic or (j != 0 and j != ny - 1)
+                zero = hx - hx
+                dxAy = (Py[b, i + 2, j + 1] - Py[b, i, j + 1]) * hx if xin else zero
+                dxAx = (Px[b, i + 2, j + 1] - Px[b, i, j + 1]) * hx if xin else zero
+                dyAx = (Px[b, i + 1, j + 2] - Px[b, i + 1, j]) * hy if yin else zero
+                dyAy = (Py[b, i + 1, j + 2] - Py[b, i + 1, j]) * hy if yin else zero
+                Bz[b, i, j] = dxAy - dyAx
+                e = dxAy * dxAy
+                e = e + dyAx * dyAx
+                e = e + dxAx * dxAx
+                e = e + dyAy * dyAy
+                e = e * c2
+                e = e + Ex[b, i, j] * Ex[b, i, j]
+                e = e + Ey[b, i, j] * Ey[b, i, j]
+                En[b, i, j] = e * half
+
+    return laplacian, leapfrog, damped_wave, bz_energy
+
+
+class NumbaBackend(NumpyBackend):
+    """
+    Numba 融合后端：每个核一次遍历、按 (批量 × 行) 并行；所有标量先转成场的存储精度再传入，
+    使 float32 场的运算与 NumPy 一样停留在 float32。
+    """
+    name = "numba"
+    fused = True
+
+    def __init__(self):
+        self._lap, self._leap, self._damped, self._diag = _build_numba_kernels()
+
+    def laplacian_rows(self, P, out, r0, r1, dx, periodic=True, dy=None):
+        Nx = P.shape[-2] - 2
+        self._lap(_lead3(P[..., r0:r1 + 2, :]), _lead3(out), *_lap_coef(dx, dy, P.dtype.type),
+                  r0, Nx, periodic)
+        return out
+
+    def leapfrog_step(self, P, P_prev, k, dx, dy=None):
+        f = P.dtype.type
+        self._leap(_lead3(P), _lead3(P_prev), *_lap_coef(dx, dy, f), f(k), f(-1.0))
+
+    def damped_wave_step(self, P, V, P_out, damp, gain, c2, dt, dx, dy=None, periodic=False):
+        f = P.dtype.type
+        self._damped(_lead3(P), _lead3(V), _lead3(P_out), damp, gain, *_lap_coef(dx, dy, f), f(c2),
+                     f(dt), periodic)
+
+    def fused_diagnostics(self, Px, Py, Ex, Ey, Bz, En, tmp, dx, c=1.0, periodic=True, inner=None,
+                          dtype=None, dy=None):
+        f = Px.dtype.type
+        dy = dx if dy is None else dy
+        self._diag(_lead3(Px), _lead3(Py), _lead3(Ex), _lead3(Ey), _lead3(Bz), _lead3(En),
+                   f(0.5 / dx), f(0.5 / dy), f(c*c), f(0.5), periodic)
+        total = np.sum(En, axis=(-2, -1), dtype=dtype)
+        inner_sum = total if inner is None else np.sum(En[(Ellipsis, *inner)], axis=(-2, -1), dtype=dtype)
+        return Bz, En, total, inner_sum
+
+
+def numba_available():
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+_CACHE = {}
+
+
+def get_backend(name="numpy"):
+    """按名字（"numpy" / "numba" / "auto"）或直接传入的后端对象返回后端；同名后端只构造一次"""
+    if not isinstance(name, str):
+        return name
+    if name not in ("numpy", "numba", "auto"):
+        raise ValueError(f"未知的后端：{name!r}（可选 'numpy'、'numba'、'auto'）")
+    if name == "numba" and not numba_available():
+        warnings.warn("未安装 Numba，退回 NumPy 后端", RuntimeWarning, stacklevel=2)
+        name = "numpy"
+    if name == "auto":
+        name = "numba" if numba_available() else "numpy"
+    if name not in _CACHE:
+        _CACHE[name] = NumbaBackend() if name == "numba" else NumpyBackend()
+    return _CACHE[name]
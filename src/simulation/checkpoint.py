@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+checkpoint.py
+长时间规范场运行的检查点 / 续算。
+  * save_checkpoint：把 solver.state_dict()（场、速度或上一层场、步数、RNG 状态、能量历史）
+    写入 .npz；先写临时文件、fsync 后 os.replace，进程在任何时刻被杀都不会留下半个检查点；
+  * load_checkpoint：把检查点载入一个按相同参数新建的求解器，之后的步进与不中断运行逐位一致；
+  * Checkpointer：作为 solver.run 的回调，每 every 步自动存一次；before 中的函数在每次保存前调用
+    （例如 SnapshotWriter.flush：检查点之前的帧须先落盘，否则续算时会被截掉）。
+用法示例：
+  ckpt = Checkpointer("run.ckpt.npz", every=1000)
+  solver.run(100000, callback=ckpt, every=ckpt.every)
+  # 被抢占后：
+  load_checkpoint("run.ckpt.npz", solver)       # solver 按原参数重新构造
+  solver.run(100000 - solver.n)
+"""
+import json
+import os
+
+import numpy as np
+
+
+def save_checkpoint(path, solver):
+    """原子地写入检查点，返回路径"""
+    state = solver.state_dict()
+    state["rng_state"] = np.array(json.dumps(state["rng_state"]))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **state)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def load_checkpoint(path, solver):
+    """把检查点载入 solver（需按原参数构造），返回 solver"""
+    with np.load(path, allow_pickle=False) as data:
+        state = {k: data[k] for k in data.files}
+    state["kind"] = str(state["kind"])
+    state["rng_state"] = json.loads(str(state["rng_state"]))
+    return solver.load_state_dict(state)
+
+
+class Checkpointer:
+    """solver.run 的回调：每次调用先依次调用 before 中的函数，再保存一次检查点"""
+
+    def __init__(self, path, every=1000, before=()):
+        self.path = path
+        self.every = max(1, every)
+        self.before = list(before)
+
+    def __call__(self, solver):
+        for fn in self.before:
+            fn()
+        save_checkpoint(self.path, solver)
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+domain_decomp.py
+多进程区域分解：把 gauge_solver 中的场沿 x 方向切成若干条带，分给进程池中的 worker 并行步进。
+  * 场（含幽灵格）放在 multiprocessing.shared_memory 中，所有进程看到同一块内存；
+  * 每个 worker 只写自己的行，相邻条带边界的一行（halo）直接从共享内存读取，
+    各阶段之间用 Barrier 同步，保证读到的是同一时间层的值；
+  * 逐格的运算次序与串行版本完全相同，因此周期边界（Leapfrog）与海绵层边界（Absorbing）
+    的结果与串行逐位一致；
+  * solver.diag_every > 0 时每 diag_every 步把状态拷回串行求解器做一次 diagnose()，能量历史与串行一致；
+  * 任一 worker 抛出异常或意外退出时，父进程 abort 屏障（其余 worker 随之退出）、关闭进程池并抛出 RuntimeError。
+用法示例：
+  solver = AbsorbingGaugeSolver(4096, 4096, 409.6, 409.6)
+  with DecomposedGaugeSolver(solver, workers=8) as dd:
+      dd.run(1000)
+  solver.diagnose()             # 退出 with 时自动 gather()，状态已拷回串行求解器
+"""
+import os
+import threading
+import traceback
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+
+import stencils as st
+from gauge_solver import LeapfrogGaugeSolver, AbsorbingGaugeSolver
+
+
+def _attach(spec):
+    """按 (name, shape, dtype) 连接共享内存并返回 (shm, ndarray 视图)"""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _fill_strip_ghosts(P, r0, r1, Nx, periodic):
+    """刷新本条带需要的幽灵格：本行的左右两列；首/末条带再负责上/下幽灵行"""
+    if not periodic:
+        return                                   # 非周期：幽灵格恒为 0，边界结果另行清零
+    rows = slice(r0 + 1, r1 + 1)
+    P[..., rows, 0] = P[..., rows, -2]
+    P[..., rows, -1] = P[..., rows, 1]
+    if r0 == 0:
+        P[..., 0, 1:-1] = P[..., -2, 1:-1]
+    if r1 == Nx:
+        P[..., -1, 1:-1] = P[..., 1, 1:-1]
+
+
+def _worker(kind, specs, params, r0, r1, barrier, conn):
+    shms, arrs = [], []
+    for spec in specs:
+        shm, a = _attach(spec)
+        shms.append(shm); arrs.append(a)
+    Nx, dx, dy, dt, c, periodic = (params[k] for k in ("Nx", "dx", "dy", "dt", "c", "periodic"))
+    lead = arrs[0].shape[:-2]
+    rows = slice(r0 + 1, r1 + 1)
+    lap_x = np.zeros((*lead, r1 - r0, arrs[0].shape[-1] - 2), dtype=arrs[0].dtype)
+    lap_y = np.zeros_like(lap_x)
+
+    if kind == "absorbing":
+        Px, Py, Vx, Vy = arrs
+        damp = params["damp"][r0:r1]
+        gain = params["gain"][r0:r1]
+        sources = params["sources"].restrict_rows(r0, r1)   # 只留本条带内的外源条目
+    else:
+        bufs = arrs                              # [Px, Py, Px_prev, Py_prev]，按步数奇偶轮换
+
+    try:
+        while True:
+            cmd, n0, nsteps = conn.recv()
+            if cmd == "stop":
+                break
+            for n in range(n0, n0 + nsteps):
+                if kind == "absorbing":
+                    # 阶段 1：读取本条带及 halo，算拉普拉斯
+                    for P, lap in ((Px, lap_x), (Py, lap_y)):
+                        _fill_strip_ghosts(P, r0, r1, Nx, periodic)
+                        st.laplacian_rows(P, lap, r0, r1, dx, periodic, dy)
+                        lap *= c*c
+                    sources.inject(lap_x, lap_y, n * dt)
+                    barrier.wait()               # 所有人读完 A 后才能写 A
+                    # 阶段 2：只写本条带
+                    for P, V, lap in ((Px, Vx, lap_x), (Py, Vy, lap_y)):
+                        Vs = V[..., r0:r1, :]
+                        lap *= gain
+                        Vs *= damp
+                        Vs += lap
+                        np.multiply(Vs, dt, out=lap)
+                        P[..., rows, 1:-1] += lap
+                    barrier.wait()
+                else:
+                    # leapfrog：新值写入 A⁻ 缓冲，邻居只读 A，一步只需一次同步
+                    k = (c*dt)**2
+                    if n % 2 == 0:
+                        Px, Py, Qx, Qy = bufs
+                    else:
+                        Qx, Qy, Px, Py = bufs
+                    for P, Q, lap in ((Px, Qx, lap_x), (Py, Qy, lap_y)):
+                        _fill_strip_ghosts(P, r0, r1, Nx, periodic)
+                        st.laplacian_rows(P, lap, r0, r1, dx, periodic, dy)
+                        lap *= k
+                        A_prev = Q[..., rows, 1:-1]
+                        A = P[..., rows, 1:-1]
+                        A_prev *= -1.0
+                        A_prev += A
+                        A_prev += A
+                        A_prev += lap
+                    barrier.wait()
+            conn.send(("done", None))
+    except threading.BrokenBarrierError:
+        # 别的 worker（或父进程）已经 abort 了屏障：只报告被放走，真正的错误由出错方回报
+        try:
+            conn.send(("aborted", None))
+        except OSError:
+            pass
+    except Exception:
+        # 先 abort 屏障放走其余 worker，再把异常回报给父进程
+        barrier.abort()
+        try:
+            conn.send(("error", traceback.format_exc()))
+        except OSError:
+            pass
+    finally:
+        del arrs
+        for shm in shms:
+            shm.close()
+        conn.close()
+
+
+class DecomposedGaugeSolver:
+    """
+    把一个 LeapfrogGaugeSolver / AbsorbingGaugeSolver 的状态放入共享内存，
+    用 workers 个进程按 x 条带并行推进。step()/run() 与串行求解器接口一致，
+    gather() 把结果拷回原求解器（含步数），以便继续串行运行或做诊断。
+    """
+
+    def __init__(self, solver, workers=None, start_method=None):
+        if isinstance(solver, AbsorbingGaugeSolver):
+            if solver.boundary != "sponge":
+                raise NotImplementedError("区域分解目前只支持海绵层边界")
+            self.kind = "absorbing"
+            fields = [solver._Px, solver._Py, solver.Vx, solver.Vy]
+        elif isinstance(solver, LeapfrogGaugeSolver):
+            self.kind = "leapfrog"
+            # 共享缓冲按 “偶数步时的角色” 排列：[A, A, A⁻, A⁻]
+            fields = [solver._Px, solver._Py, solver._Px_prev, solver._Py_prev]
+        else:
+            raise TypeError("仅支持 LeapfrogGaugeSolver 与 AbsorbingGaugeSolver")
+
+        self.solver = solver
+        self.n = solver.n
+        self._n_base = solver.n
+        workers = workers or os.cpu_count() or 1
+        self.strips = st.split_rows(solver.Nx, workers)
+
+        # ---- 共享内存 ----
+        self._shms, self._arrays, specs = [], [], []
+        for a in fields:
+            shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+            view = np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)
+            view[...] = a
+            self._shms.append(shm); self._arrays.append(view)
+            specs.append((shm.name, a.shape, a.dtype.str))
+
+        params = dict(Nx=solver.Nx, dx=solver.dx, dy=solver.dy, dt=solver.dt, c=solver.c,
+                      periodic=solver.periodic)
+        if self.kind == "absorbing":
+            params.update(damp=solver._damp, gain=solver._gain, sources=solver.sources)
+
+        # ---- 进程池 ----
+        ctx = mp.get_context(start_method)
+        self._barrier = barrier = ctx.Barrier(len(self.strips))
+        self._conns, self._procs = [], []
+        for r0, r1 in self.strips:
+            parent, child = ctx.Pipe()
+            p = ctx.Process(target=_worker, daemon=True,
+                            args=(self.kind, specs, params, r0, r1, barrier, child))
+            p.start()
+            child.close()
+            self._conns.append(parent); self._procs.append(p)
+
+    # ===== 步进 =====
+    POLL = 0.5                                   # 等待 worker 时检查其存活的间隔（秒）
+
+    def _advance(self, n):
+        # leapfrog 的缓冲奇偶以创建时为基准
+        n_local = self.n - self._n_base
+        for conn, p in zip(self._conns, self._procs):
+            try:
+                conn.send(("step", n_local if self.kind == "leapfrog" else self.n, n))
+            except OSError:
+                self._fail(f"worker 进程 {p.pid} 意外退出（exitcode={p.exitcode}）")
+        waiting = dict(zip(self._conns, self._procs))
+        aborted = False
+        while waiting:
+            ready = wait(list(waiting), timeout=self.POLL)
+            for conn in ready:
+                try:
+                    status, info = conn.recv()
+                except (EOFError, OSError):
+                    p = waiting[conn]
+                    p.join(self.POLL)
+                    status, info = "error", f"worker 进程 {p.pid} 意外退出（exitcode={p.exitcode}）"
+                if status == "error":
+                    self._fail(info)
+                aborted |= status == "aborted"   # 被放走的 worker：真正的错误由出错方回报
+                del waiting[conn]
+            # 已退出但管道里没有回报的 worker（被杀等）；有回报的留到下一轮读取
+            dead = [p for c, p in waiting.items() if not p.is_alive() and not c.poll()]
+            if dead:
+                self._fail(f"worker 进程 {dead[0].pid} 意外退出（exitcode={dead[0].exitcode}）")
+        if aborted:
+            self._fail("屏障被中止")
+        self.n += n
+
+    def _fail(self, info):
+        """某个 worker 出错：放走卡在屏障上的其余 worker，关闭进程池并抛出异常"""
+        try:
+            self._barrier.abort()
+        except (OSError, threading.BrokenBarrierError):
+            pass
+        self.close()
+        raise RuntimeError(f"区域分解的 worker 出错，求解器已关闭：\n{info}")
+
+    def step(self, n=1):
+        """推进 n 步；diag_every > 0 时在诊断步处拷回状态并 diagnose()（与串行 step 相同的节奏）"""
+        if not self._shms:
+            raise RuntimeError("区域分解求解器已关闭")
+        every = self.solver.diag_every
+        end = self.n + n
+        while self.n < end:
+            m = end - self.n if not every else min(end - self.n, every - self.n % every)
+            self._advance(m)
+            if every and self.n % every == 0:
+                self.gather().diagnose()
+        return self
+
+    def run(self, steps):
+        return self.step(steps)
+
+    def gather(self):
+        """把共享内存中的状态拷回原求解器并返回它"""
+        s = self.solver
+        if self.kind == "absorbing":
+            for dst, src in zip((s._Px, s._Py, s.Vx, s.Vy), self._arrays):
+                dst[...] = src
+        else:
+            Px, Py, Qx, Qy = self._arrays
+            if (self.n - self._n_base) % 2:
+                Px, Py, Qx, Qy = Qx, Qy, Px, Py
+            for dst, src in zip((s._Px, s._Py, s._Px_prev, s._Py_prev), (Px, Py, Qx, Qy)):
+                dst[...] = src
+        s.n = self.n
+        return s
+
+    # ===== 资源回收 =====
+    def close(self):
+        for conn in self._conns:
+            try:
+                conn.send(("stop", 0, 0))
+            except (BrokenPipeError, OSError):
+                pass
+        for p in self._procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+                p.join()
+        for conn in self._conns:
+            conn.close()
+        self._arrays = []
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._shms, self._conns, self._procs = [], [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._shms:
+            self.gather()
+        self.close()
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+frame_encoder.py
+绕过 matplotlib 的场视频编码：每个面板的标量场经 256 项颜色查找表（LUT）一次向量化索引变成 RGB，
+np.repeat 放大到像素尺寸，多个面板左右拼接，可选顶部文字条；成帧后
+  * .mp4：原始 rgb24 帧直接写进 ffmpeg 的 stdin（libx264，yuv420p）；
+  * .gif：所有面板共用一张 256 色调色板（0 黑、1 白、其余按面板均分），帧以调色板索引写出，
+          Pillow 不必逐帧量化。
+每帧只有 O(像素数) 的查表与拷贝，没有画布布局、坐标轴与抗锯齿，纯场视频比 FuncAnimation 录制快一个数量级以上
+（见 verify_encoder.py）。画面方向与 imshow(origin="lower") 一致：数组第 0 行在最下方。
+用法示例：
+  enc = LUTFrameEncoder((96, 96), panels=(("RdBu", -1, 1), ("magma", 0, 2)), scale=4)
+  with open_recorder("out.mp4", enc, fps=30) as rec:
+      for _ in range(600):
+          solver.step()
+          Bz, En, E, _ = solver.diagnose()
+          rec.write((Bz, En), text=f"step {solver.n}  E={E:.4e}")
+"""
+import os
+import shutil
+import subprocess
+
+import numpy as np
+
+_BG, _FG = 0, 1                          # GIF 调色板中背景（黑）与文字（白）的索引
+
+
+def colormap_lut(cmap, n=256):
+    """matplotlib 颜色映射 → (n, 3) uint8 查找表"""
+    import matplotlib
+    cm = matplotlib.colormaps[cmap] if isinstance(cmap, str) else cmap
+    return np.round(cm(np.linspace(0.0, 1.0, n))[:, :3] * 255).astype(np.uint8)
+
+
+def _load_font(size):
+    from PIL import ImageFont
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:                                # Pillow < 10.1 只有固定大小的位图字体
+        return ImageFont.load_default()
+
+
+class LUTFrameEncoder:
+    """
+    shape 为每个场的数组形状 (Nx, Ny)；panels 为每个面板的 (cmap, vmin, vmax)；
+    scale 为放大倍数（每个格点 scale×scale 像素），gap 为面板间距（像素），
+    text_height > 0 时在顶部留出文字条。
+    """
+
+    def __init__(self, shape, panels=(("RdBu", -1.0, 1.0), ("magma", 0.0, 2.0)), scale=4, gap=4,
+                 text_height=20):
+        self.shape = tuple(shape)
+        self.panels = [(cmap, float(lo), float(hi)) for cmap, lo, hi in panels]
+        self.scale = scale
+        self.gap = gap
+        self.text_height = text_height
+        Nx, Ny = self.shape
+        k = len(self.panels)
+        # 图像高 = Nx·scale（+ 文字条），宽 = k·Ny·scale + 间距
+        self.height = Nx*scale + text_height
+        self.width = k*Ny*scale + (k - 1)*gap
+        self.luts = [colormap_lut(cmap) for cmap, _, _ in self.panels]
+        self._x0 = [i*(Ny*scale + gap) for i in range(k)]
+        # GIF 调色板：0 黑、1 白，之后每个面板 levels 级
+        self.levels = (256 - 2) // k
+        pal = np.zeros((256, 3), dtype=np.uint8)
+        pal[_FG] = 255
+        for i, (cmap, _, _) in enumerate(self.panels):
+            o = 2 + i*self.levels
+            pal[o:o + self.levels] = colormap_lut(cmap, self.levels)
+        self.palette = pal
+        # 工作缓冲
+        self._t = np.empty(self.shape, dtype=np.float32)
+        self._idx = np.empty(self.shape, dtype=np.uint8)
+        self._rgb = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self._pix = np.zeros((self.height, self.width), dtype=np.uint8)
+        self._font = _load_font(max(8, text_height - 6)) if text_height else None
+        self._text_cache = (None, None)
+
+    # ===== 查表 =====
+    def indices(self, field, i, levels=256):
+        """场 → [0, levels) 的 uint8 索引（线性映射 [vmin, vmax]，两端截断）"""
+        _, lo, hi = self.panels[i]
+        t = self._t
+        np.subtract(field, lo, out=t, casting="unsafe")
+        t *= levels / (hi - lo)
+        np.clip(t, 0, levels - 1, out=t)
+        np.copyto(self._idx, t, casting="unsafe")        # 截尾取整
+        return self._idx
+
+    def _upscale_into(self, dst, src):
+        """np.repeat 两个轴放大 scale 倍，并上下翻转（origin="lower"）后写入 dst"""
+        s = self.scale
+        dst[...] = np.repeat(np.repeat(src[::-1], s, axis=0), s, axis=1)
+
+    def _text_mask(self, text):
+        """文字条的布尔掩码；同样的文字只渲染一次"""
+        if self._text_cache[0] == text:
+            return self._text_cache[1]
+        from PIL import Image, ImageDraw
+        band = Image.new("L", (self.width, self.text_height), 0)
+        ImageDraw.Draw(band).text((4, 2), text, fill=255, font=self._font)
+        mask = np.asarray(band) > 127
+        self._text_cache = (text, mask)
+        return mask
+
+    def rgb(self, fields, text=None):
+        """各面板场 → (height, width, 3) uint8 帧（返回内部缓冲，下一帧会覆盖）"""
+        s, th, Ny = self.scale, self.text_height, self.shape[1]
+        frame = self._rgb
+        for i, (f, lut, x0) in enumerate(zip(fields, self.luts, self._x0)):
+            self._upscale_into(frame[th:, x0:x0 + Ny*s], lut[self.indices(f, i)])
+        if th:
+            frame[:th] = 0
+            if text:
+                frame[:th][self._text_mask(text)] = 255
+        return frame
+
+    def indexed(self, fields, text=None):
+        """各面板场 → (height, width) 调色板索引帧（配合 self.palette，GIF 用）"""
+        s, th, Ny = self.scale, self.text_height, self.shape[1]
+        pix = self._pix
+        for i, (f, x0) in enumerate(zip(fields, self._x0)):
+            idx = self.indices(f, i, self.levels)
+            idx += 2 + i*self.levels
+            self._upscale_into(pix[th:, x0:x0 + Ny*s], idx)
+        if th:
+            pix[:th] = _BG
+            if text:
+                pix[:th][self._text_mask(text)] = _FG
+        return pix
+
+
+class RGBFrames:
+    """
+    已经渲染好的 (height, width, 3) uint8 帧（如 matplotlib Agg 画布，见 parity.render_frames）套上编码器接口，
+    交给下面的录制器写出：rgb 原样返回；没有固定调色板，GIF 逐帧由 Pillow 自适应量化。
+    """
+    palette = None
+
+    def __init__(self, width, height):
+        self.width, self.height = int(width), int(height)
+
+    def rgb(self, frame, text=None):
+        return frame
+
+
+# ===== 写出 =====
+class FFmpegRecorder:
+    """把 rgb24 原始帧写进 ffmpeg 的 stdin（libx264 + yuv420p，宽高按需补成偶数）"""
+
+    def __init__(self, path, encoder, fps=30, bitrate=1800, codec="libx264"):
+        exe = shutil.which("ffmpeg")
+        if exe is None:
+            raise RuntimeError("保存 .mp4 需要已安装 ffmpeg。")
+        self.encoder = encoder
+        self.path = path
+        self.frames = 0
+        W, H = encoder.width, encoder.height
+        cmd = [exe, "-y", "-loglevel", "error",
+               "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{W}x{H}", "-r", str(fps), "-i", "-",
+               "-an", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+               "-c:v", codec, "-pix_fmt", "yuv420p", "-b:v", f"{bitrate}k", path]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, fields, text=None):
+        self._proc.stdin.write(self.encoder.rgb(fields, text).tobytes())
+        self.frames += 1
+
+    def close(self):
+        if self._proc is None:
+            return
+        self._proc.stdin.close()
+        code = self._proc.wait()
+        self._proc = None
+        if code != 0:
+            raise RuntimeError(f"ffmpeg 退出码 {code}，{self.path} 可能不完整")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GifRecorder:
+    """调色板索引帧交给 Pillow 一次性写出 GIF（GIF 不支持追加写，帧先留在内存里，每帧 1 字节/像素）"""
+
+    def __init__(self, path, encoder, fps=15):
+        self.encoder = encoder
+        self.path = path
+        self.duration = int(round(1000 / fps))
+        self._frames = []
+        self.frames = 0
+
+    def write(self, fields, text=None):
+        from PIL import Image
+        if self.encoder.palette is None:
+            img = Image.fromarray(np.ascontiguousarray(self.encoder.rgb(fields, text))).quantize()
+        else:
+            img = Image.fromarray(self.encoder.indexed(fields, text).copy())    # 缓冲逐帧复用，须拷贝
+            img.putpalette(self.encoder.palette.ravel().tolist())     # L → P，直接用索引
+        self._frames.append(img)
+        self.frames += 1
+
+    def close(self):
+        if not self._frames:
+            return
+        first, *rest = self._frames
+        first.save(self.path, save_all=True, append_images=rest, duration=self.duration,
+                   loop=0, optimize=False)
+        self._frames = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_recorder(path, encoder, fps=30, bitrate=1800):
+    """按扩展名选择 FFmpegRecorder（.mp4）或 GifRecorder（.gif）"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".mp4":
+        return FFmpegRecorder(path, encoder, fps=fps, bitrate=bitrate)
+    if ext == ".gif":
+        return GifRecorder(path, encoder, fps=fps)
+    raise ValueError("不支持的扩展名：请用 .mp4 或 .gif")
@@ -1,9 +1,19 @@
 # -*- coding: utf-8 -*-
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from matplotlib import font_manager as fm, rcParams
 
+import stencils as st
+from gauge_solver import LeapfrogGaugeSolver
+from highorder_solver import HighOrderGaugeSolver, INTEGRATORS
+from spectral_solver import SpectralGaugeSolver
+from frame_encoder import LUTFrameEncoder, open_recorder
+
+ENGINES = {"fd": LeapfrogGaugeSolver, "highorder": HighOrderGaugeSolver,
+           "spectral": SpectralGaugeSolver}
+
 # ========== 样式 & 字体 ==========
 # plt.style.use("dark_background")
 def set_cn():
@@ -21,82 +31,64 @@ set_cn()
 FRAMES = 150     # 总帧数
 FPS = 15
 
-def simulate_gauge_2d():
+def simulate_gauge_2d(engine="fd", N=64, dtype=np.float64, record="gauge2d.gif", fast=False,
+                      Ny=None, Ly=6.4, **engine_kw):
     # ---- 网格与时间步 ----
-    Nx, Ny = 64, 64
-    Lx, Ly = 6.4, 6.4          # 物理尺寸（任意单位）
+    # 高阶差分与伪谱引擎的数值色散小得多，同样的波形用更粗的网格（如 --N 32）即可分辨
+    # Ny / Ly 可与 x 方向不同（长条形区域、dx ≠ dy 的各向异性网格）
+    Nx, Ny = N, N if Ny is None else Ny
+    Lx = 6.4                   # 物理尺寸（任意单位）
     dx, dy = Lx/Nx, Ly/Ny
     c = 1.0                    # 光速（单位化）
-    dt = 0.65 * dx / (c*np.sqrt(2))  # 满足 CFL 稳定约束
+    dt = st.cfl_dt(0.65, c, dx, dy)  # 满足 CFL 稳定约束：c·dt·√(1/dx² + 1/dy²) = 0.65
 
-    # ---- 场变量 ----
-    Ax = np.zeros((Nx, Ny))
-    Ay = np.zeros((Nx, Ny))
-    Ax_prev = Ax.copy()
-    Ay_prev = Ay.copy()
+    if engine == "highorder":
+        dt = None                  # 高阶格式按各自的 CFL 上限取 dt（见 solver.cfl_limit）
+    solver = ENGINES[engine](Nx, Ny, dx, dy, dt=dt, c=c, dtype=dtype, **engine_kw)
 
     # ---- 初始激发：高斯包络 + 少量噪声 ----
-    x = (np.arange(Nx) - Nx/2) * dx
-    y = (np.arange(Ny) - Ny/2) * dy
-    X, Y = np.meshgrid(x, y, indexing='ij')
+    X, Y = solver.X, solver.Y
     r2 = X**2 + Y**2
     sigma2 = (0.6**2)
-    Ax[:] = np.exp(-r2/(2*sigma2)) * np.cos(3*X) + 0.02*np.random.randn(Nx, Ny)
-    Ay[:] = np.exp(-r2/(2*sigma2)) * np.sin(3*Y) + 0.02*np.random.randn(Nx, Ny)
-    Ax_prev[:] = Ax
-    Ay_prev[:] = Ay
-
-    # ---- 工具：二维拉普拉斯（周期边界） ----
-    def laplacian(Z):
-        return (
-            np.roll(Z,  1, axis=0) + np.roll(Z, -1, axis=0) +
-            np.roll(Z,  1, axis=1) + np.roll(Z, -1, axis=1) - 4*Z
-        ) / (dx*dx)  # 这里假设 dx=dy；若不同可分开写
-
-    # ---- 物理量：Bz、能量密度 ----
-    def Bz_from_A(Ax, Ay):
-        dAy_dx = (np.roll(Ay, -1, axis=0) - np.roll(Ay, 1, axis=0)) / (2*dx)
-        dAx_dy = (np.roll(Ax, -1, axis=1) - np.roll(Ax, 1, axis=1)) / (2*dx)
-        return dAy_dx - dAx_dy
-
-    def energy_density(Ax, Ay, Ax_prev, Ay_prev):
-        Ex = -(Ax - Ax_prev)/dt
-        Ey = -(Ay - Ay_prev)/dt
-        dAx_dx = (np.roll(Ax, -1, 0) - np.roll(Ax, 1, 0))/(2*dx)
-        dAx_dy = (np.roll(Ax, -1, 1) - np.roll(Ax, 1, 1))/(2*dx)
-        dAy_dx = (np.roll(Ay, -1, 0) - np.roll(Ay, 1, 0))/(2*dx)
-        dAy_dy = (np.roll(Ay, -1, 1) - np.roll(Ay, 1, 1))/(2*dx)
-        grad2 = dAx_dx**2 + dAx_dy**2 + dAy_dx**2 + dAy_dy**2
-        return 0.5*(Ex**2 + Ey**2 + (c**2)*grad2)
+    noise = solver.rng.standard_normal
+    solver.set_initial(np.exp(-r2/(2*sigma2)) * np.cos(3*X) + 0.02*noise((Nx, Ny)),
+                       np.exp(-r2/(2*sigma2)) * np.sin(3*Y) + 0.02*noise((Nx, Ny)))
+
+    if fast:
+        # ---- 快速录制：颜色查找表直接成帧，不经 matplotlib（见 frame_encoder.py） ----
+        enc = LUTFrameEncoder(solver.shape, panels=(("RdBu", -1.0, 1.0), ("RdBu", 0.0, 1.0)),
+                              scale=max(1, 384 // max(Nx, Ny)))
+        with open_recorder(record, enc, fps=FPS) as rec:
+            for _ in range(FRAMES):
+                solver.step()
+                Bz, En, E, _ = solver.diagnose()
+                rec.write((Bz, En), text=f"{engine}  step {solver.n}  E={E:.4e}")
+        print(f"{FRAMES} 帧已写入 {record}")
+        return
 
     # ---- 动画绘制 ----
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
-    im1 = ax1.imshow(Bz_from_A(Ax, Ay), cmap="RdBu", origin="lower",
+    im1 = ax1.imshow(solver.Bz(), cmap="RdBu", origin="lower",
                      vmin=-1.0, vmax=1.0, interpolation="nearest")
     ax1.set_title("Bz = ∂xAy − ∂yAx")
-    im2 = ax2.imshow(energy_density(Ax, Ay, Ax_prev, Ay_prev),
+    im2 = ax2.imshow(solver.energy_density(),
                      cmap="RdBu", origin="lower",
                      vmin=0.0, vmax=1.0, interpolation="nearest")
     ax2.set_title(r"能量密度 $\mathcal{E}$")
     plt.tight_layout()
 
     def animate(_frame):
-        nonlocal Ax, Ay, Ax_prev, Ay_prev
-        # 2D 波动方程的 leapfrog 更新
-        Ax_new = 2*Ax - Ax_prev + (c*dt)**2 * laplacian(Ax)
-        Ay_new = 2*Ay - Ay_prev + (c*dt)**2 * laplacian(Ay)
-
-        Ax_prev, Ax = Ax, Ax_new
-        Ay_prev, Ay = Ay, Ay_new
-
-        im1.set_data(Bz_from_A(Ax, Ay))
-        im2.set_data(energy_density(Ax, Ay, Ax_prev, Ay_prev))
+        # 2D 波动方程的一步更新（leapfrog 或逐模式精确传播，由求解器完成）
+        solver.step()
+        Bz, En, _, _ = solver.diagnose()      # Bz 与能量密度共用同一遍差分
+        im1.set_data(Bz)
+        im2.set_data(En)
         return im1, im2
 
     ani = FuncAnimation(fig, animate, frames=FRAMES, interval=1000/FPS, blit=True)
 
     # === 保存 GIF（需要 Pillow） ===
-    ani.save("gauge2d.gif", dpi=120, writer="pillow", fps=FPS)
+    ani.save(record, dpi=120, writer="pillow", fps=FPS)
     # 如需保存：ani.save("gauge2d.mp4", fps=30)  # 需安装 ffmpeg
     # from matplotlib.animation import FFMpegWriter
     # ani.save("gauge2d.mp4", writer=FFMpegWriter(fps=FPS, bitrate=2400), dpi=150)
@@ -104,4 +96,31 @@ def simulate_gauge_2d():
     plt.show()
 
 if __name__ == "__main__":
-    simulate_gauge_2d()
+    p = argparse.ArgumentParser(description="周期边界 2D 规范场动画")
+    p.add_argument("--engine", choices=sorted(ENGINES), default="fd",
+                   help="fd：5 点差分 + leapfrog；highorder：高阶差分 + 辛积分器；"
+                        "spectral：伪谱（FFT）精确传播")
+    p.add_argument("--N", type=int, default=64, help="x 方向的格点数（--Ny 缺省时两个方向相同）")
+    p.add_argument("--Ny", type=int, default=None, help="y 方向的格点数")
+    p.add_argument("--Ly", type=float, default=6.4, help="y 方向的物理长度（x 方向为 6.4）")
+    p.add_argument("--order", type=int, choices=(2, 4, 6), default=4, help="highorder 的空间差分阶数")
+    p.add_argument("--integrator", choices=sorted(INTEGRATORS), default="fr4",
+                   help="highorder 的时间积分器")
+    p.add_argument("--dtype", choices=("float64", "float32"), default="float64",
+                   help="场的存储精度（能量求和仍为 float64）")
+    p.add_argument("--backend", choices=("numpy", "numba", "auto"), default="numpy",
+                   help="fd 的差分核后端（numba 为融合的并行核，未安装时退回 numpy）")
+    p.add_argument("--tile", type=int, default=0,
+                   help="fd 的缓存分块边长（0 为逐步整场更新；大网格如 2048² 可取 256）")
+    p.add_argument("--time-block", type=int, default=8, help="fd 分块时每块连推的步数")
+    p.add_argument("--record", type=str, default="gauge2d.gif", help="输出文件名（.gif 或 .mp4）")
+    p.add_argument("--fast-record", action="store_true",
+                   help="快速录制：颜色查找表直接成帧写入 Pillow / ffmpeg，不经 matplotlib、不弹窗")
+    args = p.parse_args()
+    kw = dict(order=args.order, integrator=args.integrator) if args.engine == "highorder" else {}
+    if args.engine == "fd" and args.tile:
+        kw.update(tile=args.tile, time_block=args.time_block)
+    if args.engine == "fd":
+        kw.update(backend=args.backend)
+    simulate_gauge_2d(args.engine, args.N, np.dtype(args.dtype), record=args.record,
+                      fast=args.fast_record, Ny=args.Ny, Ly=args.Ly, **kw)
@@ -1,11 +1,20 @@
 # -*- coding: utf-8 -*-
-import os, sys, argparse
+import os, sys, argparse, time, itertools
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from matplotlib import font_manager as fm, rcParams
 
+from gauge_solver import AbsorbingGaugeSolver
+from amr import AMRGaugeSolver
+from sources import Source, Sine, Chirp, Pulse, point, line, gaussian_patch
+from frame_encoder import LUTFrameEncoder, open_recorder
+from history import LiveCurves
+from pipeline import FrameRing, FramePublisher, POLICIES, produce, wait_connect
+from snapshots import SnapshotWriter
+from checkpoint import Checkpointer, save_checkpoint, load_checkpoint
+
 # ========== 样式 & 字体 ==========
 # plt.style.use("dark_background")
 def set_cn():
@@ -19,118 +28,119 @@ def set_cn():
     rcParams["axes.unicode_minus"] = False
 set_cn()
 
-def simulate_gauge_2d_absorbing(args):
-    # ===== 网格与时间步 =====
-    Nx, Ny = 96, 96
-    Lx, Ly = 9.6, 9.6
-    dx, dy = Lx / Nx, Ly / Ny
-    c = 1.0
-    dt = 0.65 * dx / (c * np.sqrt(2))  # CFL
-    steps = args.frames
+def demo_sources(name):
+    """--sources 的预设：center 为原中心正弦点源；array 为 8 元相控点阵 + 扫频线源 + 高斯脉冲斑"""
+    if name == "center":
+        return None
+    srcs = [Source(point(30 + 5*k, 30), Sine(0.8, 1.5, phase=0.6*k)) for k in range(8)]
+    srcs.append(Source(line((25, 66), (70, 66)), Chirp(0.3, 0.5, 3.0, duration=40.0), component="y"))
+    srcs.append(Source(gaussian_patch((48, 48), sigma=2.0), Pulse(3.0, t0=4.0, width=1.0, omega=2.0)))
+    return srcs
 
-    # ===== 场变量 =====
-    Ax = np.zeros((Nx, Ny)); Ay = np.zeros((Nx, Ny))
-    Vx = np.zeros_like(Ax);  Vy = np.zeros_like(Ay)
+
+def make_solver(args):
+    # ===== 网格与时间步、吸收边界、外源（见 gauge_solver.AbsorbingGaugeSolver、sources.py） =====
+    solver = AbsorbingGaugeSolver(Nx=96, Ny=96, Lx=9.6, Ly=9.6, c=1.0,
+                                  sponge_width=12, gamma_max=2.5,
+                                  boundary=args.boundary, pml_width=args.pml_width,
+                                  drive_amp=1.5, drive_omega=1.0, sources=demo_sources(args.sources),
+                                  threads=args.threads, seed=args.seed, dtype=np.dtype(args.dtype),
+                                  backend=args.backend)
 
     # 初始条件：高斯小扰动
-    x = (np.arange(Nx) - Nx/2) * dx
-    y = (np.arange(Ny) - Ny/2) * dy
-    X, Y = np.meshgrid(x, y, indexing='ij')
+    X, Y = solver.X, solver.Y
     r2 = X**2 + Y**2
-    Ax[:] = np.exp(-r2/(2*0.6**2)) * np.cos(2.5*X)
-    Ay[:] = np.exp(-r2/(2*0.6**2)) * np.sin(2.0*Y)
-
-    # ===== 吸收边界 =====
-    w = 12
-    gamma_max = 2.5
-    def ramp_1d(n, w, m):
-        d = np.minimum(np.arange(n), np.arange(n)[::-1])
-        g = np.clip((w - d)/w, 0.0, 1.0)**3
-        return m*g
-    gx = ramp_1d(Nx, w, gamma_max)[:, None]
-    gy = ramp_1d(Ny, w, gamma_max)[None, :]
-    gamma = np.maximum(gx, gy)
-
-    # ===== 外源 =====
-    cx, cy = Nx//2, Ny//2
-    drive_amp, drive_omega = 1.5, 1.0
-    def source(n):
-        s = np.zeros_like(Ax)
-        s[cx, cy] = drive_amp * np.sin(drive_omega * n * dt)
-        return s, np.zeros_like(Ax)
-
-    # ===== 差分工具 =====
-    def laplacian(Z):
-        L = np.zeros_like(Z)
-        L[1:-1,1:-1] = (Z[2:,1:-1]+Z[:-2,1:-1]+Z[1:-1,2:]+Z[1:-1,:-2]-4*Z[1:-1,1:-1])/(dx*dx)
-        return L
-
-    def Bz_from_A(Ax, Ay):
-        dAy_dx = np.zeros_like(Ay); dAx_dy = np.zeros_like(Ax)
-        dAy_dx[1:-1,:] = (Ay[2:,:] - Ay[:-2,:])/(2*dx)
-        dAx_dy[:,1:-1] = (Ax[:,2:] - Ax[:,:-2])/(2*dx)
-        return dAy_dx - dAx_dy
-
-    def energy_density(Ax, Ay, Vx, Vy):
-        dAx_dx = np.zeros_like(Ax); dAx_dy = np.zeros_like(Ax)
-        dAy_dx = np.zeros_like(Ay); dAy_dy = np.zeros_like(Ay)
-        dAx_dx[1:-1,:] = (Ax[2:,:] - Ax[:-2,:])/(2*dx)
-        dAx_dy[:,1:-1] = (Ax[:,2:] - Ax[:,:-2])/(2*dx)
-        dAy_dx[1:-1,:] = (Ay[2:,:] - Ay[:-2,:])/(2*dx)
-        dAy_dy[:,1:-1] = (Ay[:,2:] - Ay[:,:-2])/(2*dx)
-        grad2 = dAx_dx**2 + dAx_dy**2 + dAy_dx**2 + dAy_dy**2
-        E2 = Vx**2 + Vy**2
-        return 0.5*(E2 + (c**2)*grad2)
-
-    mask_inner = np.ones((Nx, Ny), dtype=bool)
-    mask_inner[:w,:] = mask_inner[-w:,:] = False
-    mask_inner[:, :w] = mask_inner[:, -w:] = False
+    solver.set_initial(np.exp(-r2/(2*0.6**2)) * np.cos(2.5*X),
+                       np.exp(-r2/(2*0.6**2)) * np.sin(2.0*Y))
+    if args.amr:
+        # 块结构加密：外源与能量集中处的块细化 ratio 倍（见 amr.py）
+        solver = AMRGaugeSolver(solver, ratio=args.amr_ratio, tile=8,
+                                threshold=args.amr_threshold)
+    return solver
 
-    # ===== 画布 =====
+def run_headless(args):
+    """
+    无界面批量推进：不创建画布，仅按 --diag-every 记录能量；
+    可选按 --snapshot-every 存原始场、按 --checkpoint-every 存检查点，--resume 从检查点续算。
+    """
+    solver = make_solver(args)
+    solver.diag_every = max(1, args.diag_every)
+    if args.amr and (args.resume or args.checkpoint or args.snapshots):
+        raise SystemExit("--amr 暂不支持检查点与原始场快照")
+    if args.resume:
+        load_checkpoint(args.resume, solver)
+        print(f"从检查点 {args.resume} 续算：已完成 {solver.n} 步")
+
+    hooks = []
+    writer = None
+    if args.snapshots:
+        every = max(1, args.snapshot_every)
+        writer = SnapshotWriter(args.snapshots, solver, stride=every,
+                                capacity=args.frames // every + 1, resume=bool(args.resume))
+        hooks.append((writer, writer.stride))
+    ckpt_path = args.checkpoint or args.resume
+    if ckpt_path:
+        # 存检查点前先把快照缓冲落盘：续算时快照目录会截到磁盘上、步数不晚于检查点的帧
+        ckpt = Checkpointer(ckpt_path, every=args.checkpoint_every,
+                            before=[writer.flush] if writer is not None else [])
+        hooks.append((ckpt, ckpt.every))
+    ring = None
+    if args.share:
+        # 发布到命名共享内存，查看器可随时 --attach；无查看器时不计算帧
+        ring = FrameRing.create(args.share, args.ring,
+                                FramePublisher.frame_shape(solver, args.decimate),
+                                args.backpressure or "drop_oldest")
+        pub = FramePublisher(ring, args.publish_every, args.decimate)
+        hooks.append((pub, pub.every))
+        print(f"帧缓冲 {ring.name}：另开终端运行 --attach {ring.name} 查看")
+
+    def on_step(s):
+        for hook, every in hooks:
+            if s.n % every == 0:
+                hook(s)
+
+    steps = max(0, args.frames - solver.n)        # --frames 为总步数，续算时只跑剩余部分
+    t0 = time.perf_counter()
+    try:
+        solver.run(steps, callback=on_step if hooks else None)
+    finally:
+        if ring is not None:
+            ring.finish()
+            ring.close()
+    elapsed = time.perf_counter() - t0
+    print(f"{steps} 步用时 {elapsed:.3f} s（{steps/max(elapsed, 1e-12):.0f} 步/秒）")
+    if writer is not None:
+        writer.close()
+        print(f"原始场共 {writer.count} 帧，位于 {args.snapshots}/")
+    if ckpt_path:
+        save_checkpoint(ckpt_path, solver)
+    if solver.energy_all_hist:
+        print(f"末态能量：全域 {solver.energy_all_hist[-1]:.6e}，"
+              f"内部 {solver.energy_inner_hist[-1]:.6e}")
+    return solver
+
+def make_figure(Bz, En):
+    """三联画布：Bz、能量密度与能量曲线；返回 (fig, ax_en, ax_cur, im_bz, im_en, line_all, line_inner)"""
     fig = plt.figure(figsize=(14, 4))
     gs = fig.add_gridspec(1, 3, width_ratios=[1,1,1])
     ax_bz  = fig.add_subplot(gs[0,0])
     ax_en  = fig.add_subplot(gs[0,1])
     ax_cur = fig.add_subplot(gs[0,2])
 
-    im_bz = ax_bz.imshow(Bz_from_A(Ax, Ay), origin="lower",
+    im_bz = ax_bz.imshow(Bz, origin="lower",
                          cmap="RdBu", vmin=-1.0, vmax=1.0, interpolation="nearest")
     ax_bz.set_title("Bz = ∂xAy − ∂yAx")
-    im_en = ax_en.imshow(energy_density(Ax, Ay, Vx, Vy), origin="lower",
+    im_en = ax_en.imshow(En, origin="lower",
                          cmap="magma", vmin=0.0, vmax=2.0, interpolation="nearest")
     ax_en.set_title(r"能量密度 $\mathcal{E}$")
     ax_cur.set_title("能量曲线"); ax_cur.set_xlabel("步数"); ax_cur.set_ylabel("能量（求和）")
     (line_all,)   = ax_cur.plot([], [], label="全域能量")
-    (line_inner,) = ax_cur.plot([], [], label="内部能量（不含海绵层）")
+    (line_inner,) = ax_cur.plot([], [], label="内部能量（不含吸收层）")
     ax_cur.legend(loc="best"); ax_cur.grid(True)
+    return fig, ax_en, ax_cur, im_bz, im_en, line_all, line_inner
 
-    energy_all_hist, energy_inner_hist = [], []
-
-    # ===== 动画步进 =====
-    def step(n):
-        nonlocal Ax, Ay, Vx, Vy
-        Sx, Sy = source(n)
-        den = (1 + 0.5*gamma*dt)
-
-        Vx = ((1 - 0.5*gamma*dt)*Vx + dt*((c**2)*laplacian(Ax) + Sx)) / den
-        Vy = ((1 - 0.5*gamma*dt)*Vy + dt*((c**2)*laplacian(Ay) + Sy)) / den
-        Ax = Ax + dt*Vx
-        Ay = Ay + dt*Vy
-
-        Bz = Bz_from_A(Ax, Ay)
-        En = energy_density(Ax, Ay, Vx, Vy)
-        im_bz.set_data(Bz); im_en.set_data(En)
-
-        energy_all_hist.append(np.sum(En)*dx*dy)
-        energy_inner_hist.append(np.sum(En[mask_inner])*dx*dy)
-        line_all.set_data(np.arange(len(energy_all_hist)), energy_all_hist)
-        line_inner.set_data(np.arange(len(energy_inner_hist)), energy_inner_hist)
-        ax_cur.relim(); ax_cur.autoscale_view()
-        return im_bz, im_en, line_all, line_inner
-
-    ani = FuncAnimation(fig, step, frames=steps, interval=1000/args.fps, blit=False)
-
-    # ===== 录制 =====
+def save_or_show(fig, ani, args):
+    """按 --record 录制（.mp4 / .gif），再按 --no-show 决定是否弹窗"""
     if args.record:
         out = args.record
         root, ext = os.path.splitext(out)
@@ -153,6 +163,131 @@ def simulate_gauge_2d_absorbing(args):
     else:
         plt.close(fig)
 
+def record_fast(frames, shape, args):
+    """
+    快速录制：不经 matplotlib，Bz / 能量密度经颜色查找表直接成帧写入 --record（见 frame_encoder.py）。
+    frames 产出 (n, t, E_all, E_inner, Bz, En)；顶部文字条显示步数与能量（能量曲线面板省略）。
+    """
+    enc = LUTFrameEncoder(shape, panels=(("RdBu", -1.0, 1.0), ("magma", 0.0, 2.0)),
+                          scale=args.scale)
+    t0 = time.perf_counter()
+    with open_recorder(args.record, enc, fps=args.fps, bitrate=args.bitrate) as rec:
+        for n, t, e_all, e_inner, Bz, En in frames:
+            rec.write((Bz, En), text=f"step {int(n)}  t={t:.2f}  E={e_all:.4e}  E_in={e_inner:.4e}")
+    elapsed = time.perf_counter() - t0
+    print(f"{rec.frames} 帧写入 {args.record}，用时 {elapsed:.2f} s（{rec.frames/max(elapsed, 1e-12):.0f} 帧/秒）")
+
+def simulate_gauge_2d_absorbing(args):
+    solver = make_solver(args)
+    steps = args.frames
+
+    if args.fast_record and args.record:
+        amr = isinstance(solver, AMRGaugeSolver)
+
+        def frames():
+            for _ in range(steps):
+                solver.step()
+                Bz, En, e_all, e_inner = solver.diagnose()
+                if amr:
+                    Bz, En = solver.composite("Bz"), solver.composite("En")
+                yield solver.n, solver.t, e_all, e_inner, Bz, En
+
+        shape = solver.composite("Bz").shape if amr else solver.shape
+        record_fast(frames(), shape, args)
+        return
+
+    # ===== 画布 =====
+    amr = isinstance(solver, AMRGaugeSolver)
+    # AMR 时显示细分辨率的复合图像（粗区域按 ratio 重复）
+    bz0 = solver.composite("Bz") if amr else solver.Bz()
+    en0 = solver.composite("En") if amr else solver.energy_density()
+    fig, ax_en, ax_cur, im_bz, im_en, line_all, line_inner = make_figure(bz0, en0)
+
+    # 能量曲线：固定容量的最小 / 最大值抽样，每帧开销与已运行步数无关（见 history.py）
+    curves = LiveCurves(ax_cur, (line_all, line_inner))
+    artists = [im_bz, im_en, line_all, line_inner]
+    if amr:
+        # 标题在坐标轴区域之外、blit 时不会重画，加密块数改用轴内文字显示
+        label = ax_en.text(0.02, 0.96, "", transform=ax_en.transAxes, va="top", color="w")
+        artists.append(label)
+
+    # ===== 动画步进 =====
+    def step(n):
+        solver.step()
+
+        Bz, En, e_all, e_inner = solver.diagnose()
+        if amr:
+            Bz, En = solver.composite("Bz"), solver.composite("En")
+            label.set_text(f"加密 {len(solver.tiles)} 块")
+        im_bz.set_data(Bz); im_en.set_data(En)
+        curves.update(solver.n, e_all, e_inner)
+        return artists
+
+    ani = FuncAnimation(fig, step, frames=steps, init_func=lambda: artists,
+                        interval=1000/args.fps, blit=True)
+    save_or_show(fig, ani, args)
+
+def view_ring(ring, args, n_frames=None):
+    """
+    查看器：连接到帧缓冲并只做渲染 / 编码，关窗或录制结束后断开。
+    能量曲线横轴为帧对应的步数（中途连接时从连接时刻开始）。
+    """
+    ring.attach()
+    try:
+        first = ring.get(timeout=60.0)
+        if first is None:
+            print(f"帧缓冲 {ring.name} 没有新的帧（模拟已结束？）")
+            return
+        meta, fr = first
+        if args.fast_record and args.record:
+            frames = ((m[0], m[1], m[2], m[3], f[0], f[1])
+                      for m, f in itertools.chain([first], ring))
+            record_fast(itertools.islice(frames, n_frames), ring.shape, args)
+            return
+        fig, ax_en, ax_cur, im_bz, im_en, line_all, line_inner = make_figure(fr[0], fr[1])
+        curves = LiveCurves(ax_cur, (line_all, line_inner))
+        artists = (im_bz, im_en, line_all, line_inner)
+
+        def frames():
+            yield first
+            yield from ring
+
+        def update(item):
+            meta, fr = item
+            im_bz.set_data(fr[0]); im_en.set_data(fr[1])
+            curves.update(meta[0], meta[2], meta[3])
+            return artists
+
+        ani = FuncAnimation(fig, update, frames=frames, init_func=lambda: artists,
+                            interval=1000/args.fps, blit=True, cache_frame_data=False,
+                            save_count=n_frames)
+        save_or_show(fig, ani, args)
+    finally:
+        ring.detach()
+
+def run_pipeline(args):
+    """
+    流水线模式：工作进程推进求解器并发布帧，本进程只渲染 / 编码。
+    录制时默认 block（不丢帧），实时预览默认 drop_oldest（总看最新状态）。
+    """
+    import multiprocessing as mp
+    every = max(1, args.publish_every)
+    policy = args.backpressure or ("block" if args.record else "drop_oldest")
+    name = f"gauge2d_{os.getpid()}"
+    proc = mp.Process(target=produce, daemon=True,
+                      args=(make_solver, args, name, args.frames, every, args.decimate,
+                            args.ring, policy, True))
+    proc.start()
+    ring = None
+    try:
+        ring = wait_connect(name, alive=proc.is_alive)
+        view_ring(ring, args, n_frames=args.frames // every)
+    finally:
+        if ring is not None:
+            ring.request_stop()
+            ring.close()
+        proc.join()
+
 def parse_args():
     p = argparse.ArgumentParser(description="2D 规范场演化（外源 + 吸收边界 + 能量曲线）")
     p.add_argument("--record", type=str, default="",
@@ -161,8 +296,52 @@ def parse_args():
     p.add_argument("--frames", type=int, default=800, help="总帧数")
     p.add_argument("--dpi", type=int, default=120, help="保存时的 DPI")
     p.add_argument("--bitrate", type=int, default=1800, help="mp4 比特率 kbps（FFmpeg）")
+    p.add_argument("--fast-record", action="store_true",
+                   help="快速录制：颜色查找表直接成帧、写入 ffmpeg / Pillow，不经 matplotlib（无能量曲线面板）")
+    p.add_argument("--scale", type=int, default=4, help="快速录制时每个格点放大的像素数")
     p.add_argument("--no-show", action="store_true",
                    help="仅录制不弹窗（适合服务器/自动化）")
+    p.add_argument("--headless", action="store_true",
+                   help="纯计算模式：不创建画布，按 --frames 推进并输出能量")
+    p.add_argument("--diag-every", type=int, default=1,
+                   help="纯计算模式下每隔多少步做一次诊断（Bz/能量）并记录能量")
+    p.add_argument("--snapshots", type=str, default="",
+                   help="纯计算模式下把 Ax/Ay/Bz/能量密度写入该目录（memmap 时间序列）")
+    p.add_argument("--snapshot-every", type=int, default=10, help="每隔多少步存一帧原始场")
+    p.add_argument("--checkpoint", type=str, default="",
+                   help="纯计算模式下定期把完整求解器状态原子地写入该 .npz 文件")
+    p.add_argument("--checkpoint-every", type=int, default=1000, help="每隔多少步存一次检查点")
+    p.add_argument("--resume", type=str, default="",
+                   help="从检查点续算（逐位一致）；未给 --checkpoint 时继续写回同一文件")
+    p.add_argument("--boundary", choices=("sponge", "pml"), default="sponge",
+                   help="吸收边界：sponge（12 格三次方海绵层）或 pml（完美匹配层，更薄、反射更低）")
+    p.add_argument("--pml-width", type=int, default=6, help="PML 层厚度（格数）")
+    p.add_argument("--seed", type=int, default=None, help="随机数种子（便于复现）")
+    p.add_argument("--threads", type=int, default=1,
+                   help="步进使用的线程数（按行条带并行，结果与单线程一致）")
+    p.add_argument("--dtype", choices=("float64", "float32"), default="float64",
+                   help="场的存储精度；float32 内存流量减半，能量求和仍为 float64")
+    p.add_argument("--backend", choices=("numpy", "numba", "auto"), default="numpy",
+                   help="差分核后端：numba 把每步更新融合成一次并行遍历（未安装时退回 numpy）")
+    p.add_argument("--sources", choices=("center", "array"), default="center",
+                   help="外源预设：center 中心正弦点源；array 相控点阵 + 扫频线源 + 脉冲斑")
+    p.add_argument("--amr", action="store_true",
+                   help="块结构自适应加密：点源与能量集中处局部细化，细块时间子循环")
+    p.add_argument("--amr-ratio", type=int, default=2, help="AMR 加密倍数")
+    p.add_argument("--amr-threshold", type=float, default=0.05,
+                   help="AMR 加密阈值（能量密度相对最大值的比例）")
+    p.add_argument("--pipeline", action="store_true",
+                   help="流水线模式：工作进程推进模拟，主进程只渲染 / 编码（两个核并行）")
+    p.add_argument("--share", type=str, default="",
+                   help="纯计算模式下把帧发布到该名字的共享内存，供 --attach 随时查看")
+    p.add_argument("--attach", type=str, default="",
+                   help="连接到正在运行的 --share 模拟，只做显示 / 录制")
+    p.add_argument("--publish-every", type=int, default=1, help="流水线中每隔多少步发布一帧")
+    p.add_argument("--decimate", type=int, default=1, help="发布帧的空间抽样步长")
+    p.add_argument("--ring", type=int, default=8, help="共享内存环形缓冲的帧数")
+    p.add_argument("--backpressure", choices=POLICIES, default=None,
+                   help="缓冲满时的策略：block 等待消费者 / drop_oldest 覆盖旧帧 / drop_newest 丢新帧"
+                        "（默认：录制时 block，否则 drop_oldest）")
     return p.parse_args()
 
 if __name__ == "__main__":
@@ -173,4 +352,15 @@ if __name__ == "__main__":
         matplotlib.use("Agg")  # 必须在导入 pyplot 之前，但这里已导入；仅当脚本顶层使用更稳
         # 这个分支如果需要严格无窗，建议把 use("Agg") 提到文件最顶部、在 import pyplot 之前。
 
-    simulate_gauge_2d_absorbing(args)
+    if args.attach:
+        ring = wait_connect(args.attach)
+        try:
+            view_ring(ring, args)
+        finally:
+            ring.close()
+    elif args.headless or args.resume:
+        run_headless(args)
+    elif args.pipeline:
+        run_pipeline(args)
+    else:
+        simulate_gauge_2d_absorbing(args)
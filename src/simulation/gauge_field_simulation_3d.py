@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import os, argparse, time
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+from matplotlib import font_manager as fm, rcParams
+
+from gauge_solver_3d import AbsorbingGaugeSolver3D
+from history import LiveCurves
+
+# ========== 样式 & 字体 ==========
+def set_cn():
+    preferred = ["Microsoft YaHei", "微软雅黑", "SimHei", "黑体",
+                 "Noto Sans CJK SC", "WenQuanYi Zen Hei"]
+    installed = {f.name for f in fm.fontManager.ttflist}
+    for name in preferred:
+        if name in installed:
+            rcParams["font.sans-serif"] = [name]
+            break
+    rcParams["axes.unicode_minus"] = False
+set_cn()
+
+def make_solver(args):
+    # ===== 网格与时间步、海绵层、外源（见 gauge_solver_3d.AbsorbingGaugeSolver3D） =====
+    N = args.N
+    L = 0.1 * N                               # 与二维脚本相同的格距 dx = 0.1
+    solver = AbsorbingGaugeSolver3D(N, N, N, Lx=L, Ly=L, Lz=L, c=1.0,
+                                    sponge_width=max(4, N//8), gamma_max=2.5,
+                                    drive_amp=1.5, drive_omega=1.0,
+                                    dtype=np.dtype(args.dtype), slab=args.slab, seed=args.seed)
+
+    # 初始条件：高斯小扰动（按条带求值，不建整网格临时数组）
+    s2 = 2*0.6**2
+    env = lambda x, y, z: np.exp(-(x*x + y*y + z*z)/s2)
+    solver.set_initial(Ax=lambda x, y, z: env(x, y, z) * np.cos(2.5*x),
+                       Ay=lambda x, y, z: env(x, y, z) * np.sin(2.0*y))
+    mib = solver.nbytes / 2**20
+    print(f"网格 {N}³，{args.dtype}，场与缓冲共 {mib:.1f} MiB，dt = {solver.dt:.4f}")
+    return solver
+
+def run_headless(args):
+    """无界面推进：每 --diag-every 步按条带累加一次能量（float64）"""
+    solver = make_solver(args)
+    solver.diag_every = max(1, args.diag_every)
+    t0 = time.perf_counter()
+    solver.run(args.frames)
+    elapsed = time.perf_counter() - t0
+    cells = np.prod(solver.shape) * args.frames
+    print(f"{args.frames} 步用时 {elapsed:.3f} s（{cells/max(elapsed, 1e-12)/1e6:.1f} M 格点·步/秒）")
+    if solver.energy_all_hist:
+        print(f"末态能量：全域 {solver.energy_all_hist[-1]:.6e}，"
+              f"内部 {solver.energy_inner_hist[-1]:.6e}")
+    return solver
+
+def simulate_gauge_3d(args):
+    solver = make_solver(args)
+
+    # ===== 画布：三个正交中心切片上的 Bz，xy 切片上的能量密度，能量曲线 =====
+    fig = plt.figure(figsize=(16, 4))
+    gs = fig.add_gridspec(1, 5)
+    views = [(2, "xy 切片（z = 0）"), (1, "xz 切片（y = 0）"), (0, "yz 切片（x = 0）")]
+    ims = []
+    for k, (axis, title) in enumerate(views):
+        ax = fig.add_subplot(gs[0, k])
+        im = ax.imshow(solver.slice(args.field, axis=axis).T, origin="lower",
+                       cmap="RdBu", vmin=-args.vmax, vmax=args.vmax, interpolation="nearest")
+        ax.set_title(f"{args.field}：{title}")
+        ims.append((axis, im))
+    ax_en = fig.add_subplot(gs[0, 3])
+    im_en = ax_en.imshow(solver.slice("En", axis=2).T, origin="lower",
+                         cmap="magma", vmin=0.0, vmax=1.0, interpolation="nearest")
+    ax_en.set_title(r"能量密度 $\mathcal{E}$（xy 切片）")
+    ax_cur = fig.add_subplot(gs[0, 4])
+    ax_cur.set_title("能量曲线"); ax_cur.set_xlabel("步数")
+    (line_all,)   = ax_cur.plot([], [], label="全域能量")
+    (line_inner,) = ax_cur.plot([], [], label="内部能量（不含吸收层）")
+    ax_cur.legend(loc="best"); ax_cur.grid(True)
+    plt.tight_layout()
+    curves = LiveCurves(ax_cur, (line_all, line_inner))   # 每帧开销固定的能量曲线（见 history.py）
+    artists = [im for _, im in ims] + [im_en, line_all, line_inner]
+
+    def step(_frame):
+        solver.step(args.steps_per_frame)
+        e_all, e_inner = solver.diagnose()
+        for axis, im in ims:
+            im.set_data(solver.slice(args.field, axis=axis).T)
+        im_en.set_data(solver.slice("En", axis=2).T)
+        curves.update(solver.n, e_all, e_inner)
+        return artists
+
+    ani = FuncAnimation(fig, step, frames=args.frames, init_func=lambda: artists,
+                        interval=1000/args.fps, blit=True)
+
+    # ===== 录制 =====
+    if args.record:
+        out = args.record
+        ext = os.path.splitext(out)[1].lower()
+        if ext == ".mp4":
+            from matplotlib.animation import FFMpegWriter
+            ani.save(out, writer=FFMpegWriter(fps=args.fps, bitrate=args.bitrate), dpi=args.dpi)
+        elif ext == ".gif":
+            from matplotlib.animation import PillowWriter
+            ani.save(out, writer=PillowWriter(fps=args.fps), dpi=args.dpi)
+        else:
+            raise ValueError("不支持的扩展名：请用 .mp4 或 .gif")
+
+    if not args.no_show:
+        plt.show()
+    else:
+        plt.close(fig)
+
+def parse_args():
+    p = argparse.ArgumentParser(description="3D 规范场演化（外源 + 海绵吸收层 + 切片可视化）")
+    p.add_argument("--N", type=int, default=64, help="每个方向的格点数（格距 0.1）")
+    p.add_argument("--dtype", choices=("float32", "float64"), default="float32",
+                   help="场的存储精度；float32 省一半内存，能量求和始终为 float64")
+    p.add_argument("--slab", type=int, default=8, help="每个 x 条带的行数（决定临时缓冲大小）")
+    p.add_argument("--field", choices=("Bx", "By", "Bz", "|B|", "Ex", "Ey", "Ez", "Ax", "Ay", "Az"),
+                   default="Bz", help="三个切片上显示的场")
+    p.add_argument("--vmax", type=float, default=0.5, help="切片色标范围 ±vmax")
+    p.add_argument("--steps-per-frame", type=int, default=1, help="每帧推进的步数")
+    p.add_argument("--record", type=str, default="", help="输出文件名（.mp4 或 .gif）")
+    p.add_argument("--fps", type=int, default=30, help="帧率")
+    p.add_argument("--frames", type=int, default=400, help="总帧数（纯计算模式下为总步数）")
+    p.add_argument("--dpi", type=int, default=120, help="保存时的 DPI")
+    p.add_argument("--bitrate", type=int, default=1800, help="mp4 比特率 kbps（FFmpeg）")
+    p.add_argument("--no-show", action="store_true", help="仅录制不弹窗")
+    p.add_argument("--headless", action="store_true", help="纯计算模式：不创建画布")
+    p.add_argument("--diag-every", type=int, default=10, help="纯计算模式下每隔多少步记录能量")
+    p.add_argument("--seed", type=int, default=None, help="随机数种子")
+    return p.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.record and args.no_show:
+        matplotlib.use("Agg")
+    if args.headless:
+        run_headless(args)
+    else:
+        simulate_gauge_3d(args)
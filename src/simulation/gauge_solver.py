@@ -0,0 +1,582 @@
+# -*- coding: utf-8 -*-
+"""
+gauge_solver.py
+无界面的二维规范场求解器：时间步进与 matplotlib 动画解耦。
+  * LeapfrogGaugeSolver  —— 周期边界 + leapfrog（gauge_field_simulation*.py）
+  * AbsorbingGaugeSolver —— 海绵吸收层 + 中心外源 + 半隐式阻尼（gauge_field_simulation_2d_up.py）
+用法示例：
+  solver = AbsorbingGaugeSolver(96, 96, 9.6, 9.6)
+  solver.run(10000)                       # 纯计算，不画图
+  Bz, En = solver.Bz(), solver.energy_density()
+  solver.diag_every = 10                  # 每 10 步做一次融合诊断并记录能量曲线
+批量系综：batch=B 时所有场为 (B, Nx, Ny)，B 个成员在同一次向量化运算中推进（见 ensemble.py）。
+多线程：threads=T>1 时每步按 x 行条带分给线程池（NumPy 数组运算期间释放 GIL），
+与单线程逐位一致（见 verify_threads.py）。
+混合精度：dtype=np.float32 时场、速度、阻尼系数与工作缓冲都以 float32 存放（内存流量减半），
+能量求和仍按 accum_dtype（缺省 float64）累加；与 float64 的能量漂移对比见 verify_precision.py。
+后端：backend="numpy"（缺省）| "numba" | "auto" 选择差分核的实现（见 backends.py）；Numba 后端把每步的
+逐格点更新融合成一次并行遍历，未安装 Numba 时自动退回 NumPy（一致性见 verify_backends.py）。
+时间分块：LeapfrogGaugeSolver(tile=128, time_block=8) 按缓存大小的块推进，每块带 time_block 格 halo
+在小缓冲里连推多步再写回，整场每 time_block 步只读写一遍（与逐步更新逐位一致，见 verify_tiling.py）。
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import stencils as st
+from backends import get_backend
+from sources import Source, SourceSet, Sine, point
+
+
+class GaugeSolver:
+    """
+    二维规范场 (Ax, Ay) 求解器基类。
+    子类实现 _advance() 完成一步更新；本类负责步数计数、批量推进与诊断接口。
+    场以带幽灵格的数组存放（见 stencils.py），Ax/Ay 是其物理区域视图；
+    差分所需的工作缓冲在构造时一次性分配，稳态步进不再分配整网格数组。
+    batch=B 时场带前导批量轴 (B, Nx, Ny)，能量等诊断量按成员返回 (B,) 数组。
+    backend 为差分核后端（名字或 backends.get_backend 的返回值）；ghost 为幽灵格层数（宽模板的子类传入）。
+    """
+    periodic = True
+    inner = None            # 内部区域切片（不含吸收层），None 表示全域
+
+    def __init__(self, Nx, Ny, dx, dy, dt, c=1.0, seed=None, diag_every=0, batch=None,
+                 threads=None, dtype=np.float64, accum_dtype=np.float64, backend="numpy", ghost=1):
+        self.Nx, self.Ny = Nx, Ny
+        self.batch = batch
+        self.shape = (Nx, Ny) if batch is None else (batch, Nx, Ny)
+        self.dx, self.dy = dx, dy
+        self.dt = dt
+        self.c = c
+        self.n = 0                                  # 已推进的步数
+        self.rng = np.random.default_rng(seed)
+        # 存储精度与能量求和的累加精度（accum_dtype=None 表示与存储精度相同）
+        self.dtype = np.dtype(dtype)
+        self.accum_dtype = self.dtype if accum_dtype is None else np.dtype(accum_dtype)
+        self.backend = get_backend(backend)
+
+        self._Px = st.padded_wide(self.shape, ghost, self.dtype)
+        self._Py = st.padded_wide(self.shape, ghost, self.dtype)
+        # 工作缓冲：拉普拉斯结果 + 通用临时区
+        self._lap = np.zeros(self.shape, dtype=self.dtype)
+        self._w1 = np.zeros(self.shape, dtype=self.dtype)
+
+        # 线程条带：threads<=1 时整块串行执行
+        self.threads = max(1, threads or 1)
+        self._slabs = st.split_rows(Nx, self.threads)
+        self._pool = ThreadPoolExecutor(self.threads) if self.threads > 1 else None
+
+        # 以网格中心为原点的坐标（初始条件常用）
+        x = (np.arange(Nx) - Nx/2) * dx
+        y = (np.arange(Ny) - Ny/2) * dy
+        self.X, self.Y = np.meshgrid(x, y, indexing='ij')
+
+        # ===== 诊断 =====
+        # diag_every=k>0 时每 k 步自动做一次融合诊断；0 表示只在手动调用 diagnose() 时计算
+        self.diag_every = diag_every
+        self.Bz_diag = np.zeros(self.shape, dtype=self.dtype)
+        self.En_diag = np.zeros(self.shape, dtype=self.dtype)
+        self.energy_steps, self.energy_all_hist, self.energy_inner_hist = [], [], []
+
+    # ===== 步进 =====
+    def _advance(self):
+        raise NotImplementedError
+
+    def _parallel(self, fn):
+        """对每个行条带 (r0, r1) 执行 fn(r0, r1)；有线程池时并行，等全部完成才返回"""
+        if self._pool is None:
+            fn(0, self.Nx)
+        else:
+            for f in [self._pool.submit(fn, r0, r1) for r0, r1 in self._slabs]:
+                f.result()
+
+    def close(self):
+        """释放线程池"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def step(self, n=1):
+        """推进 n 步，返回自身便于链式调用"""
+        for _ in range(n):
+            self._advance()
+            self.n += 1
+            if self.diag_every and self.n % self.diag_every == 0:
+                self.diagnose()
+        return self
+
+    def run(self, steps, callback=None, every=1):
+        """
+        连续推进 steps 步；若给出 callback，则每 every 步调用一次 callback(self)。
+        无 callback 时即为纯无界面计算。两次回调之间的步数一次交给 step()（便于时间分块）。
+        """
+        end = self.n + steps
+        while self.n < end:
+            m = end - self.n if callback is None else min(end - self.n, every - self.n % every)
+            self.step(m)
+            if callback is not None and self.n % every == 0:
+                callback(self)
+        return self
+
+    # ===== 状态访问 =====
+    @property
+    def Ax(self):
+        return st.interior(self._Px)
+
+    @property
+    def Ay(self):
+        return st.interior(self._Py)
+
+    @property
+    def fields(self):
+        return self.Ax, self.Ay
+
+    @property
+    def t(self):
+        return self.n * self.dt
+
+    def set_initial(self, Ax, Ay, Vx=None, Vy=None):
+        """设置初始场（及可选的初始速度 ∂tA）"""
+        raise NotImplementedError
+
+    def velocities(self):
+        """返回 (∂tAx, ∂tAy)"""
+        raise NotImplementedError
+
+    def _fill_ghosts(self):
+        st.fill_ghosts(self._Px, self.periodic)
+        st.fill_ghosts(self._Py, self.periodic)
+
+    def Bz(self, out=None):
+        """Bz = ∂xAy − ∂yAx；给出 out 时就地写入"""
+        if out is None:
+            out = np.empty(self.shape, dtype=self.dtype)
+        self._fill_ghosts()
+        return st.Bz_from_A(self._Px, self._Py, out, self._w1, self.dx, self.periodic, dy=self.dy)
+
+    def energy_density(self, out=None):
+        """𝓔 = ½(|∂tA|² + c²|∇A|²)；给出 out 时就地写入"""
+        if out is None:
+            out = np.empty(self.shape, dtype=self.dtype)
+        self._fill_ghosts()
+        Vx, Vy = self.velocities()
+        return st.energy_density(self._Px, self._Py, Vx, Vy, out, self._lap,
+                                 self.dx, self.c, self.periodic, dy=self.dy)
+
+    def diagnose(self):
+        """
+        融合诊断：一次差分遍历得到 Bz、能量密度及全域 / 内部能量，
+        结果写入 Bz_diag / En_diag 并追加到能量历史。返回 (Bz, En, E_all, E_inner)。
+        """
+        self._fill_ghosts()
+        Vx, Vy = self.velocities()
+        Bz, En, total, inner = self.backend.fused_diagnostics(
+            self._Px, self._Py, Vx, Vy, self.Bz_diag, self.En_diag, self._w1,
+            self.dx, self.c, self.periodic, self.inner, dtype=self.accum_dtype, dy=self.dy)
+        dA = self.dx * self.dy
+        self.energy_steps.append(self.n)
+        self.energy_all_hist.append(total * dA)
+        self.energy_inner_hist.append(inner * dA)
+        return Bz, En, total * dA, inner * dA
+
+    # ===== 完整状态（检查点用，见 checkpoint.py） =====
+    def state_dict(self):
+        """续算所需的全部状态：场、速度（或上一层场）、步数、RNG 状态与能量历史"""
+        return dict(
+            kind=type(self).__name__, shape=np.asarray(self.shape), dt=self.dt, n=self.n,
+            Ax=self.Ax.copy(), Ay=self.Ay.copy(),
+            rng_state=self.rng.bit_generator.state,
+            energy_steps=np.asarray(self.energy_steps, dtype=np.int64),
+            energy_all_hist=np.asarray(self.energy_all_hist),
+            energy_inner_hist=np.asarray(self.energy_inner_hist),
+        )
+
+    def load_state_dict(self, state):
+        """从 state_dict() 的结果恢复；网格形状与 dt 必须一致，保证逐位续算"""
+        if state["kind"] != type(self).__name__:
+            raise ValueError(f"检查点属于 {state['kind']}，不能载入 {type(self).__name__}")
+        if tuple(state["shape"]) != self.shape or state["dt"] != self.dt:
+            raise ValueError("检查点的网格形状或 dt 与当前求解器不一致")
+        self.Ax[...] = state["Ax"]
+        self.Ay[...] = state["Ay"]
+        self.n = int(state["n"])
+        self.rng.bit_generator.state = state["rng_state"]
+        self.energy_steps[:] = [int(k) for k in state["energy_steps"]]
+        self.energy_all_hist[:] = list(state["energy_all_hist"])
+        self.energy_inner_hist[:] = list(state["energy_inner_hist"])
+        return self
+
+    def energy(self, mask=None):
+        """总能量 Σ𝓔·dx·dy；给出 mask 时只对 mask 内求和（批量时按成员返回）"""
+        En = self.energy_density()
+        if mask is not None:
+            return np.sum(En[..., mask], axis=-1, dtype=self.accum_dtype) * self.dx * self.dy
+        return np.sum(En, axis=(-2, -1), dtype=self.accum_dtype) * self.dx * self.dy
+
+
+class LeapfrogGaugeSolver(GaugeSolver):
+    """
+    周期边界的二维波动方程，leapfrog 更新：A⁺ = 2A − A⁻ + (c·dt)²∇²A
+
+    tile=(bx, by)（或整数）开启缓存分块：网格大到放不进缓存时，逐步的整场表达式每步要把场
+    在内存里来回搬好几遍。分块模式下每个 bx×by 块连同 h 格周期 halo 读入小缓冲，
+    在缓冲里连推 h ≤ time_block 步（每推一步有效区向内缩一格），再把中心块写回另一组整场缓冲，
+    全部块完成后交换引用。整场每 h 步只读写一遍，块上的运算次序与逐步更新相同，结果逐位一致；
+    代价是 halo 区的重复计算（约 (1 + 2h/b)² 倍）与两组额外的整场缓冲。
+    """
+    periodic = True
+
+    def __init__(self, Nx, Ny, dx, dy, dt=None, c=1.0, cfl=0.65, seed=None, diag_every=0,
+                 batch=None, threads=None, dtype=np.float64, accum_dtype=np.float64,
+                 tile=None, time_block=1, backend="numpy"):
+        if dt is None:
+            dt = st.cfl_dt(cfl, c, dx, dy)  # 满足 CFL 稳定约束
+        super().__init__(Nx, Ny, dx, dy, dt, c=c, seed=seed, diag_every=diag_every, batch=batch,
+                         threads=threads, dtype=dtype, accum_dtype=accum_dtype, backend=backend)
+        self._Px_prev = self._Px.copy()
+        self._Py_prev = self._Py.copy()
+        # ∂tA = (A − A⁻)/dt 的缓冲
+        self._Vx = np.zeros(self.shape, dtype=self.dtype)
+        self._Vy = np.zeros(self.shape, dtype=self.dtype)
+
+        # ===== 缓存分块 / 时间分块 =====
+        self.tile = None if tile is None else (tile, tile) if np.isscalar(tile) else tuple(tile)
+        self.time_block = max(1, int(time_block))
+        if self.tile is not None:
+            # A^{n+h} 与 A^{n+h−1} 写入的另一组整场缓冲；每个线程条带各有一套块缓冲
+            self._next = [st.padded(self.shape, self.dtype) for _ in range(4)]
+            bx, by = self.tile
+            h = self.time_block
+            lead = self.shape[:-2]
+            self._tile_bufs = {r0: (np.zeros((*lead, bx + 2*h, by + 2*h), dtype=self.dtype),
+                                    np.zeros((*lead, bx + 2*h, by + 2*h), dtype=self.dtype),
+                                    np.zeros((*lead, bx + 2*h - 2, by + 2*h - 2), dtype=self.dtype))
+                               for r0, _ in self._slabs}
+
+    @property
+    def Ax_prev(self):
+        return st.interior(self._Px_prev)
+
+    @property
+    def Ay_prev(self):
+        return st.interior(self._Py_prev)
+
+    def _advance(self):
+        self._fill_ghosts()
+        if self.backend.fused:
+            k = (self.c*self.dt)**2
+            for P, P_prev in ((self._Px, self._Px_prev), (self._Py, self._Py_prev)):
+                self.backend.leapfrog_step(P, P_prev, k, self.dx, self.dy)
+        else:
+            self._parallel(self._advance_rows)   # 新值写入 A⁻ 缓冲，条带间只读 A，无需再同步
+        self._Px, self._Px_prev = self._Px_prev, self._Px
+        self._Py, self._Py_prev = self._Py_prev, self._Py
+
+    def step(self, n=1):
+        if self.tile is None:
+            return super().step(n)
+        while n > 0:
+            m = min(n, self.time_block)
+            if self.diag_every:
+                m = min(m, self.diag_every - self.n % self.diag_every)
+            self._advance_tiled(m)
+            self.n += m
+            n -= m
+            if self.diag_every and self.n % self.diag_every == 0:
+                self.diagnose()
+        return self
+
+    def _advance_tiled(self, h):
+        """分块连推 h 步：读 (A, A⁻)，把 (A^{n+h}, A^{n+h−1}) 写进 _next，再交换引用"""
+        self._h = h
+        self._parallel(self._tile_rows)
+        nx_, ny_, npx, npy = self._next
+        self._next = [self._Px, self._Py, self._Px_prev, self._Py_prev]
+        self._Px, self._Py, self._Px_prev, self._Py_prev = nx_, ny_, npx, npy
+
+    def _tile_rows(self, r0, r1):
+        k = (self.c*self.dt)**2
+        h = self._h
+        bx, by = self.tile
+        bufP, bufQ, bufL = self._tile_bufs[r0]
+        outs = [st.interior(P) for P in self._next]
+        for i0 in range(r0, r1, bx):
+            i1 = min(i0 + bx, r1)
+            for j0 in range(0, self.Ny, by):
+                j1 = min(j0 + by, self.Ny)
+                mx, my = i1 - i0 + 2*h, j1 - j0 + 2*h
+                for A, A_prev, out, out_prev in ((self.Ax, self.Ax_prev, outs[0], outs[2]),
+                                                 (self.Ay, self.Ay_prev, outs[1], outs[3])):
+                    P = st.gather_periodic(A, i0 - h, i1 + h, j0 - h, j1 + h, bufP[..., :mx, :my])
+                    Q = st.gather_periodic(A_prev, i0 - h, i1 + h, j0 - h, j1 + h, bufQ[..., :mx, :my])
+                    lap = bufL[..., :mx - 2, :my - 2]
+                    for _ in range(h):
+                        # 与 _advance_rows 相同的运算次序；块缓冲的外圈充当幽灵格，每步有效区缩一格
+                        st.laplacian(P, lap, self.dx, periodic=True, dy=self.dy)
+                        lap *= k
+                        Qi, Pi = st.interior(Q), st.interior(P)
+                        Qi *= -1.0
+                        Qi += Pi
+                        Qi += Pi
+                        Qi += lap
+                        P, Q = Q, P
+                    out[..., i0:i1, j0:j1] = P[..., h:-h, h:-h]
+                    out_prev[..., i0:i1, j0:j1] = Q[..., h:-h, h:-h]
+
+    def _advance_rows(self, r0, r1):
+        k = (self.c*self.dt)**2
+        for P, P_prev in ((self._Px, self._Px_prev), (self._Py, self._Py_prev)):
+            # 就地：A⁻ ← 2A − A⁻ + k∇²A，随后交换引用即完成一步
+            lap = self.backend.laplacian_rows(P, self._lap[..., r0:r1, :], r0, r1, self.dx,
+                                              periodic=True, dy=self.dy)
+            lap *= k
+            A = st.interior(P)[..., r0:r1, :]
+            A_prev = st.interior(P_prev)[..., r0:r1, :]
+            A_prev *= -1.0
+            A_prev += A
+            A_prev += A
+            A_prev += lap
+
+    def set_initial(self, Ax, Ay, Vx=None, Vy=None):
+        self.Ax[:] = Ax
+        self.Ay[:] = Ay
+        self.Ax_prev[:] = self.Ax if Vx is None else self.Ax - self.dt*Vx
+        self.Ay_prev[:] = self.Ay if Vy is None else self.Ay - self.dt*Vy
+        return self
+
+    def state_dict(self):
+        state = super().state_dict()
+        state.update(Ax_prev=self.Ax_prev.copy(), Ay_prev=self.Ay_prev.copy())
+        return state
+
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        self.Ax_prev[...] = state["Ax_prev"]
+        self.Ay_prev[...] = state["Ay_prev"]
+        return self
+
+    def velocities(self):
+        inv_dt = 1.0 / self.dt
+        np.subtract(self.Ax, self.Ax_prev, out=self._Vx); self._Vx *= inv_dt
+        np.subtract(self.Ay, self.Ay_prev, out=self._Vy); self._Vy *= inv_dt
+        return self._Vx, self._Vy
+
+
+class AbsorbingGaugeSolver(GaugeSolver):
+    """
+    吸收边界 + 外源驱动的二维规范场：
+      V⁺ = [(1 − γdt/2)V + dt(c²∇²A + S)] / (1 + γdt/2),   A⁺ = A + dt·V⁺
+    外源 S 由 sources（sources.Source 列表或 SourceSet）给出，稀疏注入；
+    未给出时沿用原脚本的中心正弦点源 drive_amp·sin(drive_omega·t)（位于 source_pos，Ax 分量）。
+    批量时 drive_amp / drive_omega 可为长度 B 的数组，每个成员各自的外源一次注入。
+
+    boundary 选择边界层：
+      * "sponge"：三次方阻尼斜坡 γ（原脚本的海绵层，宽 sponge_width）；
+      * "pml"   ：完美匹配层（复坐标拉伸的非分裂辅助场形式，Grote & Sim 2010），宽 pml_width：
+            A_tt + (ζx+ζy)A_t + ζxζy A = c²∇²A + ∇·ψ + S
+            ψx_t = −ζx ψx + c²(ζy−ζx)∂xA,   ψy_t = −ζy ψy + c²(ζx−ζy)∂yA
+        ψ 放在半格点（网格面）上，∇·ψ 与 5 点拉普拉斯同样紧凑；外侧为 A=0。
+        吸收系数 ζ = ζmax·(d/w)^order，ζmax = (order+1)·c·ln(1/R)/(2·w·h)，x、y 方向分别取 h = dx、dy。
+    """
+    periodic = False
+
+    def __init__(self, Nx=96, Ny=96, Lx=9.6, Ly=9.6, c=1.0, cfl=0.65,
+                 sponge_width=12, gamma_max=2.5,
+                 boundary="sponge", pml_width=6, pml_order=2, pml_R=1e-2,
+                 drive_amp=1.5, drive_omega=1.0, source_pos=None, sources=None,
+                 seed=None, diag_every=0,
+                 batch=None, threads=None, dtype=np.float64, accum_dtype=np.float64, backend="numpy"):
+        dx, dy = Lx / Nx, Ly / Ny
+        dt = st.cfl_dt(cfl, c, dx, dy)  # CFL
+        super().__init__(Nx, Ny, dx, dy, dt, c=c, seed=seed, diag_every=diag_every, batch=batch,
+                         threads=threads, dtype=dtype, accum_dtype=accum_dtype, backend=backend)
+        self.Vx = np.zeros_like(self.Ax)
+        self.Vy = np.zeros_like(self.Ay)
+        self._lap_y = np.zeros(self.shape, dtype=self.dtype)    # Ay 的拉普拉斯（两阶段更新需同时保留两个分量）
+
+        # ===== 吸收边界 =====
+        self.boundary = boundary
+        if boundary == "sponge":
+            w = sponge_width
+            gx = self.ramp_1d(Nx, w, gamma_max)[:, None]
+            gy = self.ramp_1d(Ny, w, gamma_max)[None, :]
+            self.gamma = np.maximum(gx, gy)
+        elif boundary == "pml":
+            w = pml_width
+            self._init_pml(w, pml_order, pml_R)
+            self.gamma = self._zx_c[:, None] + self._zy_c[None, :]   # V 方程中的总阻尼 ζx+ζy
+        else:
+            raise ValueError(f"未知的边界类型：{boundary!r}（可选 'sponge' 或 'pml'）")
+        self.sponge_width = w
+        # 半隐式阻尼的两个系数场预先算好：V⁺ = damp·V + gain·(c²∇²A + … + S)
+        # 系数先按 float64 计算，再转成存储精度
+        den = (1 + 0.5*self.gamma*dt)
+        self._damp = ((1 - 0.5*self.gamma*dt) / den).astype(self.dtype)
+        self._gain = (dt / den).astype(self.dtype)
+        self.gamma = self.gamma.astype(self.dtype)
+
+        self.mask_inner = np.ones((Nx, Ny), dtype=bool)
+        self.mask_inner[:w, :] = self.mask_inner[-w:, :] = False
+        self.mask_inner[:, :w] = self.mask_inner[:, -w:] = False
+        self.inner = (slice(w, Nx - w), slice(w, Ny - w))
+
+        # ===== 外源 =====
+        self.cx, self.cy = (Nx//2, Ny//2) if source_pos is None else source_pos
+        self.drive_amp = np.asarray(drive_amp, dtype=float)
+        self.drive_omega = np.asarray(drive_omega, dtype=float)
+        if sources is None:
+            sources = [Source(point(self.cx, self.cy), Sine(self.drive_amp, self.drive_omega))
+                       ] if np.any(self.drive_amp != 0) else []
+        if not isinstance(sources, SourceSet):
+            sources = SourceSet(sources)
+        self.sources = sources.bind((Nx, Ny), self.shape[:-2])
+
+        # 融合后端（海绵层）：一次遍历算出 V⁺ 并把 A⁺ 写进另一组缓冲，随后交换引用
+        self._fused = self.backend.fused and boundary == "sponge"
+        if self._fused:
+            self._Px_out = st.padded(self.shape, self.dtype)
+            self._Py_out = st.padded(self.shape, self.dtype)
+
+    @staticmethod
+    def ramp_1d(n, w, m):
+        d = np.minimum(np.arange(n), np.arange(n)[::-1])
+        g = np.clip((w - d)/w, 0.0, 1.0)**3
+        return m*g
+
+    @staticmethod
+    def pml_profile(n, w, zeta_max, order, faces=False):
+        """PML 吸收系数：格心（faces=False，n 个）或网格面（faces=True，n+1 个）处的 ζ"""
+        x = np.arange(n + 1, dtype=float) if faces else np.arange(n) + 0.5
+        d = np.maximum(np.maximum(w - x, x - (n - w)), 0.0) / w
+        return zeta_max * d**order
+
+    def _init_pml(self, w, order, R):
+        Nx, Ny, dx, dy, dt, c = self.Nx, self.Ny, self.dx, self.dy, self.dt, self.c
+        zmax_x = (order + 1) * c * np.log(1.0 / R) / (2 * w * dx)
+        zmax_y = (order + 1) * c * np.log(1.0 / R) / (2 * w * dy)
+        zx_c = self.pml_profile(Nx, w, zmax_x, order)
+        zy_c = self.pml_profile(Ny, w, zmax_y, order)
+        zx_f = self.pml_profile(Nx, w, zmax_x, order, faces=True)
+        zy_f = self.pml_profile(Ny, w, zmax_y, order, faces=True)
+        self._zx_c, self._zy_c = zx_c, zy_c
+        self._zxy = (zx_c[:, None] * zy_c[None, :]).astype(self.dtype)   # ζxζy（格心）
+        # ψx 在 x 面 (Nx+1, Ny)，ψy 在 y 面 (Nx, Ny+1)；同样半隐式处理自身的衰减
+        zx, zy = np.meshgrid(zx_f, zy_c, indexing='ij')
+        f = self.dtype
+        self._psx_damp = ((1 - 0.5*zx*dt) / (1 + 0.5*zx*dt)).astype(f)
+        self._psx_gain = (dt * c**2 * (zy - zx) / (1 + 0.5*zx*dt) / dx).astype(f)
+        zx, zy = np.meshgrid(zx_c, zy_f, indexing='ij')
+        self._psy_damp = ((1 - 0.5*zy*dt) / (1 + 0.5*zy*dt)).astype(f)
+        self._psy_gain = (dt * c**2 * (zx - zy) / (1 + 0.5*zy*dt) / dy).astype(f)
+        lead = self.shape[:-2]
+        self.psi = {name: np.zeros((*lead, Nx + 1, Ny), dtype=f) if name.endswith("x") else
+                    np.zeros((*lead, Nx, Ny + 1), dtype=f)
+                    for name in ("Ax_x", "Ax_y", "Ay_x", "Ay_y")}
+        self._dfx = np.zeros((*lead, Nx + 1, Ny), dtype=f)        # 面上差分的工作缓冲
+        self._dfy = np.zeros((*lead, Nx, Ny + 1), dtype=f)
+
+    def source(self, n):
+        """第 n 步各外源的幅度，形状 (*batch, 源个数)"""
+        return self.sources.amplitudes(n * self.dt)
+
+    def _advance(self):
+        self._fill_ghosts()
+        if self._fused:
+            self._advance_fused()
+            return
+        # 阶段 1：各条带读 A（含相邻条带的 halo 行）算 c²∇²A；阶段 2：各条带只写自己的行
+        self._parallel(self._laplacian_rows)
+        self.sources.inject(self._lap, self._lap_y, self.n * self.dt)  # 稀疏注入：只改源所在的格点
+        self._parallel(self._update_rows)
+        if self.boundary == "pml":
+            # 阶段 3：用新的 A 推进面上的辅助场 ψ（x 面会读到上一条带的最后一行）
+            self._parallel(self._psi_rows)
+
+    def _advance_fused(self):
+        c2 = self.c**2
+        for P, V, out in ((self._Px, self.Vx, self._Px_out), (self._Py, self.Vy, self._Py_out)):
+            self.backend.damped_wave_step(P, V, out, self._damp, self._gain, c2, self.dt, self.dx,
+                                          self.dy)
+        self._Px, self._Px_out = self._Px_out, self._Px
+        self._Py, self._Py_out = self._Py_out, self._Py
+        # 外源是线性项：V⁺ += gain·S，A⁺ += dt·gain·S，只动源所在的格点
+        for comp, ti, tj, vals in self.sources.values(self.n * self.dt):
+            vals = vals * self._gain[ti, tj]
+            (self.Vx, self.Vy)[comp][..., ti, tj] += vals
+            vals *= self.dt
+            st.interior((self._Px, self._Py)[comp])[..., ti, tj] += vals
+
+    def _laplacian_rows(self, r0, r1):
+        pml = self.boundary == "pml"
+        for P, lap, comp in ((self._Px, self._lap, "Ax"), (self._Py, self._lap_y, "Ay")):
+            if pml:
+                # 幽灵格为 0 即 Dirichlet 外边界，边界格也参与计算（不清零）
+                lap = self.backend.laplacian_rows(P, lap[..., r0:r1, :], r0, r1, self.dx,
+                                                  periodic=True, dy=self.dy)
+            else:
+                lap = self.backend.laplacian_rows(P, lap[..., r0:r1, :], r0, r1, self.dx,
+                                                  periodic=False, dy=self.dy)
+            lap *= self.c**2
+            if pml:
+                w = self._w1[..., r0:r1, :]
+                psx, psy = self.psi[comp + "_x"], self.psi[comp + "_y"]
+                # ∇·ψ（面 → 格心）
+                np.subtract(psx[..., r0 + 1:r1 + 1, :], psx[..., r0:r1, :], out=w)
+                w *= 1.0 / self.dx; lap += w
+                np.subtract(psy[..., r0:r1, 1:], psy[..., r0:r1, :-1], out=w)
+                w *= 1.0 / self.dy; lap += w
+                # −ζxζy A
+                np.multiply(st.interior(P)[..., r0:r1, :], self._zxy[r0:r1], out=w)
+                lap -= w
+
+    def _psi_rows(self, r0, r1):
+        f1 = r1 + 1 if r1 == self.Nx else r1      # 最后一个 x 面归最后一个条带
+        for P, comp in ((self._Px, "Ax"), (self._Py, "Ay")):
+            psx, psy = self.psi[comp + "_x"], self.psi[comp + "_y"]
+            # x 面 f 位于格 f−1 与 f 之间：A[f] − A[f−1]（幽灵格提供 A[−1] = A[Nx] = 0）
+            d = self._dfx[..., r0:f1, :]
+            np.subtract(P[..., r0 + 1:f1 + 1, 1:-1], P[..., r0:f1, 1:-1], out=d)
+            d *= self._psx_gain[r0:f1]
+            ps = psx[..., r0:f1, :]
+            ps *= self._psx_damp[r0:f1]
+            ps += d
+            # y 面：只用本条带的行
+            d = self._dfy[..., r0:r1, :]
+            np.subtract(P[..., r0 + 1:r1 + 1, 1:], P[..., r0 + 1:r1 + 1, :-1], out=d)
+            d *= self._psy_gain[r0:r1]
+            ps = psy[..., r0:r1, :]
+            ps *= self._psy_damp[r0:r1]
+            ps += d
+
+    def _update_rows(self, r0, r1):
+        rows = slice(r0, r1)
+        damp, gain = self._damp[rows], self._gain[rows]
+        for P, V, lap in ((self._Px, self.Vx, self._lap), (self._Py, self.Vy, self._lap_y)):
+            self.backend.damped_update(st.interior(P)[..., rows, :], V[..., rows, :],
+                                       lap[..., rows, :], damp, gain, self.dt)
+
+    def set_initial(self, Ax, Ay, Vx=None, Vy=None):
+        self.Ax[:] = Ax
+        self.Ay[:] = Ay
+        self.Vx[:] = 0.0 if Vx is None else Vx
+        self.Vy[:] = 0.0 if Vy is None else Vy
+        return self
+
+    def state_dict(self):
+        state = super().state_dict()
+        state.update(Vx=self.Vx.copy(), Vy=self.Vy.copy())
+        if self.boundary == "pml":
+            state.update({f"psi_{k}": v.copy() for k, v in self.psi.items()})
+        return state
+
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        self.Vx[...] = state["Vx"]
+        self.Vy[...] = state["Vy"]
+        if self.boundary == "pml":
+            for k, v in self.psi.items():
+                v[...] = state[f"psi_{k}"]
+        return self
+
+    def velocities(self):
+        return self.Vx, self.Vy
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+history.py
+长时间运行时能量曲线的显示：每帧的开销固定，与已经运行的步数无关。
+  * MinMaxDecimator：固定容量的分桶缓冲。每个桶保存各条曲线的最小 / 最大值及其横坐标，
+    满 2·bins 个桶时相邻两桶合并、桶宽加倍（均摊每个样本 O(1)）；显示时每个桶给出两个点，
+    尖峰与振荡包络不会因抽样丢失，曲线最多 4·bins + 2 个点；
+  * LiveCurves：把抽样结果写入 Line2D；坐标轴范围只在数据越界时按倍数扩大，
+    范围变化时整幅重画一次，其余帧只重画曲线本身，可配合 FuncAnimation(blit=True)。
+"""
+import numpy as np
+
+
+class MinMaxDecimator:
+    """
+    n_series 条共用横坐标的曲线的最小 / 最大值抽样。
+    append(x, ys) 逐点追加（x 单调不减），series() 给出每条曲线的 (x, y) 显示点。
+    """
+
+    def __init__(self, n_series, bins=1024):
+        self.bins = int(bins)
+        cap = 2 * self.bins
+        self.width = 1                                  # 每个完整桶覆盖的样本数
+        self.count = 0                                  # 完整桶数
+        self.samples = 0
+        self.lo = np.empty((cap, n_series)); self.x_lo = np.empty((cap, n_series))
+        self.hi = np.empty((cap, n_series)); self.x_hi = np.empty((cap, n_series))
+        # 正在填充的桶
+        self._lo = np.empty(n_series); self._x_lo = np.empty(n_series)
+        self._hi = np.empty(n_series); self._x_hi = np.empty(n_series)
+        self._n = 0
+        self.y_min = np.full(n_series, np.inf)          # 全程极值（坐标轴范围用）
+        self.y_max = np.full(n_series, -np.inf)
+        self.x_first = self.x_last = None
+
+    def __len__(self):
+        return self.samples
+
+    def append(self, x, ys):
+        ys = np.asarray(ys, dtype=np.float64).reshape(-1)
+        if self._n == 0:
+            self._lo[:] = ys; self._x_lo[:] = x
+            self._hi[:] = ys; self._x_hi[:] = x
+        else:
+            m = ys < self._lo
+            self._lo[m] = ys[m]; self._x_lo[m] = x
+            m = ys > self._hi
+            self._hi[m] = ys[m]; self._x_hi[m] = x
+        np.minimum(self.y_min, ys, out=self.y_min)
+        np.maximum(self.y_max, ys, out=self.y_max)
+        if self.x_first is None:
+            self.x_first = x
+        self.x_last = x
+        self.samples += 1
+        self._n += 1
+        if self._n == self.width:
+            self._push()
+
+    def _push(self):
+        k = self.count
+        self.lo[k] = self._lo; self.x_lo[k] = self._x_lo
+        self.hi[k] = self._hi; self.x_hi[k] = self._x_hi
+        self.count += 1
+        self._n = 0
+        if self.count == len(self.lo):
+            self._merge()
+
+    def _merge(self):
+        """相邻两桶合并为一个：桶数减半、桶宽加倍"""
+        for v, xv, pick in ((self.lo, self.x_lo, np.less_equal), (self.hi, self.x_hi, np.greater_equal)):
+            a, b = v[0::2], v[1::2]
+            first = pick(a, b)                          # 相等时保留靠前的点
+            xv[:self.bins] = np.where(first, xv[0::2], xv[1::2])
+            v[:self.bins] = np.where(first, a, b)
+        self.count = self.bins
+        self.width *= 2
+
+    def series(self):
+        """每条曲线的显示点 [(x, y), …]：每个桶按横坐标先后给出最小、最大两个点"""
+        k = self.count
+        lo, x_lo, hi, x_hi = self.lo[:k], self.x_lo[:k], self.hi[:k], self.x_hi[:k]
+        if self._n:
+            lo = np.concatenate([lo, self._lo[None]]); x_lo = np.concatenate([x_lo, self._x_lo[None]])
+            hi = np.concatenate([hi, self._hi[None]]); x_hi = np.concatenate([x_hi, self._x_hi[None]])
+        lo_first = x_lo <= x_hi
+        xs = np.empty((2 * len(lo), lo.shape[1]))
+        ys = np.empty_like(xs)
+        xs[0::2] = np.where(lo_first, x_lo, x_hi); xs[1::2] = np.where(lo_first, x_hi, x_lo)
+        ys[0::2] = np.where(lo_first, lo, hi);     ys[1::2] = np.where(lo_first, hi, lo)
+        return [(xs[:, s], ys[:, s]) for s in range(xs.shape[1])]
+
+
+class LiveCurves:
+    """
+    绑定到一个坐标轴上的若干条实时曲线。
+    update(x, *ys) 追加一点并刷新曲线；坐标轴范围变化时调用 canvas.draw() 重画整幅，
+    使 blit 的背景（刻度、网格）随之更新；返回范围是否变化。
+    """
+
+    def __init__(self, ax, lines, bins=1024, grow=2.0, margin=0.1, redraw=True):
+        self.ax, self.lines = ax, list(lines)
+        self.data = MinMaxDecimator(len(self.lines), bins)
+        self.grow, self.margin, self.redraw = grow, margin, redraw
+        self.xlim = self.ylim = None
+        self.redraws = 0
+
+    def update(self, x, *ys):
+        d = self.data
+        d.append(x, ys)
+        for line, (xs, yv) in zip(self.lines, d.series()):
+            line.set_data(xs, yv)
+        changed = self._limits()
+        if changed and self.redraw:
+            self.ax.figure.canvas.draw()
+            self.redraws += 1
+        return changed
+
+    def _limits(self):
+        d = self.data
+        changed = False
+        x0, x1 = d.x_first, d.x_last
+        if self.xlim is None or x1 > self.xlim[1]:
+            span = max(x1 - x0, 1)
+            self.xlim = (x0, x0 + self.grow * span)
+            self.ax.set_xlim(*self.xlim)
+            changed = True
+        y0, y1 = float(np.min(d.y_min)), float(np.max(d.y_max))
+        if not (np.isfinite(y0) and np.isfinite(y1)):
+            return changed
+        if self.ylim is None or y0 < self.ylim[0] or y1 > self.ylim[1]:
+            span = max(y1 - y0, 1e-6 * max(abs(y0), abs(y1)), 1e-12)
+            lo, hi = y0 - self.margin * span, y1 + self.margin * span
+            if self.ylim is not None:
+                # 越界的一侧至少把范围扩大 grow 倍，缓慢漂移的曲线只触发 O(log) 次重画
+                lo0, hi0 = self.ylim
+                width = (self.grow - 1.0) * (hi0 - lo0)
+                lo = min(lo, lo0 - width if y0 < lo0 else lo0)
+                hi = max(hi, hi0 + width if y1 > hi0 else hi0)
+            self.ylim = (lo, hi)
+            self.ax.set_ylim(*self.ylim)
+            changed = True
+        return changed
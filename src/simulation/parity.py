@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+parity.py
+宇称不守恒动画（parity_violation_*.py）共用的模型与逐帧数据：
+  * parity_distributions(theta, a)：守恒 cos²θ + 0.5 与不守恒 (cos²θ + 0.5)(1 + a·cosθ) 两种角分布，
+    a 可以是数组（与 theta 广播）；
+  * FrameTable：一次向量化算出所有帧的 a(t)、呼吸尺度、光晕脉冲以及 (帧数 × n_theta) 的曲线表，
+    动画每帧只取一行，不再逐帧求 cos 与整条分布；
+  * BlitRenderer / render_frames：Agg 画布上的 blit 渲染，静态部分（坐标轴、网格、字幕）只画一次并缓存为背景，
+    每帧恢复背景后只画动态元素，产出 (H, W, 3) uint8 帧，供 frame_encoder 的录制器直接写出。
+动态文字（a 的数值等）一律放在坐标轴内部的 Text 里：标题在 blit 区域之外，逐帧修改标题会使 blit 失效。
+"""
+import numpy as np
+
+
+def parity_distributions(theta, a=0.6):
+    # 守恒：cos²θ + 0.5；不守恒：乘以 (1 + a cosθ)
+    pc = np.cos(theta)**2 + 0.5
+    pv = pc * (1 + a * np.cos(theta))
+    return pc, pv
+
+
+class FrameTable:
+    """
+    frames 帧的往返动画（t = i / frames ∈ [0, 1)）：
+      a(t)     = a_min + (a_max − a_min)·(½ − ½cos 2πt)   余弦缓动的不对称参数
+      scale(t) = 1 + breath·sin 2πt                        呼吸尺度
+      pulse(t) = ½ + ½sin 2πt                              光晕脉冲
+    pc[i]、pv[i] 为第 i 帧已乘上呼吸尺度的守恒 / 不守恒曲线（形状 (frames, n_theta)）。
+    """
+
+    def __init__(self, frames, n_theta=1200, a_min=0.0, a_max=0.8, breath=0.06):
+        self.frames = int(frames)
+        self.a_min, self.a_max, self.breath = float(a_min), float(a_max), float(breath)
+        self.theta = np.linspace(0, 2*np.pi, n_theta)
+        t = np.arange(self.frames) / self.frames
+        self.t = t
+        self.a = self.a_min + (self.a_max - self.a_min) * (0.5 - 0.5*np.cos(2*np.pi*t))
+        self.scale = 1.0 + self.breath * np.sin(2*np.pi*t)
+        self.pulse = 0.5 + 0.5*np.sin(2*np.pi*t)
+        # 整张表两次广播运算：(F, 1) × (1, n_theta)
+        self.pc_ref, _ = parity_distributions(self.theta, a=0.0)
+        cos = np.cos(self.theta)
+        self.pc = self.pc_ref * self.scale[:, None]
+        self.pv = self.pc_ref * (1 + self.a[:, None] * cos)
+        self.pv *= self.scale[:, None]
+
+    def __len__(self):
+        return self.frames
+
+    @property
+    def strength(self):
+        """a / a_max ∈ [0, 1]：箭头粗细、透明度随之增强"""
+        return self.a / max(self.a_max, 1e-9)
+
+    def labels(self, fmt="a = {:.2f}"):
+        """每帧的参数文字"""
+        return [fmt.format(v) for v in self.a]
+
+
+class BlitRenderer:
+    """
+    blit 方式逐帧渲染 fig（画布须为 Agg 系）：构造时把 artists 设为动态、整幅画一次静态背景并缓存，
+    之后 render(i) 只做 restore_region → update(i) → 画 artists。update(i) 须设置 artists 的全部动态属性，
+    使每帧画面只由帧号决定（与先前渲染过哪些帧无关，可分块并行渲染）。
+    """
+
+    def __init__(self, fig, artists, update):
+        self.fig, self.artists, self.update = fig, tuple(artists), update
+        canvas = fig.canvas
+        for a in self.artists:
+            a.set_animated(True)
+        canvas.draw()
+        self.background = canvas.copy_from_bbox(fig.bbox)
+        self._buf = np.asarray(canvas.buffer_rgba())
+        self.height, self.width = self._buf.shape[:2]
+
+    def render(self, i):
+        """第 i 帧的 (H, W, 3) uint8 画面（画布缓冲的视图，下一帧会覆盖）"""
+        self.fig.canvas.restore_region(self.background)
+        self.update(i)
+        for a in self.artists:
+            self.fig.draw_artist(a)
+        return self._buf[..., :3]
+
+
+def render_frames(fig, artists, update, frames):
+    """依次产出 frames 中各帧的画面（见 BlitRenderer）"""
+    r = BlitRenderer(fig, artists, update)
+    for i in frames:
+        yield r.render(i)
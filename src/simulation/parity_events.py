@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+parity_events.py
+按宇称角分布（parity.parity_distributions）抽样 β 衰变电子发射角的蒙特卡罗事件源：
+  * 逆 CDF 表：对解析 CDF 向量化求根（牛顿 + 二分保护）得到等距 u 网格（2¹⁶ 段）上的 θ(u)，每个 a 只建一次并缓存；
+    抽样时 θ = 表[k] + frac·斜率[k]（k = ⌊u·M⌋），每个事件只有几次向量化的乘加与查表，没有二分查找。
+    密度趋于 0 处（|a| = 1 时 θ = π 附近、立体角测度的两极）θ(u) 斜率发散、线性插值不准，
+    建表时标出段中点误差超过 1e-7 rad 的段，落在这些段里的少数事件再对解析 CDF 求精确解；
+  * generate_events：按块流式产出事件，整个过程只用固定的几块缓冲（内存与总事件数无关）；
+    同一个种子下结果与块大小无关；
+  * AngleHistogram：等宽分箱的累加器（整数化下标 + bincount），附前后向计数与不对称参数的估计。
+角度的两种测度：
+  plane=True（缺省）  θ ∈ [0, 2π)，密度 ∝ I(θ)，即极坐标图上画出的曲线；
+  plane=False         θ ∈ [0, π]，密度 ∝ I(θ)·sinθ（三维发射、立体角测度，对应吴健雄实验的 cosθ 分布）。
+用法示例：
+  hist = AngleHistogram(360)
+  for theta in generate_events(10**8, a=0.6, seed=1):
+      hist.add(theta)
+  print(hist.estimate_a())
+"""
+import numpy as np
+
+from parity import parity_distributions
+
+TABLE_SIZE = 1 << 16                      # 逆 CDF 表的段数 M
+REFINE_TOL = 1e-7                         # 段中点的线性插值误差超过它（rad）时，该段内的事件精确求逆
+_CACHE = {}
+_CACHE_MAX = 64
+
+
+def angle_cdf(theta, a=0.6, plane=True):
+    """
+    I(θ) = (cos²θ + 0.5)(1 + a·cosθ) 的累积分布（已归一化）。
+    plane：∫₀^θ I = θ + sin2θ/4 + a(1.5 sinθ − sin³θ/3)，总量 2π；
+    立体角：μ = cosθ，∫_μ^1 (m² + ½)(1 + a·m) dm，总量 5/3。
+    """
+    theta = np.asarray(theta, dtype=np.float64)
+    if plane:
+        s = np.sin(theta)
+        return (theta + np.sin(2*theta)/4 + a*(1.5*s - s**3/3)) / (2*np.pi)
+
+    def prim(m):
+        return m**3/3 + m/2 + a*(m**4/4 + m**2/4)
+    return (prim(1.0) - prim(np.cos(theta))) / (5.0/3.0)
+
+
+def angle_pdf(theta, a=0.6, plane=True):
+    """与 angle_cdf 对应的归一化密度"""
+    _, pv = parity_distributions(theta, a=a)
+    if plane:
+        return pv / (2*np.pi)
+    return pv * np.sin(theta) / (5.0/3.0)
+
+
+def _invert(u, a, plane, lo, hi, tol=1e-13, iters=200):
+    """
+    在区间 [lo, hi]（须包住解）内向量化求解 angle_cdf(θ) = u：
+    牛顿迭代，跳出当前区间（或密度为 0）时改用二分；只对尚未收敛的元素继续迭代。
+    """
+    u = np.asarray(u, dtype=np.float64)
+    lo = np.array(np.broadcast_to(lo, u.shape), dtype=np.float64)
+    hi = np.array(np.broadcast_to(hi, u.shape), dtype=np.float64)
+    theta = 0.5 * (lo + hi)
+    idx = np.arange(u.size)
+    for _ in range(iters):
+        t, l, h = theta[idx], lo[idx], hi[idx]
+        r = angle_cdf(t, a, plane) - u[idx]
+        below = r < 0
+        l = np.where(below, t, l)
+        h = np.where(below, h, t)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tn = t - r / angle_pdf(t, a, plane)
+        tn = np.where((tn > l) & (tn < h), tn, 0.5 * (l + h))
+        theta[idx], lo[idx], hi[idx] = tn, l, h
+        idx = idx[(np.abs(tn - t) > tol) & (h - l > tol)]
+        if idx.size == 0:
+            break
+    return theta
+
+
+def inverse_cdf_table(a=0.6, plane=True):
+    """
+    (M + 1) 点的逆 CDF 表 θ(u_j)，u_j = j/M；同一 (a, plane) 只建一次（最多缓存 64 个 a）。
+    返回 (表, 斜率, 求精段)：斜率[j] = 表[j+1] − 表[j]；求精段为长 M 的布尔掩码，标出需要精确求逆的段（没有时为 None）。
+    """
+    key = (float(a), bool(plane))
+    hit = _CACHE.get(key)
+    if hit is not None:
+        return hit
+    if not -1.0 <= a <= 1.0:
+        raise ValueError(f"不对称参数须在 [-1, 1] 内（密度非负）：a = {a}")
+    M = TABLE_SIZE
+    hi = 2*np.pi if plane else np.pi
+    # 初始区间取自细 θ 网格上的 CDF 值
+    grid = np.linspace(0.0, hi, M + 1)
+    F = np.maximum.accumulate(angle_cdf(grid, a, plane))
+    u = np.linspace(0.0, 1.0, M + 1)
+    j = np.clip(np.searchsorted(F, u) - 1, 0, M - 1)
+    table = _invert(u, a, plane, grid[j], grid[j + 1])
+    table[0], table[-1] = 0.0, hi
+    slope = np.diff(table)
+    # 段中点的精确解与线性插值之差
+    mid = _invert((np.arange(M) + 0.5) / M, a, plane, table[:-1], table[1:])
+    err = np.abs(table[:-1] + 0.5*slope - mid)
+    refine = err > REFINE_TOL
+    refine = refine if refine.any() else None
+    for arr in (table, slope) + ((refine,) if refine is not None else ()):
+        arr.flags.writeable = False
+    if len(_CACHE) >= _CACHE_MAX:
+        _CACHE.pop(next(iter(_CACHE)))           # 丢掉最早建的表
+    _CACHE[key] = (table, slope, refine)
+    return _CACHE[key]
+
+
+def generate_events(n_events, a=0.6, chunk=1 << 20, seed=None, plane=True, rng=None):
+    """
+    流式产出 n_events 个发射角，每块最多 chunk 个（float64 视图，下一块会覆盖；需要保留时请 copy）。
+    缓冲共 chunk·(8 + 8 + 8) 字节（|a| = 1 等需要求精的情形另加一个同长的布尔掩码），与 n_events 无关。
+    """
+    table, slope, refine = inverse_cdf_table(a, plane)
+    rng = np.random.default_rng(seed) if rng is None else rng
+    chunk = int(min(chunk, max(n_events, 1)))
+    u = np.empty(chunk)
+    tmp = np.empty(chunk)
+    k = np.empty(chunk, dtype=np.intp)
+    done = 0
+    while done < n_events:
+        m = min(chunk, n_events - done)
+        uu, tt, kk = u[:m], tmp[:m], k[:m]
+        rng.random(out=uu)
+        uu *= TABLE_SIZE
+        np.copyto(kk, uu, casting="unsafe")      # 截尾取整 = ⌊u·M⌋（u ≥ 0）
+        uu -= kk                                 # 段内位置 frac ∈ [0, 1)
+        bad = None
+        if refine is not None:
+            bad = np.flatnonzero(refine[kk])
+            kb = kk[bad]
+            ub = (kb + uu[bad]) / TABLE_SIZE
+        np.take(slope, kk, out=tt)
+        tt *= uu
+        np.take(table, kk, out=uu)
+        uu += tt
+        if bad is not None and len(bad):
+            uu[bad] = _invert(ub, a, plane, table[kb], table[kb + 1])
+        done += m
+        yield uu
+
+
+class AngleHistogram:
+    """
+    [lo, hi) 上 bins 个等宽箱的事件计数（int64）；add 可反复调用，逐块累加。
+    缺省范围与 generate_events 的两种测度对应：plane → [0, 2π)，否则 [0, π]（θ = π 计入最后一箱）。
+    """
+
+    def __init__(self, bins=360, plane=True):
+        self.bins = int(bins)
+        self.plane = plane
+        self.lo, self.hi = 0.0, (2*np.pi if plane else np.pi)
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self._inv_w = self.bins / (self.hi - self.lo)
+        self._idx = None
+
+    @property
+    def edges(self):
+        return np.linspace(self.lo, self.hi, self.bins + 1)
+
+    @property
+    def centers(self):
+        e = self.edges
+        return 0.5 * (e[:-1] + e[1:])
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def add(self, theta):
+        """累加一块事件（越界的事件截到两端的箱里）"""
+        n = len(theta)
+        if self._idx is None or len(self._idx) < n:
+            self._idx = np.empty(n, dtype=np.intp)
+        t = np.subtract(theta, self.lo)
+        t *= self._inv_w
+        np.clip(t, 0, self.bins - 1, out=t)
+        idx = self._idx[:n]
+        np.copyto(idx, t, casting="unsafe")
+        self.counts += np.bincount(idx, minlength=self.bins)
+        return self
+
+    def expected(self, a, n=None, plane=None):
+        """参数 a 下每箱的期望事件数（由解析 CDF 求得）"""
+        plane = self.plane if plane is None else plane
+        n = self.total if n is None else n
+        return n * np.diff(angle_cdf(self.edges, a, plane))
+
+    def forward_backward(self):
+        """
+        (N₊, N₋)：cosθ > 0（沿核自旋）与 cosθ < 0（逆核自旋）的事件数；
+        箱边须落在 θ = π/2（与 3π/2）上，即 plane 时 bins 为 4 的倍数、否则为 2 的倍数。
+        """
+        q = 4 if self.plane else 2
+        if self.bins % q:
+            raise ValueError(f"前后向计数要求箱数是 {q} 的倍数：bins = {self.bins}")
+        c = self.counts
+        if self.plane:
+            k = self.bins // 4
+            fwd = c[:k].sum() + c[3*k:].sum()
+        else:
+            fwd = c[:self.bins // 2].sum()
+        return int(fwd), int(c.sum() - fwd)
+
+    def estimate_a(self):
+        """
+        由前后不对称度 A = (N₊ − N₋)/(N₊ + N₋) 估计 a 及其统计误差：
+        plane 时 A = 7a/(3π)，立体角测度下 A = 3a/5。
+        """
+        fwd, bwd = self.forward_backward()
+        n = fwd + bwd
+        A = (fwd - bwd) / n
+        sigma_A = np.sqrt(max(1.0 - A*A, 0.0) / n)
+        k = 3*np.pi/7 if self.plane else 5.0/3.0
+        return k*A, k*sigma_A
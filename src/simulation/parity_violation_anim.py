@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from matplotlib import font_manager as fm, rcParams
 
+from parity import parity_distributions, FrameTable
+
 # ========== 样式 & 字体 ==========
 plt.style.use("dark_background")
 def set_cn():
@@ -17,13 +19,6 @@ def set_cn():
     rcParams["axes.unicode_minus"] = False
 set_cn()
 
-# ========== 角分布模型 ==========
-def parity_distributions(theta, a=0.6):
-    # 守恒：cos^2θ + 0.5； 不守恒：乘以 (1 + a cosθ)
-    pc = np.cos(theta)**2 + 0.5
-    pv = pc * (1 + a * np.cos(theta))
-    return pc, pv
-
 # ========== 画布 ==========
 theta = np.linspace(0, 2*np.pi, 1200)
 pc0, pv0 = parity_distributions(theta, a=0.0)
@@ -40,7 +35,10 @@ line_pc, = ax1.plot(theta, pc0, color="#69b3ff", lw=2.5)
 ax1.set_title("宇称守恒情况", pad=16)
 
 line_pv, = ax2.plot(theta, pv0, color="#ff6a5c", lw=2.8)
-ax2.set_title("宇称不守恒情况（β 衰变）  a=0.00", pad=16)
+ax2.set_title("宇称不守恒情况（β 衰变）", pad=16)
+# a 的数值放在轴内（标题在 blit 区域之外，逐帧修改不会刷新）
+a_label = ax2.text(0.98, 0.98, "a=0.00", transform=ax2.transAxes, ha="right", va="top",
+                   color="w", fontsize=12)
 
 # 动态箭头与标签
 spin_len = 2.2
@@ -59,24 +57,21 @@ FRAMES = 300     # 总帧数
 FPS = 30
 A_MIN, A_MAX = 0.0, 0.8
 BREATH = 0.06
-pc_ref, _ = parity_distributions(theta, a=0.0)
+# a(t)（平滑往返）、呼吸尺度与两条曲线的 (帧数 × θ) 表一次算好（见 parity.FrameTable）
+table = FrameTable(FRAMES, n_theta=len(theta), a_min=A_MIN, a_max=A_MAX, breath=BREATH)
+labels = table.labels("a={:.2f}")
 
 def animate(i):
-    t = i / FRAMES
-    a = A_MIN + (A_MAX - A_MIN) * (0.5 - 0.5*np.cos(2*np.pi*t))  # 平滑往返
-    scale = 1.0 + BREATH * np.sin(2*np.pi*t)                     # 呼吸
-
-    # 左图：守恒，仅呼吸
-    line_pc.set_ydata(pc_ref * scale)
+    scale, s = table.scale[i], table.strength[i]
 
-    # 右图：不守恒 + 呼吸
-    _, pv = parity_distributions(theta, a=a)
-    line_pv.set_ydata(pv * scale)
-    ax2.set_title(f"宇称不守恒情况（β 衰变）  a={a:.2f}", pad=16)
+    # 左图：守恒，仅呼吸；右图：不守恒 + 呼吸
+    line_pc.set_ydata(table.pc[i])
+    line_pv.set_ydata(table.pv[i])
+    a_label.set_text(labels[i])
 
     # 箭头显著性随 a 增强
-    lw = 2.0 + 3.0*(a / max(A_MAX, 1e-9))
-    alpha = 0.5 + 0.5*(a / max(A_MAX, 1e-9))
+    lw = 2.0 + 3.0*s
+    alpha = 0.5 + 0.5*s
     emit_anno.arrow_patch.set_linewidth(lw)
     emit_anno.arrow_patch.set_alpha(alpha)
     emit_label.set_alpha(alpha)
@@ -86,7 +81,7 @@ def animate(i):
     emit_anno.xy = (np.pi, emit_len * (0.95 + 0.1*scale))
     emit_label.set_position((np.pi, emit_len * (1.06 + 0.12*(scale-1))))
 
-    return line_pc, line_pv, spin_anno, emit_anno, emit_label
+    return line_pc, line_pv, spin_anno, emit_anno, emit_label, a_label
 
 ani = FuncAnimation(fig, animate, frames=FRAMES, interval=1000/FPS, blit=True)
 
@@ -2,6 +2,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import font_manager as fm, rcParams
 
+from parity import parity_distributions
+
 # plt.style.use("dark_background")
 def set_chinese_font():
     preferred = ["Microsoft YaHei", "微软雅黑", "SimHei", "黑体", "Noto Sans CJK SC", "WenQuanYi Zen Hei"]
@@ -25,12 +27,9 @@ def parity_violation_simulation():
 
     theta = np.linspace(0, 2 * np.pi, 1000)
 
-    # 理想宇称守恒情况：对称分布
-    parity_conserved = np.cos(theta)**2 + 0.5
-
-    # 宇称不守恒情况：不对称分布（基于 Wu 实验简化模型）
+    # 理想宇称守恒情况：对称分布；宇称不守恒情况：不对称分布（基于 Wu 实验简化模型，见 parity.py）
     asymmetry = 0.6  # 不对称参数
-    parity_violated = parity_conserved * (1 + asymmetry * np.cos(theta))
+    parity_conserved, parity_violated = parity_distributions(theta, a=asymmetry)
 
     # 极坐标绘图
     fig, (ax1, ax2) = plt.subplots(1, 2, subplot_kw=dict(projection='polar'))
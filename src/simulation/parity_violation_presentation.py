@@ -5,14 +5,18 @@ parity_violation_presentation.py
 用法示例：
   python parity_violation_presentation.py --record parity.mp4 --seconds 12 --fps 60 --no-show
   python parity_violation_presentation.py --record parity.gif --fps 30
+  python parity_violation_presentation.py --record parity.mp4 --seconds 12 --fps 60 --no-show --jobs 16
 """
-import os, argparse
+import os, argparse, time, itertools
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from matplotlib import font_manager as fm, rcParams
 
+from parity import FrameTable, BlitRenderer, render_frames
+from frame_encoder import RGBFrames, open_recorder
+
 # ---------- CLI ----------
 def parse_args():
     p = argparse.ArgumentParser(description="Parity Violation Presentation Animation")
@@ -26,6 +30,8 @@ def parse_args():
     p.add_argument("--amax", type=float, default=0.8, help="不对称参数最大值 A_MAX（默认0.8）")
     p.add_argument("--breath", type=float, default=0.06, help="呼吸幅度（默认0.06）")
     p.add_argument("--no-show", action="store_true", help="仅录制不弹窗")
+    p.add_argument("--jobs", type=int, default=1,
+                   help="录制时的渲染进程数（分块并行渲染，输出与单进程逐字节相同）")
     return p.parse_args()
 
 # ---------- 样式与中文字体 ----------
@@ -43,26 +49,13 @@ def set_chinese_font():
     rcParams["mathtext.default"] = "regular"
 set_chinese_font()
 
-# ---------- 角分布模型 ----------
-def parity_distributions(theta, a=0.6):
-    # 守恒：cos^2 θ + 0.5；不守恒：乘 (1 + a cos θ)
-    pc = np.cos(theta)**2 + 0.5
-    pv = pc * (1 + a * np.cos(theta))
-    return pc, pv
-
-def main():
-    args = parse_args()
-
-    # 无界面渲染（仅录制时可选）：必须在 import pyplot 前设置；此处已导入，只作为提醒
-    if args.record and args.no_show:
-        # 若需要严格无窗渲染，请把下面两行移到文件顶部（在 import pyplot 之前）
-        matplotlib.use("Agg")
-
+# ---------- 画布 ----------
+def make_figure(args, table):
+    """建立画布与全部图元；返回 (fig, update, artists)，update(i) 把第 i 帧写进 artists"""
     # Figure 尺寸（按像素与 DPI 计算英寸）
     fig_w = args.width / args.dpi
     fig_h = args.height / args.dpi
 
-    # ---------- 画布 ----------
     fig, (ax1, ax2) = plt.subplots(
         1, 2, subplot_kw=dict(projection="polar"),
         figsize=(fig_w, fig_h), constrained_layout=True
@@ -76,12 +69,10 @@ def main():
         # 更清爽的外观
         ax.set_rlabel_position(135)
 
-    # 数据与基线
-    theta = np.linspace(0, 2*np.pi, 1600)
-    pc_ref, _ = parity_distributions(theta, a=0.0)
+    theta = table.theta
 
     # 左侧：守恒（蓝）
-    line_pc, = ax1.plot(theta, pc_ref, color="#69b3ff", lw=3.0, alpha=0.95)
+    line_pc, = ax1.plot(theta, table.pc_ref, color="#69b3ff", lw=3.0, alpha=0.95)
     ax1.set_title("宇称守恒情况", pad=14)
 
     # 右侧：不守恒（红）
@@ -90,13 +81,13 @@ def main():
     glow_lws    = [10.0, 7.0, 4.5]
     glow_alphas = [0.12, 0.20, 0.35]
     glow_lines  = []
-    _, pv0 = parity_distributions(theta, a=0.0)
     for c, lw, al in zip(glow_colors, glow_lws, glow_alphas):
-        ln, = ax2.plot(theta, pv0, color=c, lw=lw, alpha=al, solid_capstyle="round")
+        ln, = ax2.plot(theta, table.pc_ref, color=c, lw=lw, alpha=al, solid_capstyle="round")
         glow_lines.append(ln)
     # 主曲线
-    line_pv, = ax2.plot(theta, pv0, color="#ff6a5c", lw=3.2, alpha=0.98)
-    title_right = ax2.set_title("宇称不守恒情况（β 衰变）  a=0.00", pad=14)
+    line_pv, = ax2.plot(theta, table.pc_ref, color="#ff6a5c", lw=3.2, alpha=0.98)
+    # 标题在 blit 区域之外，保持静态；a 的数值由轴内的 param_box 显示
+    ax2.set_title("宇称不守恒情况（β 衰变）", pad=14)
 
     # 动态箭头与标签
     spin_len = 1.2
@@ -118,83 +109,135 @@ def main():
         bbox=dict(boxstyle="round,pad=0.3", fc=(0.2,0.2,0.2,0.6), ec="#ffdd66")
     )
 
-    # 说明字幕（静态）仍然用 fig.text，但【不要】放进 animate 的返回值里
-    caption = fig.text(
+    # 说明字幕（静态）仍然用 fig.text，但【不要】放进 update 的返回值里
+    fig.text(
         0.5, 0.04,
         "吴健雄实验思想示意：β 电子更偏向与核自旋相反方向发射（宇称不守恒）",
         ha="center", va="center", color=(1,1,1,0.7), fontsize=12
     )
 
-    # ---------- 动画参数 ----------
-    total_frames = int(args.fps * args.seconds)
-    A_MIN, A_MAX = 0.0, float(args.amax)
-    BREATH = float(args.breath)
-
-    def animate(frame: int):
-        # 归一化时间 t∈[0,1)
-        t = frame / total_frames
-        # a(t) 余弦往返（平滑无尖角）
-        a_t = A_MIN + (A_MAX - A_MIN) * (0.5 - 0.5*np.cos(2*np.pi*t))
-        # 呼吸尺度
-        scale = 1.0 + BREATH * np.sin(2*np.pi*t)
-
-        # 左：守恒，仅呼吸
-        line_pc.set_ydata(pc_ref * scale)
-
-        # 右：不守恒 + 呼吸
-        _, pv = parity_distributions(theta, a=a_t)
-        pv_scaled = pv * scale
-        line_pv.set_ydata(pv_scaled)
-        for ln in glow_lines:
-            ln.set_ydata(pv_scaled)
-
-        # Glow 脉冲：alpha 随时间小幅起伏
-        pulse = 0.5 + 0.5*np.sin(2*np.pi*t)
+    # ---------- 逐帧量：全部取自预先算好的表（见 parity.FrameTable） ----------
+    strength = table.strength
+    arrow_lw = 2.2 + 3.0*strength             # 箭头显著性随 a 增强
+    arrow_alpha = 0.55 + 0.45*strength
+    glow_pulse = 0.75 + 0.5*table.pulse       # Glow 脉冲：alpha 随时间小幅起伏
+    stretch = 0.95 + 0.1*table.scale          # 轻微拉伸长度增强动感
+    label_r = emit_len*(1.06 + 0.12*(table.scale - 1))
+    labels = table.labels()
+
+    artists = (*glow_lines, line_pc, line_pv, spin_anno, emit_anno, emit_label, param_box)
+
+    # constrained_layout 每次整幅重画都会再迭代一次（画面逐帧微移），排好一次后固定下来
+    fig.canvas.draw()
+    fig.set_layout_engine("none")
+
+    def update(frame: int):
+        # 左：守恒，仅呼吸；右：不守恒 + 呼吸
+        line_pc.set_ydata(table.pc[frame])
+        pv = table.pv[frame]
+        line_pv.set_ydata(pv)
         for ln, base_alpha in zip(glow_lines, glow_alphas):
-            ln.set_alpha(base_alpha*(0.75 + 0.5*pulse))
+            ln.set_ydata(pv)
+            ln.set_alpha(base_alpha*glow_pulse[frame])
 
-        # 箭头显著性随 a 增强
-        lw = 2.2 + 3.0*(a_t / max(A_MAX, 1e-9))
-        alpha = 0.55 + 0.45*(a_t / max(A_MAX, 1e-9))
-        emit_anno.arrow_patch.set_linewidth(lw)
-        emit_anno.arrow_patch.set_alpha(alpha)
-        emit_label.set_alpha(alpha)
+        emit_anno.arrow_patch.set_linewidth(arrow_lw[frame])
+        emit_anno.arrow_patch.set_alpha(arrow_alpha[frame])
+        emit_label.set_alpha(arrow_alpha[frame])
 
-        # 轻微拉伸长度增强动感
-        spin_anno.xy = (0.0,  spin_len*(0.95 + 0.1*scale))
-        emit_anno.xy = (np.pi, emit_len*(0.95 + 0.1*scale))
-        emit_label.set_position((np.pi, emit_len*(1.06 + 0.12*(scale-1))))
+        spin_anno.xy = (0.0,  spin_len*stretch[frame])
+        emit_anno.xy = (np.pi, emit_len*stretch[frame])
+        emit_label.set_position((np.pi, label_r[frame]))
 
-        # 动态标题 & 参数标签
-        title_right.set_text(f"宇称不守恒情况（β 衰变）  a={a_t:.2f}")
-        # animate() 内更新 param_box 文本
-        param_box.set_text(f"a = {a_t:.2f}")
+        param_box.set_text(labels[frame])
+        # 只返回 axes 内的对象（caption 与标题是静态的）
+        return artists
 
-        # animate() 的返回值里，移除 caption（它是 fig 级别），只返回 axes 级别的对象
-        return (*glow_lines, line_pc, line_pv, spin_anno, emit_anno, emit_label, title_right, param_box)
+    return fig, update, artists
+
+def build(args):
+    """由命令行参数建立逐帧表与画布；返回 (fig, update, artists, total_frames)（主进程与渲染进程共用）"""
+    # ---------- 动画参数：所有帧一次算好 ----------
+    total_frames = int(args.fps * args.seconds)
+    table = FrameTable(total_frames, n_theta=1600, a_min=0.0, a_max=args.amax, breath=args.breath)
+    fig, update, artists = make_figure(args, table)
+    return fig, update, artists, total_frames
+
+# ---------- 并行渲染 ----------
+# 每帧画面只由帧号决定（见 parity.BlitRenderer），帧区间切成小块分给进程池；
+# 每个渲染进程只建一次画布与静态背景，按块返回 rgb24 原始字节，主进程按帧号顺序写进同一个编码流。
+_WORKER = {}
+
+def _init_worker(args):
+    matplotlib.use("Agg")
+    fig, update, artists, _ = build(args)
+    fig.set_dpi(args.dpi)
+    _WORKER["renderer"] = BlitRenderer(fig, artists, update)
+
+def _render_chunk(frames):
+    r = _WORKER["renderer"]
+    data = b"".join(r.render(i).tobytes() for i in frames)
+    return data, (len(frames), r.height, r.width, 3)
+
+def parallel_frames(args, n_frames, chunk=8):
+    """按帧号顺序产出 (H, W, 3) 帧；同时在途的块不超过 2·jobs 个，内存占用与总帧数无关"""
+    import multiprocessing as mp
+    from collections import deque
+    chunks = iter([range(i, min(i + chunk, n_frames)) for i in range(0, n_frames, chunk)])
+    ctx = mp.get_context("spawn")                # 渲染进程从干净的解释器起步，不继承主进程的 GUI 后端
+    with ctx.Pool(args.jobs, initializer=_init_worker, initargs=(args,)) as pool:
+        pending = deque(pool.apply_async(_render_chunk, (c,))
+                        for c in itertools.islice(chunks, 2*args.jobs))
+        while pending:
+            data, shape = pending.popleft().get()
+            nxt = next(chunks, None)
+            if nxt is not None:
+                pending.append(pool.apply_async(_render_chunk, (nxt,)))
+            yield from np.frombuffer(data, dtype=np.uint8).reshape(shape)
+
+# ---------- 录制 ----------
+def record(fig, update, artists, n_frames, args):
+    """
+    按输出像素尺寸（--width × --height，按 --dpi 换算）在 Agg 画布上 blit 渲染，
+    rgb24 帧直接写进 ffmpeg（.mp4）或 Pillow（.gif），不经 FuncAnimation.save 的逐帧整幅重画。
+    --jobs > 1 时由进程池分块渲染，写出的字节与串行渲染完全相同。
+    """
+    dpi0 = fig.get_dpi()
+    fig.set_dpi(args.dpi)
+    enc = RGBFrames(*fig.canvas.get_width_height())
+    if args.jobs > 1:
+        frames = parallel_frames(args, n_frames)
+    else:
+        frames = render_frames(fig, artists, update, range(n_frames))
+    t0 = time.perf_counter()
+    with open_recorder(args.record, enc, fps=args.fps, bitrate=2800) as rec:
+        for frame in frames:
+            rec.write(frame)
+    elapsed = time.perf_counter() - t0
+    print(f"{rec.frames} 帧（{enc.width}×{enc.height}，{args.jobs} 个渲染进程）写入 {args.record}，"
+          f"用时 {elapsed:.2f} s（{rec.frames/max(elapsed, 1e-12):.1f} 帧/秒）")
+    fig.set_dpi(dpi0)
+
+def main():
+    args = parse_args()
+
+    # 无界面渲染（仅录制时可选）：必须在 import pyplot 前设置；此处已导入，只作为提醒
+    if args.record and args.no_show:
+        # 若需要严格无窗渲染，请把下面两行移到文件顶部（在 import pyplot 之前）
+        matplotlib.use("Agg")
 
-    # 动画
-    interval_ms = 1000.0 / args.fps
-    ani = FuncAnimation(fig, animate, frames=total_frames, interval=interval_ms, blit=True)
+    fig, update, artists, total_frames = build(args)
 
-    # ---------- 录制 ----------
     if args.record:
-        root, ext = os.path.splitext(args.record)
-        ext = ext.lower()
-        if ext == ".mp4":
-            try:
-                from matplotlib.animation import FFMpegWriter
-                writer = FFMpegWriter(fps=args.fps, bitrate=2800)
-            except Exception as e:
-                raise RuntimeError("保存 .mp4 需要已安装 ffmpeg。") from e
-            ani.save(args.record, writer=writer, dpi=args.dpi)
-        elif ext == ".gif":
-            from matplotlib.animation import PillowWriter
-            ani.save(args.record, writer=PillowWriter(fps=args.fps), dpi=args.dpi)
-        else:
+        ext = os.path.splitext(args.record)[1].lower()
+        if ext not in (".mp4", ".gif"):
             raise ValueError("不支持的扩展名：请使用 .mp4 或 .gif")
+        record(fig, update, artists, total_frames, args)
 
     if not args.no_show:
+        # 动画
+        interval_ms = 1000.0 / args.fps
+        ani = FuncAnimation(fig, update, frames=total_frames, init_func=lambda: artists,
+                            interval=interval_ms, blit=True)
         plt.show()
     else:
         plt.close(fig)
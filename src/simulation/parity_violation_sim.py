@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from matplotlib import font_manager as fm, rcParams
 
+from parity import parity_distributions, FrameTable
+
 # ---------- 样式 & 字体 ----------
 # plt.style.use("dark_background")
 def set_chinese_font():
@@ -20,16 +22,9 @@ def set_chinese_font():
     rcParams["axes.unicode_minus"] = False
 set_chinese_font()
 
-# ---------- 物理模型 ----------
-def parity_distributions(theta, asymmetry=0.6):
-    """返回宇称守恒与不守恒的角分布"""
-    parity_conserved = np.cos(theta)**2 + 0.5
-    parity_violated  = parity_conserved * (1 + asymmetry * np.cos(theta))
-    return parity_conserved, parity_violated
-
 # ---------- 画布与静态曲线 ----------
 theta = np.linspace(0, 2*np.pi, 1000)
-pc, pv = parity_distributions(theta, asymmetry=0.6)
+pc, pv = parity_distributions(theta, a=0.6)
 
 fig, (ax1, ax2) = plt.subplots(
     1, 2, subplot_kw=dict(projection='polar'), figsize=(10, 5), constrained_layout=True
@@ -41,23 +36,22 @@ ax1.set_title("宇称守恒情况", pad=16)
 
 # 右：宇称不守恒（动画）
 line_pv, = ax2.plot(theta, pv, color='tab:red', linewidth=2)
-title_right = ax2.set_title("宇称不守恒情况（β 衰变）", pad=16)
+ax2.set_title("宇称不守恒情况（β 衰变）", pad=16)
+# a 的数值放在轴内：标题在 blit 区域之外，逐帧 set_text 不会刷新
+a_label = ax2.text(0.98, 0.98, "", transform=ax2.transAxes, ha="right", va="top")
 
 # ---------- 动画：让不对称参数在 [0, 0.8] 循环变化 ----------
 A_MIN, A_MAX = 0.0, 0.8
 FPS = 30
 STEPS = 240  # 帧数
+# 平滑往返 0 -> 1 -> 0（余弦缓动），所有帧的曲线一次算好；不呼吸
+table = FrameTable(STEPS, n_theta=len(theta), a_min=A_MIN, a_max=A_MAX, breath=0.0)
+labels = table.labels("a={:.2f}")
 
 def anim_asymmetry(frame):
-    # 平滑往返：0 -> 1 -> 0
-    t = frame / STEPS
-    a = A_MIN + (A_MAX - A_MIN) * (0.5 - 0.5*np.cos(2*np.pi*t))  # 余弦缓动
-    _, pv_dyn = parity_distributions(theta, asymmetry=a)
-    line_pv.set_ydata(pv_dyn)
-    # ax2.set_title(f"宇称不守恒情况（β 衰变）  a={a:.2f}", pad=16)
-    title_right.set_text(f"宇称不守恒情况（β 衰变）  a={a:.2f}")
-    # print(title_right)
-    return (line_pv,)
+    line_pv.set_ydata(table.pv[frame])
+    a_label.set_text(labels[frame])
+    return line_pv, a_label
 
 ani = FuncAnimation(fig, anim_asymmetry, frames=STEPS, interval=1000/FPS, blit=True)
 
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+pipeline.py
+生产者 / 消费者流水线：求解器在工作进程里推进并发布抽样后的帧，主进程（或另一个查看器进程）只负责绘图与编码，
+物理计算与渲染分别占用各自的 CPU 核、彼此重叠。
+  * FrameRing：命名共享内存里的有界环形缓冲（单生产者 / 单消费者）。
+      头部为 int64 计数器：write_seq（已发布帧数）、read_seq（已消费帧数）、查看器 pid、停止 / 结束标志；
+      每个槽位 = 槽序号 + 元数据 (n, t, E_all, E_inner) + float32 帧 (Bz, En)。
+      生产者先写数据、再写槽序号、最后推进 write_seq；消费者复制后再核对槽序号（seqlock），
+      即使槽位在复制途中被覆盖也不会交出撕裂的帧。
+  * 背压（backpressure）策略，仅在有查看器连接时生效：
+      "block"       缓冲满时生产者等待（不丢帧，录制用）；
+      "drop_oldest" 覆盖最旧的帧，查看器总是看到最新状态（实时预览用）；
+      "drop_newest" 缓冲满时丢弃新帧。
+    无查看器时生产者既不等待也不计算帧，与纯计算模式的开销相同。
+  * 查看器随时连接 / 断开：attach() 从当前最新帧开始读，detach() 之后生产者不再等待；
+    查看器进程异常退出（pid 不存在）也按断开处理，"block" 策略不会把模拟卡死。
+用法示例：
+  # 终端 1：纯计算并发布
+  python gauge_field_simulation_2d_up.py --headless --frames 100000 --share gauge01
+  # 终端 2：随时连接查看，关窗即断开
+  python gauge_field_simulation_2d_up.py --attach gauge01
+"""
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+POLICIES = ("block", "drop_oldest", "drop_newest")
+FIELDS = ("Bz", "En")
+_MAGIC = 0x47415547                                  # "GAUG"
+# 头部 int64 下标
+_H_MAGIC, _H_CAP, _H_NX, _H_NY, _H_WRITE, _H_READ, _H_VIEWER, _H_STOP, _H_DONE, _H_POLICY = range(10)
+_HEADER = 16
+_META = 4                                            # n, t, E_all, E_inner
+_POLL = 5e-4                                         # 轮询间隔（秒）
+
+
+def _open_shm(name):
+    """连接已有的共享内存；连接方不注册到 resource_tracker，退出时不会误删生产者的缓冲"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:                                # Python < 3.13 没有 track 参数
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class FrameRing:
+    """
+    命名共享内存环形缓冲。生产者用 FrameRing.create(name, capacity, shape) 创建，
+    消费者用 FrameRing.connect(name) 连接；shape 为（抽样后的）帧形状 (Nx, Ny)。
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+        self.header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        if self.header[_H_MAGIC] != _MAGIC:
+            raise ValueError(f"共享内存 {self.name!r} 不是帧缓冲")
+        self.capacity = int(self.header[_H_CAP])
+        self.shape = (int(self.header[_H_NX]), int(self.header[_H_NY]))
+        cap, (Nx, Ny) = self.capacity, self.shape
+        off = _HEADER * 8
+        self.slot_seq = np.ndarray((cap,), dtype=np.int64, buffer=shm.buf, offset=off)
+        off += cap * 8
+        self.meta = np.ndarray((cap, _META), dtype=np.float64, buffer=shm.buf, offset=off)
+        off += cap * _META * 8
+        self.frames = np.ndarray((cap, len(FIELDS), Nx, Ny), dtype=np.float32, buffer=shm.buf,
+                                 offset=off)
+
+    @staticmethod
+    def nbytes(capacity, shape):
+        Nx, Ny = shape
+        return _HEADER*8 + capacity*8 + capacity*_META*8 + capacity*len(FIELDS)*Nx*Ny*4
+
+    @classmethod
+    def create(cls, name=None, capacity=8, shape=(96, 96), policy="drop_oldest"):
+        if policy not in POLICIES:
+            raise ValueError(f"未知的背压策略：{policy!r}（可选 {POLICIES}）")
+        shm = shared_memory.SharedMemory(name=name, create=True,
+                                         size=cls.nbytes(capacity, shape))
+        header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_H_CAP], (header[_H_NX], header[_H_NY]) = capacity, shape
+        header[_H_POLICY] = POLICIES.index(policy)
+        header[_H_MAGIC] = _MAGIC
+        ring = cls(shm, owner=True)
+        ring.slot_seq[:] = -1
+        return ring
+
+    @classmethod
+    def connect(cls, name):
+        return cls(_open_shm(name), owner=False)
+
+    def close(self):
+        """释放本进程的映射；创建者同时删除共享内存"""
+        self.header = self.slot_seq = self.meta = self.frames = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ===== 状态 =====
+    @property
+    def policy(self):
+        return POLICIES[int(self.header[_H_POLICY])]
+
+    @property
+    def written(self):
+        return int(self.header[_H_WRITE])
+
+    @property
+    def finished(self):
+        return bool(self.header[_H_DONE])
+
+    @property
+    def attached(self):
+        """是否有存活的查看器；查看器进程已消失时顺带清掉连接标记"""
+        pid = int(self.header[_H_VIEWER])
+        if pid and not _alive(pid):
+            self.header[_H_VIEWER] = 0
+            return False
+        return pid != 0
+
+    @property
+    def stop_requested(self):
+        return bool(self.header[_H_STOP])
+
+    def request_stop(self):
+        """消费者请求生产者提前结束（例如录制完成）"""
+        self.header[_H_STOP] = 1
+
+    # ===== 生产者 =====
+    def put(self, n, t, e_all, e_inner, Bz, En):
+        """
+        发布一帧；按背压策略可能等待或丢帧。返回 True 表示已写入。
+        Bz、En 须为帧形状（已抽样）。
+        """
+        h = self.header
+        w = int(h[_H_WRITE])
+        while w - int(h[_H_READ]) >= self.capacity:
+            policy = self.policy
+            if policy == "drop_oldest" or not self.attached:
+                break
+            if policy == "drop_newest":
+                return False
+            if self.stop_requested:
+                return False
+            time.sleep(_POLL)
+        k = w % self.capacity
+        self.slot_seq[k] = -1                        # 写入中
+        self.meta[k] = (n, t, e_all, e_inner)
+        self.frames[k, 0] = Bz
+        self.frames[k, 1] = En
+        self.slot_seq[k] = w
+        h[_H_WRITE] = w + 1
+        return True
+
+    def finish(self):
+        self.header[_H_DONE] = 1
+
+    # ===== 消费者 =====
+    def attach(self):
+        """以当前进程作为查看器连接，从最新的一帧开始读"""
+        self.header[_H_READ] = max(0, self.written - 1)
+        self.header[_H_VIEWER] = os.getpid()
+        return self
+
+    def detach(self):
+        if self.header is not None and int(self.header[_H_VIEWER]) == os.getpid():
+            self.header[_H_VIEWER] = 0
+        return self
+
+    def get(self, timeout=None):
+        """
+        取下一帧，返回 (meta, frames) 的拷贝：meta = (n, t, E_all, E_inner)，frames 形状 (2, Nx, Ny)。
+        生产者已结束且缓冲读空时返回 None；超时返回 None。
+        被 "drop_oldest" 覆盖掉的帧直接跳过。
+        """
+        h = self.header
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            r, w = int(h[_H_READ]), int(h[_H_WRITE])
+            if r < w - self.capacity:                # 已被覆盖：跳到仍在缓冲中的最旧帧
+                r = w - self.capacity
+                h[_H_READ] = r
+            if r < w:
+                k = r % self.capacity
+                meta, frames = self.meta[k].copy(), self.frames[k].copy()
+                if int(self.slot_seq[k]) == r:       # 复制期间未被改写
+                    h[_H_READ] = r + 1
+                    return meta, frames
+                h[_H_READ] = r + 1                   # 复制途中被覆盖，丢弃这一帧
+                continue
+            if self.finished:
+                return None
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            time.sleep(_POLL)
+
+    def __iter__(self):
+        while True:
+            item = self.get()
+            if item is None:
+                return
+            yield item
+
+
+class FramePublisher:
+    """
+    作为 solver.run 的回调，每 every 步把 (Bz, En) 按空间步长 decimate 抽样后发布到 ring。
+    无查看器连接时直接返回，不做任何诊断计算。
+    """
+
+    def __init__(self, ring, every=1, decimate=1):
+        self.ring = ring
+        self.every = max(1, every)
+        self.decimate = max(1, decimate)
+        self.published = self.dropped = 0
+
+    @staticmethod
+    def frame_shape(solver, decimate=1):
+        return tuple(-(-n // max(1, decimate)) for n in solver.shape[-2:])
+
+    def __call__(self, solver):
+        if not self.ring.attached:
+            return
+        if solver.energy_steps and solver.energy_steps[-1] == solver.n:
+            Bz, En = solver.Bz_diag, solver.En_diag             # 本步已做过诊断，直接复用
+            e_all, e_inner = solver.energy_all_hist[-1], solver.energy_inner_hist[-1]
+        else:
+            Bz, En, e_all, e_inner = solver.diagnose()
+        k = self.decimate
+        if self.ring.put(solver.n, solver.t, e_all, e_inner, Bz[::k, ::k], En[::k, ::k]):
+            self.published += 1
+        else:
+            self.dropped += 1
+
+
+def produce(make_solver, args, name, steps, every=1, decimate=1, capacity=8, policy="block",
+            wait_attach=False):
+    """
+    工作进程入口：构造求解器，创建环形缓冲 name（由本进程持有并在结束时删除），
+    推进 steps 步，每 every 步发布一帧。wait_attach=True 时等查看器连接后才开始推进（录制不漏开头）；
+    消费者调用 request_stop() 时提前结束。
+    """
+    solver = make_solver(args)
+    ring = FrameRing.create(name, capacity, FramePublisher.frame_shape(solver, decimate), policy)
+    pub = FramePublisher(ring, every, decimate)
+    try:
+        while wait_attach and not ring.attached and not ring.stop_requested:
+            time.sleep(_POLL)
+        for _ in range(steps):
+            if ring.stop_requested:
+                break
+            solver.step()
+            if solver.n % pub.every == 0:
+                pub(solver)
+    finally:
+        ring.finish()
+        ring.close()
+
+
+def wait_connect(name, timeout=30.0, alive=None):
+    """反复尝试连接生产者创建的缓冲，直到成功；alive() 返回 False（生产者已退出）或超时则报错"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return FrameRing.connect(name)
+        except (FileNotFoundError, ValueError):
+            if (alive is not None and not alive()) or time.monotonic() > deadline:
+                raise RuntimeError(f"无法连接帧缓冲 {name!r}：生产者未启动或已退出")
+            time.sleep(10 * _POLL)
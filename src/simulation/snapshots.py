@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+snapshots.py
+把规范场求解器的原始场（Ax, Ay, Bz, 能量密度 En）按步长写入磁盘上的时间序列，供后续分析直接读取。
+目录结构：
+  out_dir/
+    header.json     网格、dx/dy/dt、步长、已写帧数 count、求解器参数
+    steps.npy       每帧对应的步数（int64）
+    Ax.npy, ...     每个场一个 .npy，形状 (capacity, *solver.shape)，以 np.memmap 打开
+写入按 chunk 帧缓冲后整体落盘，长时间运行时内存中最多只有 chunk 帧；容量不够时自动翻倍扩容。
+每次落盘后原子地更新 header.json，运行中途被中断也能读到已写的部分。
+用法示例：
+  writer = SnapshotWriter("run01", solver, stride=10, capacity=1000)
+  solver.run(10000, callback=writer, every=writer.stride)
+  writer.close()
+  snap = SnapshotReader("run01")
+  Bz_tail = snap.read("Bz", t=slice(-50, None), x=slice(40, 56))   # 惰性按时间与区域切片
+"""
+import json
+import os
+
+import numpy as np
+
+HEADER = "header.json"
+FIELDS = ("Ax", "Ay", "Bz", "En")
+
+
+def _write_json_atomic(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def solver_params(solver):
+    """收集求解器的标量参数（及小数组），写入头文件便于复现"""
+    params = {}
+    for k, v in vars(solver).items():
+        if k.startswith("_"):
+            continue
+        if isinstance(v, (bool, int, float, str)):
+            params[k] = v
+        elif isinstance(v, np.generic):
+            params[k] = v.item()
+        elif isinstance(v, np.ndarray) and v.size <= 64 and v.dtype.kind in "biuf":
+            params[k] = v.tolist()
+    return params
+
+
+class SnapshotWriter:
+    """
+    每调用一次（或作为 solver.run 的 callback）追加一帧。
+    fields 可选 Ax / Ay / Bz / En；Bz 与 En 通过求解器的 out= 接口就地计算，不影响能量历史。
+    resume=True 时接着已有目录写：丢弃步数晚于 solver.n 的帧（它们属于检查点之后被中断的那段）。
+    """
+
+    def __init__(self, out_dir, solver, fields=FIELDS, stride=1, capacity=256, chunk=16,
+                 dtype=None, params=None, resume=False):
+        unknown = set(fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"未知的场：{sorted(unknown)}")
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.solver = solver
+        self.fields = tuple(fields)
+        self.stride = stride
+        self.chunk = max(1, chunk)
+        self.shape = tuple(solver.shape)
+        self.dtype = np.dtype(dtype or solver.Ax.dtype)
+        self.capacity = max(1, capacity)
+        self.count = 0
+
+        header_path = os.path.join(out_dir, HEADER)
+        if resume and os.path.exists(header_path):
+            self._reopen(header_path)
+        else:
+            self._maps = {name: self._open(name, self.capacity) for name in self.fields}
+            self._maps["steps"] = np.lib.format.open_memmap(self._path("steps"), mode="w+",
+                                                            dtype=np.int64, shape=(self.capacity,))
+        # 落盘前的小缓冲：chunk 帧
+        self._buf = {name: np.empty((self.chunk, *self.shape), dtype=self.dtype)
+                     for name in self.fields}
+        self._buf_steps = np.empty(self.chunk, dtype=np.int64)
+        self._nbuf = 0
+        self._work = np.empty(self.shape)
+
+        self.header = dict(
+            version=1, solver=type(solver).__name__, fields=list(self.fields),
+            shape=list(self.shape), dtype=self.dtype.str,
+            Nx=solver.Nx, Ny=solver.Ny, dx=solver.dx, dy=solver.dy, dt=solver.dt,
+            stride=stride, count=self.count, capacity=self.capacity,
+            params={**solver_params(solver), **(params or {})},
+        )
+        self._write_header()
+
+    # ===== 文件 =====
+    def _path(self, name):
+        return os.path.join(self.out_dir, f"{name}.npy")
+
+    def _open(self, name, capacity):
+        return np.lib.format.open_memmap(self._path(name), mode="w+", dtype=self.dtype,
+                                         shape=(capacity, *self.shape))
+
+    def _reopen(self, header_path):
+        with open(header_path, encoding="utf-8") as f:
+            old = json.load(f)
+        if tuple(old["fields"]) != self.fields or tuple(old["shape"]) != self.shape:
+            raise ValueError("已有快照目录的场列表或网格形状与当前设置不一致")
+        self.capacity = old["capacity"]
+        self._maps = {name: np.load(self._path(name), mmap_mode="r+")
+                      for name in (*self.fields, "steps")}
+        steps = self._maps["steps"][:old["count"]]
+        self.count = int(np.searchsorted(steps, self.solver.n, side="right"))
+
+    def _grow(self, need):
+        """容量翻倍：逐块把旧文件拷到新文件（不把整段历史读入内存）"""
+        cap = self.capacity
+        while cap < need:
+            cap *= 2
+        for name in list(self._maps):
+            old = self._maps[name]
+            tmp = self._path(name) + ".grow"
+            new = np.lib.format.open_memmap(tmp, mode="w+", dtype=old.dtype,
+                                            shape=(cap, *old.shape[1:]))
+            for i in range(0, self.count, self.chunk):
+                j = min(i + self.chunk, self.count)
+                new[i:j] = old[i:j]
+            new.flush()
+            del new, old
+            self._maps[name] = None
+            os.replace(tmp, self._path(name))
+            self._maps[name] = np.load(self._path(name), mmap_mode="r+")
+        self.capacity = cap
+        self.header["capacity"] = cap
+
+    def _write_header(self):
+        _write_json_atomic(os.path.join(self.out_dir, HEADER), self.header)
+
+    # ===== 写入 =====
+    def _frame(self, name):
+        s = self.solver
+        if name == "Ax":
+            return s.Ax
+        if name == "Ay":
+            return s.Ay
+        if name == "Bz":
+            return s.Bz(out=self._work)
+        return s.energy_density(out=self._work)
+
+    def append(self):
+        """把求解器当前状态追加为一帧"""
+        i = self._nbuf
+        for name in self.fields:
+            self._buf[name][i] = self._frame(name)
+        self._buf_steps[i] = self.solver.n
+        self._nbuf += 1
+        if self._nbuf == self.chunk:
+            self.flush()
+        return self
+
+    def __call__(self, solver=None):
+        """作为 solver.run(..., callback=writer, every=writer.stride) 的回调"""
+        return self.append()
+
+    def flush(self):
+        """把缓冲中的帧写入 memmap 并更新头文件"""
+        k = self._nbuf
+        if k == 0:
+            return self
+        if self.count + k > self.capacity:
+            self._grow(self.count + k)
+        sl = slice(self.count, self.count + k)
+        for name in self.fields:
+            self._maps[name][sl] = self._buf[name][:k]
+        self._maps["steps"][sl] = self._buf_steps[:k]
+        for m in self._maps.values():
+            m.flush()
+        self.count += k
+        self._nbuf = 0
+        self.header["count"] = self.count
+        self._write_header()
+        return self
+
+    def close(self):
+        self.flush()
+        self._maps = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotReader:
+    """惰性读取：各场以只读 memmap 打开，切片时才真正读盘"""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        with open(os.path.join(out_dir, HEADER), encoding="utf-8") as f:
+            self.header = json.load(f)
+        self.count = self.header["count"]
+        self.fields = tuple(self.header["fields"])
+        self.dt = self.header["dt"]
+        self.steps = np.load(os.path.join(out_dir, "steps.npy"), mmap_mode="r")[:self.count]
+        self._maps = {}
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def times(self):
+        return self.steps * self.dt
+
+    def __getitem__(self, name):
+        """整个时间序列的只读 memmap 视图，形状 (count, *shape)"""
+        if name not in self.fields:
+            raise KeyError(name)
+        if name not in self._maps:
+            m = np.load(os.path.join(self.out_dir, f"{name}.npy"), mmap_mode="r")
+            self._maps[name] = m[:self.count]
+        return self._maps[name]
+
+    def read(self, name, t=slice(None), x=slice(None), y=slice(None)):
+        """按时间（帧索引）与区域切片，只读取所需部分，返回普通 ndarray"""
+        return np.array(self[name][t][..., x, y])
+
+    def index_at(self, time):
+        """距离物理时间 time 最近的帧索引"""
+        return int(np.argmin(np.abs(self.times - time)))
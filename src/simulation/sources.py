@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+sources.py
+规范场外源子系统：空间形状 × 时间波形，稀疏地注入到 V 方程右端（c²∇²A + S 中的 S）。
+  * 空间形状（以格点下标为单位）：point(i, j)、line((i0, j0), (i1, j1))、gaussian_patch((ci, cj), sigma)，
+    各自给出一组 (i, j, 权重)；
+  * 时间波形：Sine、Chirp（线性扫频）、Pulse（高斯包络，可带载波）、Tabulated（表格线性插值）；
+    参数可以是长度 B 的数组（批量系综中每个成员一个值）；
+  * Source(shape, waveform, component="x"|"y") 组合二者；SourceSet 把所有源的条目按目标格点排序合并：
+      - 每步先求所有源的幅度 amp（同类波形堆成一次向量化求值），
+      - 条目值 = 权重 × amp[源编号]，np.add.reduceat 按目标格点归约，再一次花式索引加到拉普拉斯缓冲上，
+    不分配整网格数组，几十个源也只有一次注入。
+用法示例：
+  srcs = [Source(point(30, 48), Sine(1.5, 1.0)),
+          Source(line((20, 20), (20, 76)), Chirp(0.5, 0.5, 3.0, duration=20.0), component="y"),
+          Source(gaussian_patch((70, 60), sigma=2.0), Pulse(2.0, t0=3.0, width=0.8, omega=4.0))]
+  solver = AbsorbingGaugeSolver(96, 96, 9.6, 9.6, sources=srcs)
+"""
+import numpy as np
+
+
+# ===== 时间波形 =====
+class Waveform:
+    """
+    时间波形 s(t) 的基类。params 中列出的参数都按元素广播，
+    因此同一类的多个波形可以把参数堆成数组、一次求值（见 stack）。
+    """
+    params = ()
+
+    def __call__(self, t):
+        raise NotImplementedError
+
+    @classmethod
+    def stack(cls, items, lead=()):
+        """把同类波形的参数沿新的第 0 轴堆叠，返回一个求值结果形状为 (len(items), *lead) 的波形"""
+        obj = cls.__new__(cls)
+        for p in cls.params:
+            vals = [np.broadcast_to(np.asarray(getattr(w, p), dtype=float), lead) for w in items]
+            setattr(obj, p, np.stack(vals))
+        return obj
+
+
+class Sine(Waveform):
+    """amp·sin(ω t + φ)（原脚本的中心正弦源）"""
+    params = ("amp", "omega", "phase")
+
+    def __init__(self, amp=1.0, omega=1.0, phase=0.0):
+        self.amp, self.omega, self.phase = amp, omega, phase
+
+    def __call__(self, t):
+        return self.amp * np.sin(self.omega * t + self.phase)
+
+
+class Chirp(Waveform):
+    """
+    线性扫频：角频率在 [0, duration] 内从 ω0 线性变到 ω1，之后保持 ω1；
+    相位 φ(t) = ω0·τ + (ω1 − ω0)·τ²/(2·duration) + ω1·(t − τ)，τ = min(t, duration)
+    """
+    params = ("amp", "omega0", "omega1", "duration")
+
+    def __init__(self, amp=1.0, omega0=0.5, omega1=3.0, duration=10.0):
+        self.amp, self.omega0, self.omega1, self.duration = amp, omega0, omega1, duration
+
+    def __call__(self, t):
+        tau = np.minimum(t, self.duration)
+        phase = (self.omega0*tau + (self.omega1 - self.omega0) * tau*tau / (2*self.duration)
+                 + self.omega1 * (t - tau))
+        return self.amp * np.sin(phase)
+
+
+class Pulse(Waveform):
+    """高斯脉冲 amp·exp(−(t − t0)²/(2·width²))·cos(ω(t − t0))；omega=0 时为无载波的单极脉冲"""
+    params = ("amp", "t0", "width", "omega")
+
+    def __init__(self, amp=1.0, t0=2.0, width=0.5, omega=0.0):
+        self.amp, self.t0, self.width, self.omega = amp, t0, width, omega
+
+    def __call__(self, t):
+        s = t - self.t0
+        return self.amp * np.exp(-s*s / (2*self.width**2)) * np.cos(self.omega * s)
+
+
+class Tabulated(Waveform):
+    """表格波形：在 (times, values) 之间线性插值；period 给出时按周期重复，否则表外取端点值"""
+
+    def __init__(self, times, values, period=None):
+        self.times = np.asarray(times, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        self.period = period
+
+    def __call__(self, t):
+        if self.period is not None:
+            t = self.times[0] + np.mod(t - self.times[0], self.period)
+        return np.interp(t, self.times, self.values)
+
+    @classmethod
+    def stack(cls, items, lead=()):
+        return None                                   # 表长各不相同，逐个求值
+
+
+# ===== 空间形状 =====
+def point(i, j):
+    """单个格点 (i, j)，权重 1"""
+    return np.array([i]), np.array([j]), np.array([1.0])
+
+
+def line(p0, p1):
+    """(i0, j0) 到 (i1, j1) 的线段经过的格点（按最长轴等距取样后四舍五入），每格权重 1"""
+    (i0, j0), (i1, j1) = p0, p1
+    n = int(max(abs(i1 - i0), abs(j1 - j0))) + 1
+    s = np.linspace(0.0, 1.0, n)
+    ij = np.unique(np.stack([np.round(i0 + s*(i1 - i0)), np.round(j0 + s*(j1 - j0))], -1)
+                   .astype(int), axis=0)
+    return ij[:, 0], ij[:, 1], np.ones(len(ij))
+
+
+def gaussian_patch(center, sigma, cutoff=3.0):
+    """以 center（格点下标，可为小数）为中心、宽 sigma 格的高斯斑，峰值权重 1，截断在 cutoff·sigma"""
+    ci, cj = center
+    h = int(np.ceil(cutoff * sigma))
+    i, j = np.meshgrid(np.arange(int(np.floor(ci)) - h, int(np.ceil(ci)) + h + 1),
+                       np.arange(int(np.floor(cj)) - h, int(np.ceil(cj)) + h + 1), indexing="ij")
+    r2 = (i - ci)**2 + (j - cj)**2
+    keep = r2 <= (cutoff * sigma)**2
+    return i[keep], j[keep], np.exp(-r2[keep] / (2*sigma**2))
+
+
+class Source:
+    """空间形状（point / line / gaussian_patch 的返回值）× 时间波形，注入到 component 分量"""
+
+    def __init__(self, shape, waveform, component="x"):
+        if component not in ("x", "y"):
+            raise ValueError(f"未知的分量：{component!r}（可选 'x' 或 'y'）")
+        self.i, self.j, self.w = (np.asarray(a) for a in shape)
+        self.waveform = waveform
+        self.component = component
+
+
+# ===== 合并注入 =====
+class SourceSet:
+    """
+    多个 Source 合并后的稀疏注入器。bind 到网格 (Nx, Ny)（及批量前导形状 lead）后：
+      amplitudes(t) → (*lead, n_src)，inject(lap_x, lap_y, t) 把 Σ 权重·幅度 加到两个拉普拉斯缓冲上。
+    落在网格外的条目被丢弃。
+    """
+
+    def __init__(self, sources):
+        self.sources = list(sources)
+        self.shape = None
+
+    def __len__(self):
+        return len(self.sources)
+
+    def bind(self, shape, lead=()):
+        Nx, Ny = shape
+        self.shape, self.lead = (Nx, Ny), tuple(lead)
+        # 每个分量：条目按目标格点（展平下标）排序，reduceat 的分段起点与各段目标
+        self._comp = []
+        for comp in ("x", "y"):
+            I, J, W, S = [], [], [], []
+            for k, s in enumerate(self.sources):
+                if s.component != comp:
+                    continue
+                inside = (s.i >= 0) & (s.i < Nx) & (s.j >= 0) & (s.j < Ny)
+                I.append(s.i[inside]); J.append(s.j[inside]); W.append(s.w[inside])
+                S.append(np.full(int(inside.sum()), k))
+            if not I or not sum(len(a) for a in I):
+                self._comp.append(None)
+                continue
+            I, J, W, S = (np.concatenate(a) for a in (I, J, W, S))
+            flat = I.astype(np.int64) * Ny + J
+            order = np.argsort(flat, kind="stable")
+            flat, W, S = flat[order], W[order], S[order]
+            targets, starts = np.unique(flat, return_index=True)
+            self._comp.append(dict(i=I[order], j=J[order], w=W, sid=S, starts=starts,
+                                   ti=targets // Ny, tj=targets % Ny))
+        # 同类可堆叠的波形分组：一次求值得到该组所有源的幅度
+        self._groups = []
+        by_cls = {}
+        for k, s in enumerate(self.sources):
+            by_cls.setdefault(type(s.waveform), []).append(k)
+        for cls, ks in by_cls.items():
+            stacked = cls.stack([self.sources[k].waveform for k in ks], self.lead)
+            if stacked is None:
+                self._groups.extend(([k], self.sources[k].waveform, False) for k in ks)
+            else:
+                self._groups.append((ks, stacked, True))
+        self._amps = np.zeros((len(self.sources), *self.lead))
+        return self
+
+    def amplitudes(self, t):
+        """各源在时刻 t 的幅度，形状 (*lead, n_src)"""
+        amps = self._amps
+        for ks, wf, stacked in self._groups:
+            if stacked:
+                amps[ks] = wf(t)
+            else:
+                amps[ks[0]] = wf(t)
+        return np.moveaxis(amps, 0, -1)
+
+    def entries(self, comp):
+        """分量 comp（0 = x，1 = y）的条目 (i, j, 权重, 源编号)；无条目时返回 None"""
+        c = self._comp[comp]
+        return None if c is None else (c["i"], c["j"], c["w"], c["sid"])
+
+    def restrict_rows(self, r0, r1):
+        """只保留目标行在 [r0, r1) 内的条目、行号平移到条带内（区域分解的 worker 用）"""
+        sub = SourceSet(self.sources)
+        sub.shape, sub.lead = (r1 - r0, self.shape[1]), self.lead
+        sub._groups, sub._amps = self._groups, self._amps.copy()
+        Ny = self.shape[1]
+        sub._comp = []
+        for c in self._comp:
+            if c is None:
+                sub._comp.append(None)
+                continue
+            keep = (c["i"] >= r0) & (c["i"] < r1)
+            if not keep.any():
+                sub._comp.append(None)
+                continue
+            i, j = c["i"][keep] - r0, c["j"][keep]
+            flat = i.astype(np.int64) * Ny + j
+            targets, starts = np.unique(flat, return_index=True)
+            sub._comp.append(dict(i=i, j=j, w=c["w"][keep], sid=c["sid"][keep], starts=starts,
+                                  ti=targets // Ny, tj=targets % Ny))
+        return sub
+
+    def values(self, t):
+        """t 时刻按目标格点归约后的源项：逐个非空分量给出 (分量, 行下标, 列下标, 值 (*lead, 目标数))"""
+        if not self.sources:
+            return
+        amps = self.amplitudes(t)
+        for comp, c in enumerate(self._comp):
+            if c is not None:
+                yield comp, c["ti"], c["tj"], np.add.reduceat(c["w"] * amps[..., c["sid"]],
+                                                              c["starts"], axis=-1)
+
+    def inject(self, lap_x, lap_y, t):
+        """lap_x / lap_y（形状 (*lead, Nx, Ny)）上加入 t 时刻的外源"""
+        for comp, ti, tj, vals in self.values(t):
+            (lap_x, lap_y)[comp][..., ti, tj] += vals   # 目标格点互不相同，花式索引的 += 不会丢值
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+spectral_solver.py
+周期边界二维规范场的伪谱求解器：在 rfft2 的傅里叶空间里对每个模式做精确的时间演化，
+  Â(t+dt) =  cos(ωdt)·Â + sin(ωdt)/ω·V̂
+  V̂(t+dt) = −ω·sin(ωdt)·Â + cos(ωdt)·V̂,      ω = c|k|
+没有空间截断误差（所有可分辨模式都是精确色散关系），也没有 CFL 限制，dt 只由输出需要决定。
+与 LeapfrogGaugeSolver 接口一致，可在 gauge_field_simulation_2d.py 中用 --engine spectral 选择。
+频谱状态 (Â, V̂) 是权威数据；实空间的 Ax/Ay 只在访问时按需逆变换。
+所有 FFT 都写入预分配的缓冲（numpy.fft 的 out= 参数），稳态步进不分配数组。
+"""
+import numpy as np
+
+import stencils as st
+from gauge_solver import GaugeSolver
+
+
+class SpectralGaugeSolver(GaugeSolver):
+    periodic = True
+
+    def __init__(self, Nx, Ny, dx, dy, dt=None, c=1.0, cfl=0.65, seed=None, diag_every=0,
+                 batch=None, dtype=np.float64, accum_dtype=np.float64):
+        if dt is None:
+            dt = st.cfl_dt(cfl, c, dx, dy)  # 默认与有限差分相同，便于对比；谱方法本身不受 CFL 限制
+        super().__init__(Nx, Ny, dx, dy, dt, c=c, seed=seed, diag_every=diag_every, batch=batch,
+                         dtype=dtype, accum_dtype=accum_dtype)
+        f = self.dtype
+        cf = np.result_type(f, np.complex64)                 # float32 → complex64
+
+        # ===== 波数与逐模式传播系数 =====
+        kx = 2*np.pi * np.fft.fftfreq(Nx, d=dx)
+        ky = 2*np.pi * np.fft.rfftfreq(Ny, d=dy)
+        KX, KY = np.meshgrid(kx, ky, indexing='ij')
+        omega = c * np.sqrt(KX**2 + KY**2)
+        self._cos = np.cos(omega*dt).astype(f)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._sinc = np.where(omega > 0, np.sin(omega*dt) / omega, dt).astype(f)   # k=0：Â += dt·V̂
+        self._wsin = (-omega * np.sin(omega*dt)).astype(f)
+        # 一阶导数的 ik；Nyquist 模式置 0，保证实场的导数仍为实数
+        ikx, iky = 1j*kx, 1j*ky
+        if Nx % 2 == 0:
+            ikx[Nx//2] = 0.0
+        if Ny % 2 == 0:
+            iky[-1] = 0.0
+        self._ikx = ikx[:, None].astype(cf)
+        self._iky = iky[None, :].astype(cf)
+
+        # ===== 频谱状态与缓冲 =====
+        spec_shape = (*self.shape[:-2], Nx, Ny//2 + 1)
+        self._Ah = {k: np.zeros(spec_shape, dtype=cf) for k in ("x", "y")}
+        self._Vh = {k: np.zeros(spec_shape, dtype=cf) for k in ("x", "y")}
+        self._c1 = np.zeros(spec_shape, dtype=cf)
+        self._c2 = np.zeros(spec_shape, dtype=cf)
+        self._Vx = np.zeros(self.shape, dtype=f)
+        self._Vy = np.zeros(self.shape, dtype=f)
+        self._synced = True
+
+    # ===== 步进 =====
+    def _advance(self):
+        for k in ("x", "y"):
+            Ah, Vh, T, U = self._Ah[k], self._Vh[k], self._c1, self._c2
+            np.multiply(Ah, self._cos, out=T)
+            np.multiply(Vh, self._sinc, out=U)
+            T += U                                   # T = Â(t+dt)
+            np.multiply(Ah, self._wsin, out=U)
+            Vh *= self._cos
+            Vh += U                                  # V̂(t+dt)
+            self._Ah[k], self._c1 = T, Ah            # 交换引用，旧 Â 变成下一次的临时缓冲
+        self._synced = False
+
+    # ===== 实空间 ↔ 频谱 =====
+    def _irfft(self, Zh, out):
+        return np.fft.irfft2(Zh, s=(self.Nx, self.Ny), out=out)
+
+    def _sync(self):
+        if not self._synced:
+            self._irfft(self._Ah["x"], st.interior(self._Px))
+            self._irfft(self._Ah["y"], st.interior(self._Py))
+            self._synced = True
+
+    @property
+    def Ax(self):
+        self._sync()
+        return st.interior(self._Px)
+
+    @property
+    def Ay(self):
+        self._sync()
+        return st.interior(self._Py)
+
+    def set_initial(self, Ax, Ay, Vx=None, Vy=None):
+        for k, A, V in (("x", Ax, Vx), ("y", Ay, Vy)):
+            np.fft.rfft2(np.broadcast_to(A, self.shape).astype(self.dtype), out=self._Ah[k])
+            if V is None:
+                self._Vh[k][...] = 0.0
+            else:
+                np.fft.rfft2(np.broadcast_to(V, self.shape).astype(self.dtype), out=self._Vh[k])
+        self._synced = False
+        return self
+
+    def velocities(self):
+        return self._irfft(self._Vh["x"], self._Vx), self._irfft(self._Vh["y"], self._Vy)
+
+    # ===== 诊断：谱导数 =====
+    def _deriv(self, Zh, ik, out):
+        np.multiply(Zh, ik, out=self._c2)
+        return self._irfft(self._c2, out)
+
+    def Bz(self, out=None):
+        if out is None:
+            out = np.empty(self.shape, dtype=self.dtype)
+        self._deriv(self._Ah["y"], self._ikx, out)
+        out -= self._deriv(self._Ah["x"], self._iky, self._w1)
+        return out
+
+    def energy_density(self, out=None):
+        if out is None:
+            out = np.empty(self.shape, dtype=self.dtype)
+        out[...] = 0.0
+        w = self._w1
+        for k in ("x", "y"):
+            for ik in (self._ikx, self._iky):
+                self._deriv(self._Ah[k], ik, w); w *= w; out += w
+        out *= self.c**2
+        Vx, Vy = self.velocities()
+        np.multiply(Vx, Vx, out=w); out += w
+        np.multiply(Vy, Vy, out=w); out += w
+        out *= 0.5
+        return out
+
+    def diagnose(self):
+        Bz = self.Bz(out=self.Bz_diag)
+        En = self.energy_density(out=self.En_diag)
+        dA = self.dx * self.dy
+        total = np.sum(En, axis=(-2, -1), dtype=self.accum_dtype) * dA
+        self.energy_steps.append(self.n)
+        self.energy_all_hist.append(total)
+        self.energy_inner_hist.append(total)
+        return Bz, En, total, total
+
+    # ===== 完整状态 =====
+    def state_dict(self):
+        state = super().state_dict()
+        state.update({f"{name}_{k}": d[k].copy()
+                      for name, d in (("Ah", self._Ah), ("Vh", self._Vh)) for k in ("x", "y")})
+        return state
+
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        for name, d in (("Ah", self._Ah), ("Vh", self._Vh)):
+            for k in ("x", "y"):
+                d[k][...] = state[f"{name}_{k}"]
+        self._synced = False
+        return self
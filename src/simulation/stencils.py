@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+stencils.py
+就地（in-place）差分核：所有函数都写入调用方预分配的缓冲区，稳态步进不再产生整网格临时数组。
+
+存储约定（ghost cell）：
+  场以带一圈幽灵格的数组 P 存放，形状 (..., Nx+2, Ny+2)，物理区域为 interior(P) = P[..., 1:-1, 1:-1]。
+  每次做差分前调用 fill_ghosts(P, periodic) 刷新幽灵格（仅 O(N) 的边界拷贝），
+  之后所有邻居访问都是 P 的切片视图，配合 out= 直接写入结果缓冲区。
+  前导维度 ... 可任意（如批量系综的 B 轴）。
+  非周期（吸收边界）情形与原脚本一致：最外一圈的拉普拉斯量和法向导数取 0。
+各向异性网格：二维核都接受 dy（缺省 None 即 dy = dx）；dx = dy 时运算次序与原来完全相同（结果逐位不变）。
+"""
+import numpy as np
+
+
+# ===== 存储 =====
+def padded(shape, dtype=float):
+    """为物理形状 shape=(..., Nx, Ny) 分配带幽灵格的零数组"""
+    *lead, Nx, Ny = shape
+    return np.zeros((*lead, Nx + 2, Ny + 2), dtype=dtype)
+
+
+def interior(P):
+    """带幽灵格数组的物理区域视图"""
+    return P[..., 1:-1, 1:-1]
+
+
+def fill_ghosts(P, periodic=True):
+    """刷新幽灵格：周期边界取对侧的值；否则置 0（非周期时边界结果会被单独清零）"""
+    if periodic:
+        P[..., 0, 1:-1] = P[..., -2, 1:-1]
+        P[..., -1, 1:-1] = P[..., 1, 1:-1]
+        P[..., :, 0] = P[..., :, -2]
+        P[..., :, -1] = P[..., :, 1]
+    else:
+        P[..., 0, :] = 0.0
+        P[..., -1, :] = 0.0
+        P[..., :, 0] = 0.0
+        P[..., :, -1] = 0.0
+    return P
+
+
+def zero_border(out):
+    """把物理区域最外一圈置 0（非周期边界的约定）"""
+    out[..., 0, :] = 0.0
+    out[..., -1, :] = 0.0
+    out[..., :, 0] = 0.0
+    out[..., :, -1] = 0.0
+    return out
+
+
+def cfl_dt(cfl, c, dx, dy):
+    """5 点格式 + leapfrog 的时间步 cfl / (c·√(1/dx² + 1/dy²))；dx = dy 时即原脚本的 cfl·dx/(c√2)"""
+    if dx == dy:
+        return cfl * dx / (c*np.sqrt(2))
+    return cfl / (c*np.sqrt(1.0/(dx*dx) + 1.0/(dy*dy)))
+
+
+# ===== 差分核 =====
+def laplacian(P, out, dx, periodic=True, dy=None):
+    """
+    5 点拉普拉斯 (E + W − 2C)/dx² + (N + S − 2C)/dy²，写入 out（物理形状）。要求 P 的幽灵格已刷新。
+    dx ≠ dy 时按 [(E + W − 2C)·(dy²/dx²) + N + S − 2C] / dy² 就地计算，不需要额外缓冲。
+    """
+    C = P[..., 1:-1, 1:-1]
+    if dy is None or dy == dx:
+        np.multiply(C, -4.0, out=out)
+        out += P[..., 2:, 1:-1]
+        out += P[..., :-2, 1:-1]
+        out += P[..., 1:-1, 2:]
+        out += P[..., 1:-1, :-2]
+        out *= 1.0 / (dx*dx)
+    else:
+        np.add(P[..., 2:, 1:-1], P[..., :-2, 1:-1], out=out)
+        out -= C
+        out -= C
+        out *= (dy*dy) / (dx*dx)
+        out += P[..., 1:-1, 2:]
+        out += P[..., 1:-1, :-2]
+        out -= C
+        out -= C
+        out *= 1.0 / (dy*dy)
+    if not periodic:
+        zero_border(out)
+    return out
+
+
+def split_rows(Nx, parts):
+    """把 0..Nx 均匀切成 parts 段，返回 [(r0, r1), ...]（物理行号，左闭右开）"""
+    edges = np.linspace(0, Nx, parts + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def laplacian_rows(P, out, r0, r1, dx, periodic=True, dy=None):
+    """
+    只对物理行 [r0, r1) 做 5 点拉普拉斯，out 形状为 (..., r1−r0, Ny)。
+    条带上下相邻的一行（halo）直接读 P；非周期时只把全局最外一圈置 0，
+    因此各条带拼起来与整体调用 laplacian() 逐位一致。
+    """
+    Nx = P.shape[-2] - 2
+    laplacian(P[..., r0:r1 + 2, :], out, dx, periodic=True, dy=dy)
+    if not periodic:
+        if r0 == 0:
+            out[..., 0, :] = 0.0
+        if r1 == Nx:
+            out[..., -1, :] = 0.0
+        out[..., :, 0] = 0.0
+        out[..., :, -1] = 0.0
+    return out
+
+
+def gather_periodic(A, i0, i1, j0, j1, out):
+    """
+    周期场 A（物理形状 (..., Nx, Ny)）的矩形窗 [i0, i1) × [j0, j1) 写入 out，下标越界时按周期回绕；
+    窗完全在域内时是普通切片拷贝，只有贴边的块才走花式索引（块本身很小）。
+    """
+    Nx, Ny = A.shape[-2:]
+    if 0 <= i0 and i1 <= Nx and 0 <= j0 and j1 <= Ny:
+        out[...] = A[..., i0:i1, j0:j1]
+    else:
+        rows = np.arange(i0, i1) % Nx
+        cols = np.arange(j0, j1) % Ny
+        out[...] = A[..., rows[:, None], cols]
+    return out
+
+
+def ddx(P, out, dx, periodic=True):
+    """x 方向中心差分 (Z[i+1] − Z[i−1]) / 2dx"""
+    np.subtract(P[..., 2:, 1:-1], P[..., :-2, 1:-1], out=out)
+    out *= 0.5 / dx
+    if not periodic:
+        out[..., 0, :] = 0.0
+        out[..., -1, :] = 0.0
+    return out
+
+
+def ddy(P, out, dy, periodic=True):
+    """y 方向中心差分 (Z[j+1] − Z[j−1]) / 2dy"""
+    np.subtract(P[..., 1:-1, 2:], P[..., 1:-1, :-2], out=out)
+    out *= 0.5 / dy
+    if not periodic:
+        out[..., :, 0] = 0.0
+        out[..., :, -1] = 0.0
+    return out
+
+
+def Bz_from_A(Px, Py, out, tmp, dx, periodic=True, dy=None):
+    """Bz = ∂xAy − ∂yAx；tmp 为与 out 同形的工作缓冲"""
+    dy = dx if dy is None else dy
+    ddx(Py, out, dx, periodic)
+    ddy(Px, tmp, dy, periodic)
+    out -= tmp
+    return out
+
+
+def energy_density(Px, Py, Ex, Ey, out, tmp, dx, c=1.0, periodic=True, dy=None):
+    """
+    𝓔 = ½(Ex² + Ey² + c²|∇A|²)，|∇A|² 为四个中心差分的平方和。
+    Ex, Ey 为电场（或 ∂tA，符号不影响能量）。tmp 为工作缓冲。
+    """
+    dy = dx if dy is None else dy
+    out[...] = 0.0
+    for P in (Px, Py):
+        ddx(P, tmp, dx, periodic); tmp *= tmp; out += tmp
+        ddy(P, tmp, dy, periodic); tmp *= tmp; out += tmp
+    out *= c*c
+    np.multiply(Ex, Ex, out=tmp); out += tmp
+    np.multiply(Ey, Ey, out=tmp); out += tmp
+    out *= 0.5
+    return out
+
+
+def fused_diagnostics(Px, Py, Ex, Ey, Bz, En, tmp, dx, c=1.0, periodic=True, inner=None,
+                      dtype=None, dy=None):
+    """
+    一次遍历同时得到 Bz 与 𝓔：四个中心差分 ∂xAy、∂yAx、∂xAx、∂yAy 各只算一次，
+    ∂xAy、∂yAx 同时用于 Bz 与 |∇A|²。
+    inner 为内部区域的切片元组（如 (slice(w, -w), slice(w, -w))），None 表示与全域相同。
+    返回 (Bz, En, 全域 Σ𝓔, 内部 Σ𝓔)；求和只对最后两个轴进行（批量时按成员给出），未乘面积元 dx·dy。
+    dtype 为求和的累加精度（如 float32 场配 float64 累加），None 表示与 En 相同。
+    """
+    dy = dx if dy is None else dy
+    ddx(Py, Bz, dx, periodic)                      # ∂xAy
+    ddy(Px, tmp, dy, periodic)                     # ∂yAx
+    np.multiply(Bz, Bz, out=En)
+    Bz -= tmp
+    tmp *= tmp; En += tmp
+    ddx(Px, tmp, dx, periodic); tmp *= tmp; En += tmp
+    ddy(Py, tmp, dy, periodic); tmp *= tmp; En += tmp
+    En *= c*c
+    np.multiply(Ex, Ex, out=tmp); En += tmp
+    np.multiply(Ey, Ey, out=tmp); En += tmp
+    En *= 0.5
+    total = np.sum(En, axis=(-2, -1), dtype=dtype)
+    inner_sum = total if inner is None else np.sum(En[(Ellipsis, *inner)], axis=(-2, -1), dtype=dtype)
+    return Bz, En, total, inner_sum
+
+
+# ===== 高阶（宽模板）差分核 =====
+# 周期场用 g 层幽灵格存放（形状 (..., Nx+2g, Ny+2g)），g = order/2。
+# 二阶导数的中心差分系数 [c0, c1, …]：f'' ≈ (c0·f + Σ cm·(f[+m] + f[−m])) / h²
+LAP_COEF = {
+    2: (-2.0, 1.0),
+    4: (-5/2, 4/3, -1/12),
+    6: (-49/18, 3/2, -3/20, 1/90),
+}
+# 一阶导数的反对称系数 [d1, d2, …]：f' ≈ Σ dm·(f[+m] − f[−m]) / h
+D1_COEF = {
+    2: (1/2,),
+    4: (2/3, -1/12),
+    6: (3/4, -3/20, 1/60),
+}
+
+
+def ghost_width(order):
+    """order 阶中心模板需要的幽灵格层数"""
+    if order not in LAP_COEF:
+        raise ValueError(f"不支持的差分阶数：{order}（可选 {sorted(LAP_COEF)}）")
+    return order // 2
+
+
+def lap_symbol_max(order):
+    """1D 二阶导数模板在 Nyquist 波数处的符号 |λ|·h²（2 阶为 4，4 阶为 16/3，6 阶为 272/45）"""
+    coef = LAP_COEF[order]
+    return -(coef[0] + 2*sum(cm * (-1)**m for m, cm in enumerate(coef[1:], 1)))
+
+
+def padded_wide(shape, g, dtype=float):
+    """为物理形状 (..., Nx, Ny) 分配带 g 层幽灵格的零数组"""
+    *lead, Nx, Ny = shape
+    return np.zeros((*lead, Nx + 2*g, Ny + 2*g), dtype=dtype)
+
+
+def interior_wide(P, g):
+    return P[..., g:-g, g:-g]
+
+
+def fill_ghosts_wide(P, g):
+    """周期边界：g 层幽灵格取对侧的值"""
+    P[..., :g, g:-g] = P[..., -2*g:-g, g:-g]
+    P[..., -g:, g:-g] = P[..., g:2*g, g:-g]
+    P[..., :, :g] = P[..., :, -2*g:-g]
+    P[..., :, -g:] = P[..., :, g:2*g]
+    return P
+
+
+def laplacian_wide(P, out, dx, dy, order, tmp):
+    """
+    order 阶中心拉普拉斯，写入 out（物理形状；P 的行数可以只是条带 + 上下 g 行 halo）。
+    要求 P 的幽灵格已刷新；tmp 为与 out 同形的工作缓冲。
+    """
+    coef = LAP_COEF[order]
+    g = len(coef) - 1
+    nx, ny = out.shape[-2], out.shape[-1]
+    C = P[..., g:g + nx, g:g + ny]
+    np.multiply(C, coef[0] * (1/(dx*dx) + 1/(dy*dy)), out=out)
+    for m, cm in enumerate(coef[1:], 1):
+        np.add(P[..., g + m:g + m + nx, g:g + ny], P[..., g - m:g - m + nx, g:g + ny], out=tmp)
+        tmp *= cm / (dx*dx)
+        out += tmp
+        np.add(P[..., g:g + nx, g + m:g + m + ny], P[..., g:g + nx, g - m:g - m + ny], out=tmp)
+        tmp *= cm / (dy*dy)
+        out += tmp
+    return out
+
+
+def ddx_wide(P, out, dx, order, tmp):
+    """order 阶 x 方向中心一阶导数"""
+    g = len(D1_COEF[order])
+    nx, ny = out.shape[-2], out.shape[-1]
+    out[...] = 0.0
+    for m, dm in enumerate(D1_COEF[order], 1):
+        np.subtract(P[..., g + m:g + m + nx, g:g + ny], P[..., g - m:g - m + nx, g:g + ny], out=tmp)
+        tmp *= dm / dx
+        out += tmp
+    return out
+
+
+def ddy_wide(P, out, dy, order, tmp):
+    """order 阶 y 方向中心一阶导数"""
+    g = len(D1_COEF[order])
+    nx, ny = out.shape[-2], out.shape[-1]
+    out[...] = 0.0
+    for m, dm in enumerate(D1_COEF[order], 1):
+        np.subtract(P[..., g:g + nx, g + m:g + m + ny], P[..., g:g + nx, g - m:g - m + ny], out=tmp)
+        tmp *= dm / dy
+        out += tmp
+    return out
+
+
+# ===== 三维（一层幽灵格，幽灵格恒为 0 即 Dirichlet 外边界） =====
+def laplacian3d(P, out, dx, dy, dz, tmp):
+    """
+    7 点拉普拉斯：P 为带一层幽灵格的块 (..., nx+2, ny+2, nz+2)（可以是 x 条带 + 上下 halo），
+    结果写入 out (..., nx, ny, nz)；tmp 为与 out 同形的工作缓冲。
+    """
+    C = P[..., 1:-1, 1:-1, 1:-1]
+    np.add(P[..., 2:, 1:-1, 1:-1], P[..., :-2, 1:-1, 1:-1], out=out)
+    out *= 1.0 / (dx*dx)
+    np.add(P[..., 1:-1, 2:, 1:-1], P[..., 1:-1, :-2, 1:-1], out=tmp)
+    tmp *= 1.0 / (dy*dy)
+    out += tmp
+    np.add(P[..., 1:-1, 1:-1, 2:], P[..., 1:-1, 1:-1, :-2], out=tmp)
+    tmp *= 1.0 / (dz*dz)
+    out += tmp
+    np.multiply(C, -2.0*(1/(dx*dx) + 1/(dy*dy) + 1/(dz*dz)), out=tmp)
+    out += tmp
+    return out
+
+
+def diff3d(P, out, axis, h):
+    """三维块沿 axis（0/1/2 对应 x/y/z）的中心差分 (Z[+1] − Z[−1]) / 2h，写入 out"""
+    hi = [slice(1, -1)] * 3
+    lo = [slice(1, -1)] * 3
+    hi[axis], lo[axis] = slice(2, None), slice(None, -2)
+    np.subtract(P[(Ellipsis, *hi)], P[(Ellipsis, *lo)], out=out)
+    out *= 0.5 / h
+    return out
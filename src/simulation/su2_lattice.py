@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+su2_lattice.py
+二维 / 三维 SU(2) 格点规范场（yang_mills_lagrangian_nonabelian.py 的数值对应）。
+链变量以单位四元数存放：U = a0·1 + i(a1σ1 + a2σ2 + a3σ3)，数组形状 (d, L1, …, Ld, 4)，
+  * 比 2×2 复矩阵省一半内存（4 个 float64 对 4 个 complex128）；
+  * 矩阵乘法变成逐元素的四元数乘法（qmul），½Tr U = a0，U† = (a0, −a)。
+Wilson 作用量 S = β Σ_p (1 − ½Tr U_p)，更新为 Kennedy–Pendleton 热浴 + 过松弛（overrelaxation），
+按方向 μ 与棋盘奇偶分组：同一方向、同一奇偶的链互不共享小方格，可整组向量化更新。
+用法示例：
+  lat = SU2Lattice((32, 32), beta=2.0, seed=0)
+  lat.run(200, overrelax=2)             # 200 次扫描，每次 1 次热浴 + 2 次过松弛
+  print(lat.mean_plaquette())           # 二维无穷体积精确值 I2(β)/I1(β)
+检查点：state_dict()/load_state_dict() 与 checkpoint.py 兼容。
+"""
+import numpy as np
+
+
+# ===== 四元数运算（最后一个轴为 4 个分量） =====
+def qmul(a, b, out=None):
+    """四元数（SU(2)）乘积 a·b；out 不能与 a、b 共用内存"""
+    if out is None:
+        out = np.empty(np.broadcast_shapes(a.shape, b.shape))
+    a0, a1, a2, a3 = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    b0, b1, b2, b3 = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+    # (a0 + i a·σ)(b0 + i b·σ) = (a0b0 − a·b) + i(a0 b + b0 a − a×b)·σ
+    out[..., 0] = a0*b0 - a1*b1 - a2*b2 - a3*b3
+    out[..., 1] = a0*b1 + a1*b0 - a2*b3 + a3*b2
+    out[..., 2] = a0*b2 + a2*b0 - a3*b1 + a1*b3
+    out[..., 3] = a0*b3 + a3*b0 - a1*b2 + a2*b1
+    return out
+
+
+_CONJ = np.array([1.0, -1.0, -1.0, -1.0])
+
+
+def qconj(a, out=None):
+    """U† = (a0, −a1, −a2, −a3)"""
+    return np.multiply(a, _CONJ, out=out)
+
+
+def qnorm(a):
+    return np.sqrt(np.sum(a*a, axis=-1))
+
+
+def to_matrix(a):
+    """四元数 → 2×2 复矩阵（仅用于校验）"""
+    a0, a1, a2, a3 = (a[..., k] for k in range(4))
+    return np.stack([np.stack([a0 + 1j*a3, a2 + 1j*a1], -1),
+                     np.stack([-a2 + 1j*a1, a0 - 1j*a3], -1)], -2)
+
+
+def random_su2(rng, shape):
+    """Haar 均匀分布的 SU(2) 元素：4 维高斯向量归一化"""
+    q = rng.standard_normal((*shape, 4))
+    q /= qnorm(q)[..., None]
+    return q
+
+
+def sample_kp(rng, alpha):
+    """
+    Kennedy–Pendleton：按密度 ∝ √(1−x0²)·exp(α·x0) 抽样 x0，再配上均匀方向的 x⃗（|x| = 1）。
+    alpha 为一维数组，逐元素独立；被拒绝的元素只重抽自己。
+    """
+    n = alpha.size
+    x0 = np.empty(n)
+    todo = np.arange(n)
+    while todo.size:
+        a = alpha[todo]
+        r1, r2, r3, r4 = (1.0 - rng.random(todo.size) for _ in range(4))   # (0, 1]
+        lam2 = -(np.log(r1) + np.cos(2*np.pi*r2)**2 * np.log(r3)) / (2*a)
+        ok = r4*r4 <= 1.0 - lam2
+        x0[todo[ok]] = 1.0 - 2.0*lam2[ok]
+        todo = todo[~ok]
+    r = np.sqrt(np.maximum(1.0 - x0*x0, 0.0))
+    cos_t = rng.uniform(-1.0, 1.0, n)
+    sin_t = np.sqrt(1.0 - cos_t*cos_t)
+    phi = rng.uniform(0.0, 2*np.pi, n)
+    return np.stack([x0, r*sin_t*np.cos(phi), r*sin_t*np.sin(phi), r*cos_t], axis=-1)
+
+
+class SU2Lattice:
+    """
+    周期边界的 d 维（d = 2 或 3）SU(2) 格点规范场。
+    U[μ][x] 为从格点 x 指向 x+μ̂ 的链；各方向长度须为偶数（棋盘分组）。
+    start="cold" 时所有链为单位元，"hot" 时为 Haar 随机。
+    """
+
+    def __init__(self, shape=(32, 32), beta=2.0, seed=None, start="cold"):
+        self.shape = tuple(shape)
+        self.d = len(self.shape)
+        if self.d not in (2, 3):
+            raise ValueError("只支持二维或三维格点")
+        if any(L % 2 for L in self.shape):
+            raise ValueError("棋盘更新要求各方向格点数为偶数")
+        self.beta = float(beta)
+        self.rng = np.random.default_rng(seed)
+        self.n = 0                                  # 已完成的扫描次数
+        if start == "cold":
+            self.U = np.zeros((self.d, *self.shape, 4))
+            self.U[..., 0] = 1.0
+        elif start == "hot":
+            self.U = random_su2(self.rng, (self.d, *self.shape))
+        else:
+            raise ValueError(f"未知的初始构型：{start!r}（可选 'cold' 或 'hot'）")
+
+        parity = np.indices(self.shape).sum(axis=0) % 2
+        self._parity = [parity == p for p in (0, 1)]
+        # 工作缓冲：两个乘积临时区 + staple 累加
+        self._t1 = np.empty((*self.shape, 4))
+        self._t2 = np.empty((*self.shape, 4))
+        self._V = np.empty((*self.shape, 4))
+        self.plaquette_hist = []
+
+    # ===== 平移（周期） =====
+    @staticmethod
+    def _shift(a, mu, s):
+        """a(x + s·μ̂)"""
+        return np.roll(a, -s, axis=mu)
+
+    # ===== 小方格与作用量 =====
+    def plaquette(self, mu, nu, out=None):
+        """U_μν(x) = U_μ(x) U_ν(x+μ̂) U_μ(x+ν̂)† U_ν(x)†，返回形状 (*shape, 4)"""
+        U, t1, t2 = self.U, self._t1, self._t2
+        qmul(U[mu], self._shift(U[nu], mu, 1), out=t1)
+        qmul(t1, qconj(self._shift(U[mu], nu, 1)), out=t2)
+        return qmul(t2, qconj(U[nu]), out=out)
+
+    def mean_plaquette(self):
+        """⟨½Tr U_p⟩，对所有格点与所有 μ<ν 平均"""
+        s, count = 0.0, 0
+        for mu in range(self.d):
+            for nu in range(mu + 1, self.d):
+                s += np.sum(self.plaquette(mu, nu, out=self._V)[..., 0])
+                count += 1
+        return s / (count * np.prod(self.shape))
+
+    def wilson_action(self):
+        """S = β Σ_p (1 − ½Tr U_p)"""
+        n_p = self.d * (self.d - 1) // 2 * np.prod(self.shape)
+        return self.beta * n_p * (1.0 - self.mean_plaquette())
+
+    def staple(self, mu, out=None):
+        """
+        V_μ(x) = Σ_{ν≠μ} [U_ν(x+μ̂) U_μ(x+ν̂)† U_ν(x)† + U_ν(x+μ̂−ν̂)† U_μ(x−ν̂)† U_ν(x−ν̂)]，
+        使得含 U_μ(x) 的小方格之和为 ½Tr(U_μ(x)·V_μ(x))。
+        """
+        if out is None:
+            out = np.empty((*self.shape, 4))
+        U, t1, t2 = self.U, self._t1, self._t2
+        out[...] = 0.0
+        for nu in range(self.d):
+            if nu == mu:
+                continue
+            # 上方
+            qmul(self._shift(U[nu], mu, 1), qconj(self._shift(U[mu], nu, 1)), out=t1)
+            qmul(t1, qconj(U[nu]), out=t2)
+            out += t2
+            # 下方：先在 x 处组装 U_ν(x+μ̂)† U_μ(x)† U_ν(x)，再整体平移 −ν̂
+            qmul(qconj(self._shift(U[nu], mu, 1)), qconj(U[mu]), out=t1)
+            qmul(t1, U[nu], out=t2)
+            out += self._shift(t2, nu, -1)
+        return out
+
+    # ===== 更新 =====
+    def heatbath(self):
+        """一次热浴扫描：对每个方向 μ、每个奇偶，整组按 exp(β/2·Tr(U V)) 重抽链"""
+        for mu in range(self.d):
+            for mask in self._parity:
+                V = self.staple(mu, out=self._V)[mask]
+                k = qnorm(V)
+                W = V / k[:, None]                          # V = k·W，W ∈ SU(2)
+                X = sample_kp(self.rng, self.beta * k)      # X = U·W 的分布
+                self.U[mu][mask] = qmul(X, qconj(W))
+        return self
+
+    def overrelax(self):
+        """一次过松弛扫描：U → W†U†W†，作用量不变，用来加快去关联"""
+        for mu in range(self.d):
+            for mask in self._parity:
+                V = self.staple(mu, out=self._V)[mask]
+                Wd = qconj(V / qnorm(V)[:, None])
+                self.U[mu][mask] = qmul(qmul(Wd, qconj(self.U[mu][mask])), Wd)
+        return self
+
+    def reunitarize(self):
+        """把链重新归一化，消除长时间运行的舍入漂移"""
+        self.U /= qnorm(self.U)[..., None]
+        return self
+
+    def sweep(self, overrelax=0):
+        self.heatbath()
+        for _ in range(overrelax):
+            self.overrelax()
+        self.n += 1
+        if self.n % 50 == 0:
+            self.reunitarize()
+        return self
+
+    def run(self, sweeps, overrelax=0, callback=None, every=1, measure=True):
+        """连续 sweeps 次扫描；measure=True 时每次记录平均小方格，callback 每 every 次调用一次"""
+        for _ in range(sweeps):
+            self.sweep(overrelax)
+            if measure:
+                self.plaquette_hist.append(self.mean_plaquette())
+            if callback is not None and self.n % every == 0:
+                callback(self)
+        return self
+
+    def gauge_transform(self, g):
+        """U_μ(x) → g(x) U_μ(x) g(x+μ̂)†（g 形状 (*shape, 4)，用于校验规范不变性）"""
+        for mu in range(self.d):
+            self.U[mu] = qmul(qmul(g, self.U[mu]), qconj(self._shift(g, mu, 1)))
+        return self
+
+    # ===== 完整状态（与 checkpoint.py 兼容） =====
+    def state_dict(self):
+        return dict(kind=type(self).__name__, shape=np.asarray(self.shape), beta=self.beta,
+                    n=self.n, U=self.U.copy(), rng_state=self.rng.bit_generator.state,
+                    plaquette_hist=np.asarray(self.plaquette_hist))
+
+    def load_state_dict(self, state):
+        if state["kind"] != type(self).__name__:
+            raise ValueError(f"检查点属于 {state['kind']}，不能载入 {type(self).__name__}")
+        if tuple(state["shape"]) != self.shape or state["beta"] != self.beta:
+            raise ValueError("检查点的格点形状或 β 与当前设置不一致")
+        self.U[...] = state["U"]
+        self.n = int(state["n"])
+        self.rng.bit_generator.state = state["rng_state"]
+        self.plaquette_hist[:] = list(state["plaquette_hist"])
+        return self
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+verify_3d.py
+三维求解器（gauge_solver_3d.py）的检查：
+  1. 条带化步进与诊断：不同 slab 行数（含不整除 Nx 的情形）下，海绵层 + 点源推进若干步的场与能量，
+     和直接用整网格数组写出的 7 点拉普拉斯 / 半隐式阻尼 / 中心差分能量的参照实现一致（舍入误差量级）；
+  2. 能量守恒：三维求解器没有周期边界，改用无海绵层、无外源的封闭盒（幽灵格恒为 0 的反射壁），
+     格式的离散守恒量 H = ½ V^{n−½}·V^{n+½} − ½c² A^n·(∇²A^n)（按 7 点拉普拉斯）逐步守恒到舍入误差，
+     diagnose() 的中心差分能量不是格式的精确不变量、只有有界振荡，检查其没有长期漂移；
+  3. 混合精度：float32 存储的能量曲线与末态 Bz 切片和 float64 一致（能量求和始终为 float64）。
+用法：python verify_3d.py [N] [steps]
+"""
+import sys
+import numpy as np
+
+from gauge_solver_3d import AbsorbingGaugeSolver3D, ramp_1d
+
+
+def packet(x, y, z):
+    return np.exp(-(x*x + y*y + z*z)/0.72) * np.cos(2.5*x)
+
+
+def init(s):
+    return s.set_initial(Ax=packet, Ay=lambda x, y, z: 0.5*packet(y, z, x),
+                         Vz=lambda x, y, z: 0.3*packet(z, x, y))
+
+
+# ===== 参照实现：整网格数组，逐项照公式写 =====
+def lap(a, h):
+    """7 点拉普拉斯，外侧补 0"""
+    p = np.pad(a, 1)
+    return ((p[2:, 1:-1, 1:-1] - 2*a + p[:-2, 1:-1, 1:-1]) / h[0]**2
+            + (p[1:-1, 2:, 1:-1] - 2*a + p[1:-1, :-2, 1:-1]) / h[1]**2
+            + (p[1:-1, 1:-1, 2:] - 2*a + p[1:-1, 1:-1, :-2]) / h[2]**2)
+
+
+def reference(s, steps):
+    """与 s 相同参数与初值，用整网格数组推进 steps 步，返回 (A, V, 每步末的能量)"""
+    A = [a.astype(np.float64) for a in s.A]
+    V = [v.astype(np.float64) for v in s.V]
+    h = (s.dx, s.dy, s.dz)
+    w, gmax = s.sponge_width, s._gx.max() if s.sponge_width else 0.0
+    g = [ramp_1d(n, w, gmax) for n in s.shape] if w else [np.zeros(n) for n in s.shape]
+    gamma = np.maximum(np.maximum(g[0][:, None, None], g[1][None, :, None]), g[2][None, None, :])
+    damp = (1 - 0.5*gamma*s.dt) / (1 + 0.5*gamma*s.dt)
+    gain = s.dt / (1 + 0.5*gamma*s.dt)
+
+    def energy(A, V):
+        grads = 0.0
+        for a in A:
+            p = np.pad(a, 1)
+            grads = grads + ((p[2:, 1:-1, 1:-1] - p[:-2, 1:-1, 1:-1]) / (2*h[0]))**2 \
+                          + ((p[1:-1, 2:, 1:-1] - p[1:-1, :-2, 1:-1]) / (2*h[1]))**2 \
+                          + ((p[1:-1, 1:-1, 2:] - p[1:-1, 1:-1, :-2]) / (2*h[2]))**2
+        En = 0.5*(sum(v*v for v in V) + s.c**2 * grads)
+        return float(En.sum()) * s.dx*s.dy*s.dz
+
+    E = []
+    for n in range(s.n, s.n + steps):
+        S = np.zeros(s.shape)
+        S[s.cx, s.cy, s.cz] = s.source(n)
+        V = [damp*v + gain*(s.c**2 * lap(a, h) + (S if i == 0 else 0.0))
+             for i, (a, v) in enumerate(zip(A, V))]
+        A = [a + s.dt*v for a, v in zip(A, V)]
+        E.append(energy(A, V))
+    return A, V, np.array(E)
+
+
+def check_slabs(N=24, steps=30):
+    ok = True
+    for slab in (1, 5, 8, N):
+        s = init(AbsorbingGaugeSolver3D(N, N + 2, N - 3, 0.1*N, 0.1*(N + 2), 0.1*(N - 3),
+                                        sponge_width=6, slab=slab, diag_every=1))
+        A_ref, V_ref, E_ref = reference(s, steps)
+        s.step(steps)
+        scale = max(np.max(np.abs(a)) for a in A_ref)
+        err = max(np.max(np.abs(a - b)) for a, b in zip((*s.A, *s.V), (*A_ref, *V_ref))) / scale
+        e_err = np.max(np.abs(np.array(s.energy_all_hist) - E_ref)) / E_ref[0]
+        good = err < 1e-12 and e_err < 1e-12
+        ok &= good
+        print(f"  slab={slab:2d}（{len(s._slabs)} 条带）：场相对误差 {err:.1e}，能量相对误差 {e_err:.1e}"
+              f"  {'✅' if good else '❌'}")
+    return ok
+
+
+def check_energy(N=32, steps=2000, every=10):
+    s = init(AbsorbingGaugeSolver3D(N, N, N, 0.1*N, 0.1*N, 0.1*N, gamma_max=0.0, drive_amp=0.0,
+                                    diag_every=every))
+    h, dV = (s.dx, s.dy, s.dz), s.dx*s.dy*s.dz
+    s.diagnose()
+    H = []
+    for _ in range(steps):
+        V_half = [v.copy() for v in s.V]                 # V^{n−½}
+        pot = -0.5 * s.c**2 * sum(float(np.sum(a * lap(a, h))) for a in s.A)
+        s.step()                                         # 之后 s.V 为 V^{n+½}
+        H.append((0.5*sum(float(np.sum(u*v)) for u, v in zip(V_half, s.V)) + pot) * dV)
+    H = np.array(H)
+    h_dev = np.max(np.abs(H/H[0] - 1))
+    E = np.array(s.energy_all_hist)
+    q = len(E) // 4
+    osc = np.max(np.abs(E/E[0] - 1))
+    trend = abs(E[-q:].mean() - E[:q].mean()) / E[0]
+    ok = h_dev < 1e-12 and trend < 1e-3
+    print(f"  封闭盒 {N}³，{steps} 步：离散守恒量 max|H/H0 − 1| = {h_dev:.2e}；"
+          f"诊断能量振荡 {osc:.2e}，首尾 1/4 均值之差 {trend:.2e}  {'✅' if ok else '❌'}")
+    return ok
+
+
+def check_precision(N=32, steps=400, every=10):
+    runs = {}
+    for dtype in (np.float64, np.float32):
+        s = init(AbsorbingGaugeSolver3D(N, N, N, 0.1*N, 0.1*N, 0.1*N, dtype=dtype, diag_every=every))
+        s.step(steps)
+        runs[dtype] = np.array(s.energy_all_hist), s.slice("Bz").astype(np.float64)
+    (E64, B64), (E32, B32) = runs[np.float64], runs[np.float32]
+    dev = np.max(np.abs(E32 - E64)) / E64[0]
+    bz = np.max(np.abs(B32 - B64)) / np.max(np.abs(B64))
+    ok = dev < 1e-4 and bz < 1e-3
+    print(f"  {N}³，{steps} 步：|E32 − E64|/E0 = {dev:.2e}，Bz 切片相对误差 {bz:.2e}  {'✅' if ok else '❌'}")
+    return ok
+
+
+if __name__ == "__main__":
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    print("条带化步进 vs 整网格参照：")
+    results = [check_slabs()]
+    print("能量守恒：")
+    results.append(check_energy(N, steps))
+    print("float32 vs float64：")
+    results.append(check_precision(N))
+    print("✅ 条带化三维求解器与参照一致、能量守恒、float32 精度足够" if all(results) else "❌")
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+verify_backends.py
+差分核后端（backends.py）的一致性与耗时：
+  1. 单个核：拉普拉斯（周期 / 非周期、整场 / 行条带）、阻尼更新、融合诊断，NumPy 与 Numba 逐项对比；
+  2. 整步：Leapfrog、海绵层（融合整步核 + 稀疏外源修正）、PML（Numba 只替换拉普拉斯），
+     float64 / float32、单个 / 批量，推进若干步后场与能量的相对差在舍入误差以内；
+  3. 退回：Numba 不可导入时 get_backend("numba") 给出警告并返回 NumPy 后端，求解器照常运行；
+  4. 耗时：两种后端每步耗时对比。
+未安装 Numba 时只做第 3 项。
+用法：python verify_backends.py [N]
+"""
+import subprocess
+import sys
+import textwrap
+import time
+
+import numpy as np
+
+import stencils as st
+from backends import get_backend, numba_available
+from gauge_solver import LeapfrogGaugeSolver, AbsorbingGaugeSolver
+
+
+def rel(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    return float(np.max(np.abs(a - b)) / max(np.max(np.abs(b)), 1e-300))
+
+
+def check_kernels(npb, nbb):
+    rng = np.random.default_rng(0)
+    worst = {}
+    for dtype, tol in ((np.float64, 1e-14), (np.float32, 1e-6)):
+        P = rng.standard_normal((2, 34, 42)).astype(dtype)
+        Q = rng.standard_normal((2, 34, 42)).astype(dtype)
+        for periodic in (True, False):
+            a = np.zeros((2, 32, 40), dtype=dtype); b = np.zeros_like(a)
+            npb.laplacian_rows(P, a, 0, 32, 0.1, periodic)
+            nbb.laplacian_rows(P, b, 0, 32, 0.1, periodic)
+            worst[f"laplacian {np.dtype(dtype).name} periodic={periodic}"] = (rel(b, a), tol)
+            a = np.zeros((2, 10, 40), dtype=dtype); b = np.zeros_like(a)
+            npb.laplacian_rows(P, a, 22, 32, 0.1, periodic)
+            nbb.laplacian_rows(P, b, 22, 32, 0.1, periodic)
+            worst[f"laplacian 行条带 {np.dtype(dtype).name} periodic={periodic}"] = (rel(b, a), tol)
+            Ex, Ey = rng.standard_normal((2, 2, 32, 40)).astype(dtype)
+            outs = [np.zeros((2, 32, 40), dtype=dtype) for _ in range(5)]
+            ra = npb.fused_diagnostics(P, Q, Ex, Ey, outs[0], outs[1], outs[2], 0.1, 1.3, periodic,
+                                       (slice(4, -4), slice(4, -4)), np.float64)
+            rb = nbb.fused_diagnostics(P, Q, Ex, Ey, outs[3], outs[4], None, 0.1, 1.3, periodic,
+                                       (slice(4, -4), slice(4, -4)), np.float64)
+            worst[f"Bz/𝓔 {np.dtype(dtype).name} periodic={periodic}"] = (
+                max(rel(x, y) for x, y in zip(rb, ra)), tol)
+    ok = True
+    for name, (err, tol) in worst.items():
+        print(f"  {name:36s} 相对差 {err:.2e}  {'✅' if err <= tol else '❌'}")
+        ok &= err <= tol
+    return ok
+
+
+def init(s):
+    X, Y = s.X, s.Y
+    r2 = X**2 + Y**2
+    return s.set_initial(np.exp(-r2 / 0.72) * np.cos(3*X), np.exp(-r2 / 0.72) * np.sin(3*Y))
+
+
+def check_steps():
+    cases = [("Leapfrog", lambda **kw: init(LeapfrogGaugeSolver(96, 96, 0.067, 0.067, **kw))),
+             ("海绵层 + 点源", lambda **kw: init(AbsorbingGaugeSolver(96, 96, **kw))),
+             ("PML + 点源", lambda **kw: init(AbsorbingGaugeSolver(96, 96, boundary="pml", **kw)))]
+    ok = True
+    for name, make in cases:
+        for dtype, tol in ((np.float64, 1e-12), (np.float32, 1e-4)):
+            for batch in (None, 2):
+                a = make(dtype=dtype, batch=batch, backend="numpy").step(400)
+                b = make(dtype=dtype, batch=batch, backend="numba").step(400)
+                err = max(rel(b.Ax, a.Ax), rel(b.Ay, a.Ay), rel(b.diagnose()[2], a.diagnose()[2]))
+                good = err <= tol
+                ok &= good
+                print(f"  {name:14s} {np.dtype(dtype).name:8s} batch={str(batch):5s} 400 步相对差 {err:.2e}"
+                      f"  {'✅' if good else '❌'}")
+    return ok
+
+
+def check_fallback():
+    """子进程里让 import numba 失败，检查自动退回"""
+    code = textwrap.dedent("""
+        import sys, warnings
+        sys.modules["numba"] = None                  # 使 import numba 抛出 ImportError
+        warnings.simplefilter("error")
+        from backends import get_backend
+        try:
+            get_backend("numba")
+            raise SystemExit("no warning")
+        except RuntimeWarning:
+            pass
+        warnings.simplefilter("ignore")
+        from gauge_solver import AbsorbingGaugeSolver
+        s = AbsorbingGaugeSolver(48, 48, backend="numba").step(20)
+        assert s.backend.name == "numpy" and get_backend("auto").name == "numpy"
+        print("ok")
+    """)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    ok = out.returncode == 0 and out.stdout.strip() == "ok"
+    print(f"  无 Numba 时 backend='numba' 警告并退回 NumPy：{'✅' if ok else '❌ ' + out.stderr[-300:]}")
+    return ok
+
+
+def bench(N):
+    rows = []
+    for name, make in (("Leapfrog", lambda b: init(LeapfrogGaugeSolver(N, N, 6.4/N, 6.4/N, backend=b))),
+                       ("海绵层", lambda b: init(AbsorbingGaugeSolver(N, N, backend=b)))):
+        t = {}
+        for b in ("numpy", "numba"):
+            s = make(b).step(3)                      # 预热（含 JIT 编译）
+            steps = max(10, int(2e7 // (N*N)))
+            t0 = time.perf_counter()
+            s.step(steps)
+            t[b] = (time.perf_counter() - t0) / steps
+        rows.append((name, t["numpy"], t["numba"]))
+        print(f"  {name:10s} N={N}  NumPy {1e3*t['numpy']:.2f} ms/步  Numba {1e3*t['numba']:.2f} ms/步"
+              f"  {t['numpy']/t['numba']:.1f}×")
+    return rows
+
+
+if __name__ == "__main__":
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    results = [check_fallback()]
+    if numba_available():
+        npb, nbb = get_backend("numpy"), get_backend("numba")
+        print("单个核：")
+        results.append(check_kernels(npb, nbb))
+        print("整步：")
+        results.append(check_steps())
+        print("耗时：")
+        bench(N)
+    else:
+        print("未安装 Numba：跳过一致性与耗时对比")
+    print("✅ 后端一致，缺少 Numba 时自动退回 NumPy" if all(results) else "❌")
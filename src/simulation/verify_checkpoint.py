@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+verify_checkpoint.py
+检查点续算与不中断运行的逐位对比：先跑 N 步存检查点，新建求解器载入后再跑 M 步，
+与一次跑 N+M 步的结果（场、速度、能量历史、RNG 状态）比较。
+另用 gauge_field_simulation_2d_up.py --headless 同时写快照与检查点、中途 SIGKILL 再 --resume：
+续算后的快照目录应包含每一帧（检查点之前仍在写入缓冲里的帧不能丢），且与不中断运行逐位一致。
+"""
+import os, sys, signal, subprocess, tempfile, time
+import numpy as np
+
+from gauge_solver import LeapfrogGaugeSolver, AbsorbingGaugeSolver
+from checkpoint import save_checkpoint, load_checkpoint
+from snapshots import SnapshotReader
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gauge_field_simulation_2d_up.py")
+
+
+def init_packet(solver):
+    X, Y = solver.X, solver.Y
+    r2 = X**2 + Y**2
+    noise = solver.rng.standard_normal
+    return solver.set_initial(np.exp(-r2/0.72) * np.cos(3*X) + 0.02*noise(solver.shape),
+                              np.exp(-r2/0.72) * np.sin(3*Y) + 0.02*noise(solver.shape))
+
+
+def verify(make, N=300, M=200):
+    ref = init_packet(make())
+    ref.step(N + M)
+
+    first = init_packet(make())
+    first.step(N)
+    path = os.path.join(tempfile.mkdtemp(), "run.ckpt.npz")
+    save_checkpoint(path, first)
+
+    resumed = load_checkpoint(path, make())
+    resumed.step(M)
+
+    a, b = ref.state_dict(), resumed.state_dict()
+    ok = all(np.array_equal(a[k], b[k]) for k in a if k not in ("kind", "rng_state"))
+    ok &= a["rng_state"] == b["rng_state"]
+    print(f"{type(ref).__name__:22s} {N}+{M} 步续算 vs {N+M} 步直跑："
+          f"{'✅ 逐位一致' if ok else '❌ 不一致'}")
+    return ok
+
+
+def headless(*argv, wait=True):
+    cmd = [sys.executable, SCRIPT, "--headless", "--seed", "1", *argv]
+    env = {**os.environ, "MPLBACKEND": "Agg"}
+    if not wait:
+        return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def verify_kill_resume(stride=10, every=100, extra=100):
+    """快照步长 10、检查点每 100 步（写入缓冲 16 帧，检查点时缓冲里总有未落盘的帧）"""
+    d = tempfile.mkdtemp()
+    ckpt, snaps = os.path.join(d, "run.ckpt.npz"), os.path.join(d, "snaps")
+    opts = ["--snapshot-every", str(stride), "--checkpoint-every", str(every)]
+    proc = headless("--frames", "1000000", "--snapshots", snaps, "--checkpoint", ckpt, *opts,
+                    wait=False)
+    while not os.path.exists(ckpt) and proc.poll() is None:
+        time.sleep(0.005)
+    proc.send_signal(signal.SIGKILL)
+    proc.wait()
+    with np.load(ckpt) as data:
+        n_ckpt = int(data["n"])
+    total = n_ckpt + extra
+    headless("--frames", str(total), "--snapshots", snaps, "--resume", ckpt, *opts)
+
+    ref_dir = os.path.join(d, "ref")
+    headless("--frames", str(total), "--snapshots", ref_dir, *opts)
+    got, ref = SnapshotReader(snaps), SnapshotReader(ref_dir)
+    want = np.arange(stride, total + 1, stride)
+    ok = np.array_equal(got.steps, want)
+    ok &= ok and all(np.array_equal(got[f], ref[f]) for f in got.fields)
+    print(f"快照 + 检查点：第 {n_ckpt} 步后被杀、续算到 {total} 步，快照 {len(got)} / {len(want)} 帧，"
+          f"与直跑{'逐位一致' if ok else '不一致'}  {'✅' if ok else '❌'}")
+    return ok
+
+
+if __name__ == "__main__":
+    verify(lambda: LeapfrogGaugeSolver(64, 64, 0.1, 0.1, seed=1, diag_every=7))
+    verify(lambda: AbsorbingGaugeSolver(seed=1, diag_every=7))
+    verify(lambda: AbsorbingGaugeSolver(seed=1, diag_every=7, boundary="pml"))
+    verify_kill_resume()
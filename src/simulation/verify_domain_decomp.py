@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+verify_domain_decomp.py
+多进程区域分解与串行求解器的逐位对比（周期边界 + 海绵层边界），并给出耗时；
+另检查 diag_every 的能量历史与串行一致，以及 worker 抛异常 / 被杀时父进程报错而不是挂起。
+用法：python verify_domain_decomp.py [workers] [N] [steps]
+"""
+import sys, time
+import numpy as np
+
+from gauge_solver import LeapfrogGaugeSolver, AbsorbingGaugeSolver
+from domain_decomp import DecomposedGaugeSolver
+from sources import Source, Waveform, point
+
+
+def init_packet(solver):
+    X, Y = solver.X, solver.Y
+    r2 = X**2 + Y**2
+    sigma2 = (0.06 * solver.Nx * solver.dx)**2
+    return solver.set_initial(np.exp(-r2/(2*sigma2)) * np.cos(3*X),
+                              np.exp(-r2/(2*sigma2)) * np.sin(3*Y))
+
+
+def verify(make, workers, steps):
+    serial = init_packet(make())
+    t0 = time.perf_counter()
+    serial.step(steps)
+    t_serial = time.perf_counter() - t0
+
+    par = init_packet(make())
+    with DecomposedGaugeSolver(par, workers=workers) as dd:
+        t0 = time.perf_counter()
+        dd.step(steps // 2).step(steps - steps // 2)   # 分两段调用，检查步数与缓冲奇偶衔接
+        t_par = time.perf_counter() - t0
+
+    diff = max(np.max(np.abs(serial.Ax - par.Ax)), np.max(np.abs(serial.Ay - par.Ay)))
+    ok = np.array_equal(serial.Ax, par.Ax) and np.array_equal(serial.Ay, par.Ay) and serial.n == par.n
+    name = type(serial).__name__
+    print(f"{name:22s} 串行 {t_serial:.3f} s | {workers} 进程 {t_par:.3f} s | "
+          f"max|Δ| = {diff:.3e}  {'✅' if ok else '❌'}")
+    return ok
+
+
+def verify_diag(workers, N=96, steps=50, every=7):
+    make = lambda: AbsorbingGaugeSolver(N, N, 0.1*N, 0.1*N, sponge_width=N//8, diag_every=every)
+    serial = init_packet(make()).step(steps)
+    par = init_packet(make())
+    with DecomposedGaugeSolver(par, workers=workers) as dd:
+        dd.step(steps)
+    ok = (serial.energy_steps == par.energy_steps
+          and np.array_equal(serial.energy_all_hist, par.energy_all_hist)
+          and np.array_equal(serial.energy_inner_hist, par.energy_inner_hist))
+    print(f"diag_every={every}：{len(par.energy_steps)} 次诊断，能量历史与串行逐位一致 {ok}"
+          f"  {'✅' if ok else '❌'}")
+    return ok
+
+
+class Broken(Waveform):
+    """t ≥ t_fail 时抛出异常的波形，用来让某个 worker 出错"""
+    params = ("t_fail",)
+
+    def __init__(self, t_fail):
+        self.t_fail = t_fail
+
+    def __call__(self, t):
+        if np.any(t >= self.t_fail):
+            raise ValueError("故意的失败")
+        return 0.0
+
+
+def verify_failure(workers, N=96):
+    ok = True
+    cases = (
+        ("worker 抛出异常", lambda dd: None,
+         dict(sources=[Source(point(N//2 + 5, N//2), Broken(0.3))])),
+        ("worker 被杀",     lambda dd: dd._procs[-1].kill(), {}),
+    )
+    for name, sabotage, kw in cases:
+        par = init_packet(AbsorbingGaugeSolver(N, N, 0.1*N, 0.1*N, sponge_width=N//8, **kw))
+        t0 = time.perf_counter()
+        try:
+            with DecomposedGaugeSolver(par, workers=workers) as dd:
+                sabotage(dd)
+                dd.step(20)
+            raised = False
+        except RuntimeError:
+            raised = True
+        elapsed = time.perf_counter() - t0
+        good = raised and elapsed < 10
+        ok &= good
+        print(f"{name}：父进程 {'抛出 RuntimeError' if raised else '未报错'}（{elapsed:.2f} s）"
+              f"  {'✅' if good else '❌'}")
+    return ok
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    N = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    steps = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    verify(lambda: LeapfrogGaugeSolver(N, N, 0.1, 0.1), workers, steps)
+    verify(lambda: AbsorbingGaugeSolver(N, N, 0.1*N, 0.1*N, sponge_width=N//8), workers, steps)
+    verify_diag(workers)
+    verify_failure(workers)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+verify_encoder.py
+frame_encoder.LUTFrameEncoder 的检查：
+  1. 颜色：LUT 结果与 matplotlib 颜色映射 cmap(Normalize(vmin, vmax)(x), bytes=True) 逐像素相差不超过 1；
+  2. 方向：数组 [0, 0] 落在面板左下角（与 imshow(origin="lower") 一致）；
+  3. 编码耗时：同一组预先算好的场（不含模拟），分别用 matplotlib（imshow + canvas.draw，PillowWriter）
+     和 LUT 编码器写 GIF，比较每帧耗时。
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation, PillowWriter
+from matplotlib.colors import Normalize
+
+from frame_encoder import LUTFrameEncoder, open_recorder
+
+N, FRAMES = 96, 120
+PANELS = (("RdBu", -1.0, 1.0), ("magma", 0.0, 2.0))
+
+
+def make_fields(rng):
+    x = np.linspace(-3, 3, N)
+    X, Y = np.meshgrid(x, x, indexing="ij")
+    out = []
+    for k in range(FRAMES):
+        ph = 0.1 * k
+        Bz = np.sin(2*X + ph) * np.cos(1.5*Y - ph) * np.exp(-(X**2 + Y**2) / 8)
+        out.append((Bz, 2*Bz**2 + 0.05*rng.random((N, N))))
+    return out
+
+
+def check_colors(fields):
+    enc = LUTFrameEncoder((N, N), PANELS, scale=1, gap=0, text_height=0)
+    frame = enc.rgb(fields[0])
+    worst = 0
+    for i, (cmap, lo, hi) in enumerate(PANELS):
+        ref = matplotlib.colormaps[cmap](Normalize(lo, hi)(fields[0][i]), bytes=True)[..., :3]
+        got = frame[:, i*N:(i + 1)*N][::-1]              # 翻回数组方向
+        worst = max(worst, int(np.abs(got.astype(int) - ref.astype(int)).max()))
+    probe = np.full((N, N), -1.0); probe[0, 0] = 1.0      # 只有 [0, 0] 为最大值
+    img = LUTFrameEncoder((N, N), PANELS[:1], scale=2, text_height=0).rgb([probe])
+    corner = tuple(img[-1, 0]) == tuple(matplotlib.colormaps["RdBu"](1.0, bytes=True)[:3])
+    print(f"颜色：与 matplotlib 最大相差 {worst}（0–255）；[0, 0] 在左下角 {corner}")
+    return worst <= 1 and corner
+
+
+def bench_matplotlib(fields, path):
+    fig, axes = plt.subplots(1, 2, figsize=(8, 4))
+    ims = [ax.imshow(f, origin="lower", cmap=c, vmin=lo, vmax=hi, interpolation="nearest")
+           for ax, f, (c, lo, hi) in zip(axes, fields[0], PANELS)]
+
+    def update(k):
+        for im, f in zip(ims, fields[k]):
+            im.set_data(f)
+        return ims
+
+    ani = FuncAnimation(fig, update, frames=len(fields), blit=False)
+    t0 = time.perf_counter()
+    ani.save(path, writer=PillowWriter(fps=15), dpi=96)
+    plt.close(fig)
+    return time.perf_counter() - t0
+
+
+def bench_lut(fields, path):
+    enc = LUTFrameEncoder((N, N), PANELS, scale=4)
+    t0 = time.perf_counter()
+    with open_recorder(path, enc, fps=15) as rec:
+        for k, f in enumerate(fields):
+            rec.write(f, text=f"frame {k}")
+    return time.perf_counter() - t0
+
+
+def bench_rgb(fields):
+    """只算成帧（不写文件）：LUT 与 matplotlib canvas.draw + 取像素"""
+    enc = LUTFrameEncoder((N, N), PANELS, scale=4)
+    t0 = time.perf_counter()
+    for k, f in enumerate(fields):
+        enc.rgb(f, text=f"frame {k}")
+    t_lut = time.perf_counter() - t0
+    fig, axes = plt.subplots(1, 2, figsize=(8, 4), dpi=96)
+    ims = [ax.imshow(f, origin="lower", cmap=c, vmin=lo, vmax=hi, interpolation="nearest")
+           for ax, f, (c, lo, hi) in zip(axes, fields[0], PANELS)]
+    t0 = time.perf_counter()
+    for f in fields:
+        for im, x in zip(ims, f):
+            im.set_data(x)
+        fig.canvas.draw()
+        np.asarray(fig.canvas.buffer_rgba())
+    t_mpl = time.perf_counter() - t0
+    plt.close(fig)
+    return t_mpl, t_lut
+
+
+if __name__ == "__main__":
+    fields = make_fields(np.random.default_rng(0))
+    ok = check_colors(fields)
+    with tempfile.TemporaryDirectory() as d:
+        t_mpl = bench_matplotlib(fields, os.path.join(d, "mpl.gif"))
+        t_lut = bench_lut(fields, os.path.join(d, "lut.gif"))
+    f_mpl, f_lut = bench_rgb(fields)
+    print(f"{FRAMES} 帧 GIF：matplotlib {t_mpl:.2f}s（{1e3*t_mpl/FRAMES:.1f} ms/帧），"
+          f"LUT {t_lut:.2f}s（{1e3*t_lut/FRAMES:.1f} ms/帧），{t_mpl/t_lut:.0f}×")
+    print(f"仅成帧：matplotlib {1e3*f_mpl/FRAMES:.2f} ms/帧，LUT {1e3*f_lut/FRAMES:.2f} ms/帧，"
+          f"{f_mpl/f_lut:.0f}×")
+    print("✅ LUT 颜色与 matplotlib 一致，编码显著加速" if ok and t_mpl > 10*t_lut else "❌")
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+verify_events.py
+宇称角分布蒙特卡罗事件源（parity_events.py）的检查：
+  1. 分布：a ∈ {0, 0.6, 1}、两种测度各抽 10⁷ 个事件，512 箱的 χ²/自由度 ≈ 1（与解析 CDF 比较）；
+  2. 不对称参数：由前后向计数估计的 a 与真值相差在 4σ 以内；
+  3. 流式：同一种子下结果与块大小无关（逐位一致）；tracemalloc 峰值只取决于块大小，与总事件数无关；
+  4. 吞吐量：生成 + 直方图累加的事件数 / 秒，对比逐块向量化的拒绝抽样；逆 CDF 表首次构建与缓存命中的耗时。
+用法：python verify_events.py [事件数]
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from parity_events import (generate_events, AngleHistogram, inverse_cdf_table, angle_pdf,
+                           _CACHE)
+
+
+def check_distribution(n=10_000_000, bins=512):
+    ok = True
+    for plane in (True, False):
+        for a in (0.0, 0.6, 1.0):
+            h = AngleHistogram(bins, plane=plane)
+            for theta in generate_events(n, a=a, seed=7, plane=plane):
+                h.add(theta)
+            e = h.expected(a)
+            chi2 = float(np.sum((h.counts - e)**2 / e)) / (bins - 1)
+            a_hat, sigma = h.estimate_a()
+            good = chi2 < 1.3 and abs(a_hat - a) < 4*sigma
+            ok &= good
+            print(f"  {'平面角' if plane else '立体角'} a={a:.1f}：χ²/自由度 = {chi2:.3f}，"
+                  f"估计 a = {a_hat:.4f} ± {sigma:.4f}  {'✅' if good else '❌'}")
+    return ok
+
+
+def check_streaming():
+    ref = np.concatenate([t.copy() for t in generate_events(3_000_001, a=0.6, seed=3, chunk=1 << 20)])
+    other = np.concatenate([t.copy() for t in generate_events(3_000_001, a=0.6, seed=3, chunk=77_777)])
+    same = np.array_equal(ref, other)
+    print(f"  块大小 2²⁰ 与 77777：结果逐位一致 {same}  {'✅' if same else '❌'}")
+
+    inverse_cdf_table(0.6)                              # 表不计入峰值
+    peaks = []
+    for n in (2_000_000, 20_000_000):
+        h = AngleHistogram(360)
+        tracemalloc.start()
+        for theta in generate_events(n, a=0.6, seed=1, chunk=1 << 18):
+            h.add(theta)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    flat = peaks[1] < 1.1 * peaks[0] and peaks[1] < 16 * (1 << 18) * 8
+    print(f"  块 2¹⁸：2·10⁶ / 2·10⁷ 个事件的内存峰值 {peaks[0]/2**20:.1f} / {peaks[1]/2**20:.1f} MiB"
+          f"  {'✅' if flat else '❌'}")
+    return same and flat
+
+
+def rejection(n, a, seed, chunk=1 << 20):
+    """对照：逐块向量化的拒绝抽样（平面角），按块产出接受的事件"""
+    rng = np.random.default_rng(seed)
+    bound = angle_pdf(0.0, a) * 1.0001 if a >= 0 else angle_pdf(np.pi, a) * 1.0001
+    done = 0
+    while done < n:
+        theta = rng.random(chunk) * (2*np.pi)
+        keep = theta[rng.random(chunk) * bound < angle_pdf(theta, a)][:n - done]
+        done += len(keep)
+        yield keep
+
+
+def bench(n):
+    rows = {}
+    for name, gen in (("逆 CDF 表", lambda: generate_events(n, a=0.6, seed=1)),
+                      ("拒绝抽样", lambda: rejection(n, 0.6, seed=1))):
+        h = AngleHistogram(360)
+        t0 = time.perf_counter()
+        for theta in gen():
+            h.add(theta)
+        rows[name] = n / (time.perf_counter() - t0)
+        print(f"  {name:8s} 生成 + 直方图 {rows[name]/1e6:6.1f} M 事件/秒")
+
+    _CACHE.clear()
+    t0 = time.perf_counter(); inverse_cdf_table(0.37); t_build = time.perf_counter() - t0
+    t0 = time.perf_counter(); inverse_cdf_table(0.37); t_hit = time.perf_counter() - t0
+    print(f"  逆 CDF 表：首次构建 {1e3*t_build:.2f} ms，缓存命中 {1e6*t_hit:.1f} µs")
+    return rows
+
+
+if __name__ == "__main__":
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 20_000_000
+    print("分布与不对称参数：")
+    results = [check_distribution()]
+    print("流式：")
+    results.append(check_streaming())
+    print("吞吐量：")
+    rows = bench(n)
+    fast = rows["逆 CDF 表"] > 1e7 and rows["逆 CDF 表"] > rows["拒绝抽样"]
+    print(f"  逆 CDF 表快 {rows['逆 CDF 表']/rows['拒绝抽样']:.1f}×  {'✅' if fast else '❌'}")
+    results.append(fast)
+    print("✅ 事件分布正确、流式内存固定、每秒千万级事件" if all(results) else "❌")
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+verify_history.py
+能量曲线显示（history.py）的检查：
+  1. 抽样正确：带尖峰的随机游走逐点追加 10⁵ 个样本，显示点数有上界，全程极值与每个桶的最小 / 最大值
+     与暴力计算一致，显示点按横坐标单调；
+  2. blit：FuncAnimation(blit=True) 推进 2·10⁴ 帧，整幅重画只发生在坐标轴范围变化时（O(log n) 次），
+     最后一帧的画面与整幅重画的结果一致；
+  3. 每帧耗时：历史长度 10³ / 10⁴ / 10⁵ 时，原做法（整段 set_data + relim + autoscale_view）
+     随长度线性增长，抽样后基本不变。
+用法：python verify_history.py [最长历史]
+"""
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.animation import FuncAnimation
+
+from history import MinMaxDecimator, LiveCurves
+
+
+def signal(n, seed=0):
+    rng = np.random.default_rng(seed)
+    a = np.cumsum(rng.standard_normal(n))
+    a[rng.integers(0, n, 20)] += 50.0 * rng.standard_normal(20)       # 孤立尖峰
+    b = np.sin(np.arange(n) * 0.37) * np.exp(-np.arange(n) / n)        # 快速振荡（包络）
+    return np.stack([a, b], axis=1)
+
+
+def check_decimator(n=100_000, bins=256):
+    Y = signal(n)
+    x = np.arange(n) * 3.0 + 7.0
+    d = MinMaxDecimator(2, bins)
+    for i in range(n):
+        d.append(x[i], Y[i])
+    ok = True
+    full, w = d.count, d.width
+    for s, (xs, ys) in enumerate(d.series()):
+        # 每个完整桶覆盖 w 个连续样本，剩余样本在正在填充的桶里
+        blocks = [Y[k*w:(k+1)*w, s] for k in range(full)] + ([Y[full*w:, s]] if full*w < n else [])
+        ref_lo = np.array([b.min() for b in blocks]); ref_hi = np.array([b.max() for b in blocks])
+        pairs = ys.reshape(-1, 2)
+        good = (np.array_equal(pairs.min(axis=1), ref_lo) and np.array_equal(pairs.max(axis=1), ref_hi)
+                and np.all(np.diff(xs) >= 0) and ys.min() == Y[:, s].min() and ys.max() == Y[:, s].max()
+                and len(xs) <= 4*bins + 2 and np.all(np.isin(xs, x)))
+        print(f"  曲线 {s}：{n} 个样本 → {len(xs)} 个显示点（桶宽 {w}），逐桶极值与暴力计算"
+              f"{'一致 ✅' if good else '不一致 ❌'}")
+        ok &= good
+    ext = np.array_equal(d.y_min, Y.min(axis=0)) and np.array_equal(d.y_max, Y.max(axis=0))
+    print(f"  全程极值 {'✅' if ext else '❌'}")
+    return ok and ext
+
+
+def figure():
+    fig, (ax_im, ax) = plt.subplots(1, 2, figsize=(8, 3), dpi=60)
+    im = ax_im.imshow(np.zeros((32, 32)), vmin=-1, vmax=1, cmap="RdBu")
+    l1, = ax.plot([], [], label="全域")
+    l2, = ax.plot([], [], label="内部")
+    ax.grid(True)
+    return fig, ax, im, (l1, l2)
+
+
+def check_blit(frames=20_000):
+    fig, ax, im, lines = figure()
+    curves = LiveCurves(ax, lines)
+    Y = signal(frames, seed=1) * 1e-3 + np.linspace(1.0, 3.0, frames)[:, None]
+    rng = np.random.default_rng(2)
+    artists = [im, *lines]
+
+    def update(i):
+        im.set_data(rng.standard_normal((32, 32)))
+        curves.update(i, *Y[i])
+        return artists
+
+    ani = FuncAnimation(fig, update, frames=frames, init_func=lambda: artists, blit=True,
+                        cache_frame_data=False)
+    fig.canvas.draw()
+    ani._init_draw()
+    t0 = time.perf_counter()
+    for i in range(frames):
+        ani._draw_next_frame(i, blit=True)
+    elapsed = time.perf_counter() - t0
+    blitted = np.asarray(fig.canvas.buffer_rgba()).copy()
+    for a in artists:
+        a.set_animated(False)
+    fig.canvas.draw()
+    full = np.asarray(fig.canvas.buffer_rgba())
+    # blit 时动画元素画在坐标轴边框之上（整幅重画时边框在上），比较时去掉边框附近 2 个像素
+    frame = np.zeros(full.shape[:2], dtype=bool)
+    H = full.shape[0]
+    for a in fig.axes:
+        x0, y0, x1, y1 = np.round(a.bbox.extents).astype(int)
+        frame[H - y1 - 2:H - y0 + 2, x0 - 2:x1 + 2] = True
+        frame[H - y1 + 2:H - y0 - 2, x0 + 2:x1 - 2] = False
+    diff = np.count_nonzero(np.any(blitted != full, axis=-1) & ~frame)
+    ok = curves.redraws <= 60 and diff == 0
+    print(f"  {frames} 帧 blit：整幅重画 {curves.redraws} 次，{1e3*elapsed/frames:.2f} ms/帧；"
+          f"末帧与整幅重画不同的像素 {diff} 个  {'✅' if ok else '❌'}")
+    plt.close(fig)
+    ani.event_source = None
+    return ok
+
+
+def per_frame(n_hist, decimated, reps=50):
+    """历史已有 n_hist 个点时，曲线面板每帧的更新 + 绘制耗时"""
+    fig, ax, _, lines = figure()
+    fig.canvas.draw()
+    renderer = fig.canvas.get_renderer()
+    Y = signal(n_hist + reps, seed=3)
+    if decimated:
+        curves = LiveCurves(ax, lines, redraw=False)
+        for i in range(n_hist):
+            curves.data.append(i, Y[i])
+
+        def frame(i):
+            curves.update(i, *Y[i])
+    else:
+        hist = [list(Y[:n_hist, 0]), list(Y[:n_hist, 1])]
+
+        def frame(i):
+            hist[0].append(Y[i, 0]); hist[1].append(Y[i, 1])
+            for line, h in zip(lines, hist):
+                line.set_data(np.arange(len(h)), h)
+            ax.relim(); ax.autoscale_view()
+    t0 = time.perf_counter()
+    for i in range(n_hist, n_hist + reps):
+        frame(i)
+        for line in lines:
+            line.draw(renderer)
+    dt = (time.perf_counter() - t0) / reps
+    plt.close(fig)
+    return dt
+
+
+if __name__ == "__main__":
+    n_max = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print("抽样：")
+    results = [check_decimator()]
+    print("blit：")
+    results.append(check_blit())
+    print("每帧耗时（更新 + 绘制两条曲线）：")
+    rows = []
+    for n in (n for n in (1_000, 10_000, 100_000, 1_000_000) if n <= n_max):
+        old, new = per_frame(n, False), per_frame(n, True)
+        rows.append((n, old, new))
+        print(f"  历史 {n:>8d} 点  原做法 {1e3*old:8.2f} ms  抽样 {1e3*new:6.2f} ms  {old/new:6.1f}×")
+    flat = rows[-1][2] < 3 * rows[0][2]
+    print(f"  抽样后每帧耗时从 {rows[0][0]} 到 {rows[-1][0]} 点变化 {rows[-1][2]/rows[0][2]:.2f}×"
+          f"  {'✅' if flat else '❌'}")
+    results.append(flat)
+    print("✅ 能量曲线每帧开销与运行长度无关，可用 blit" if all(results) else "❌")
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+verify_precision.py
+混合精度校验：各规范场求解器分别以
+  float64（参照）、float32 存储 + float64 能量累加、float32 存储 + float32 累加
+运行同一初值，比较能量漂移、能量曲线与参照的偏差、末态 Bz 的相对误差，
+并在大网格上测量 float32 相对 float64 的步进吞吐量。
+"""
+import time
+import numpy as np
+
+from gauge_solver import LeapfrogGaugeSolver, AbsorbingGaugeSolver
+from highorder_solver import HighOrderGaugeSolver
+from spectral_solver import SpectralGaugeSolver
+
+SOLVERS = {
+    "Leapfrog（周期）": lambda N, **kw: LeapfrogGaugeSolver(N, N, 0.1, 0.1, **kw),
+    "Absorbing 海绵层": lambda N, **kw: AbsorbingGaugeSolver(N, N, 0.1*N, 0.1*N, **kw),
+    "Absorbing PML": lambda N, **kw: AbsorbingGaugeSolver(N, N, 0.1*N, 0.1*N, boundary="pml", **kw),
+    "高阶 4 阶 + fr4": lambda N, **kw: HighOrderGaugeSolver(N, N, 0.1, 0.1, **kw),
+    "伪谱": lambda N, **kw: SpectralGaugeSolver(N, N, 0.1, 0.1, **kw),
+}
+MODES = {
+    "f64": dict(dtype=np.float64, accum_dtype=np.float64),
+    "f32+累加f64": dict(dtype=np.float32, accum_dtype=np.float64),
+    "f32+累加f32": dict(dtype=np.float32, accum_dtype=np.float32),
+}
+
+
+def run(make, N, steps, diag_every, **kw):
+    s = make(N, diag_every=diag_every, **kw)
+    env = np.exp(-(s.X**2 + s.Y**2) / (2*0.6**2))
+    s.set_initial(env*np.cos(2.5*s.X), env*np.sin(2.0*s.Y))
+    s.diagnose()
+    s.step(steps)
+    E = np.asarray(s.energy_all_hist, dtype=np.float64)
+    return E, s.Bz().astype(np.float64)
+
+
+def throughput(make, N, steps, **kw):
+    s = make(N, **kw)
+    s.set_initial(s.rng.standard_normal((N, N)), 0.0)
+    s.step(2)                                          # 预热
+    t0 = time.perf_counter()
+    s.step(steps)
+    return steps / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    N, steps, every = 128, 4000, 20
+    ok = True
+    print(f"{N}² 网格，{steps} 步，每 {every} 步记录能量")
+    print(f"{'求解器':<16s} {'模式':<10s} {'能量漂移':>10s} {'|E−E64|/E0':>11s} {'Bz 相对误差':>11s}")
+    for name, make in SOLVERS.items():
+        ref_E, ref_Bz = run(make, N, steps, every, **MODES["f64"])
+        conservative = "Absorbing" not in name            # 吸收边界的能量本身就在衰减，只比对曲线
+        for mode, kw in MODES.items():
+            E, Bz = run(make, N, steps, every, **kw)
+            # 不守恒能量的求解器没有“漂移”可言，该列记 —，偏差见 |E−E64|/E0
+            drift = f"{np.max(np.abs(E/E[0] - 1)):10.2e}" if conservative else f"{'—':>10s}"
+            dev = np.max(np.abs(E - ref_E)) / ref_E[0]
+            bz_err = np.max(np.abs(Bz - ref_Bz)) / np.max(np.abs(ref_Bz))
+            print(f"{name:<16s} {mode:<10s} {drift} {dev:11.2e} {bz_err:11.2e}")
+            if mode == "f32+累加f64":
+                ok &= dev < 1e-4 and bz_err < 1e-3
+
+    N_big, steps_big = 1024, 40
+    print(f"\n吞吐量（{N_big}² 网格，{steps_big} 步）：")
+    for name, make in SOLVERS.items():
+        r64 = throughput(make, N_big, steps_big, dtype=np.float64)
+        r32 = throughput(make, N_big, steps_big, dtype=np.float32)
+        print(f"  {name:<16s} f64 {r64:7.1f} 步/秒   f32 {r32:7.1f} 步/秒   加速 {r32/r64:.2f}×")
+    print("✅ float32 存储 + float64 累加的能量曲线与 float64 一致（相对偏差 < 1e-4）" if ok else "❌")
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+verify_sources.py
+sources.SourceSet 的检查：
+  1. 兼容：不给 sources 时，求解器与原来的“中心点源 lap[cx, cy] += drive_amp·sin(drive_omega·n·dt)”一致
+     （单个 / 批量 / float32 / PML；相位按 ω·(n·dt) 而非 (ω·n)·dt 求值，只允许舍入级差异）；
+  2. 正确性：几十个混合源（点、线、高斯斑；Sine / Chirp / Pulse / Tabulated；x、y 分量，含相互重叠）一次注入，
+     与逐源、逐条目的朴素累加一致；区域分解（每个条带只保留本条带的条目）与串行逐位一致；
+     AMR 下含源的块全部被加密；
+  3. 开销：注入期间不分配整网格数组（tracemalloc 峰值远小于一个场），
+     48 个源的注入耗时与“每个源各建一张整网格源项再相加”对比。
+用法：python verify_sources.py [N]
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from gauge_solver import AbsorbingGaugeSolver
+from domain_decomp import DecomposedGaugeSolver
+from amr import AMRGaugeSolver
+from sources import Source, SourceSet, Sine, Chirp, Pulse, Tabulated, point, line, gaussian_patch
+
+
+class LegacySolver(AbsorbingGaugeSolver):
+    """原实现：拉普拉斯之后只在 (cx, cy) 一个格点加正弦外源"""
+
+    def _advance(self):
+        self._fill_ghosts()
+        self._parallel(self._laplacian_rows)
+        self._lap[..., self.cx, self.cy] += self.drive_amp * np.sin(self.drive_omega * self.n * self.dt)
+        self._parallel(self._update_rows)
+        if self.boundary == "pml":
+            self._parallel(self._psi_rows)
+
+
+def make_sources(N, count=48, seed=0):
+    rng = np.random.default_rng(seed)
+    t_tab = np.linspace(0.0, 4.0, 17)
+    out = []
+    for k in range(count):
+        c = rng.uniform(0.2*N, 0.8*N, size=2)
+        shape = (point(int(c[0]), int(c[1])) if k % 3 == 0 else
+                 line(c.astype(int), (c + rng.uniform(-8, 8, size=2)).astype(int)) if k % 3 == 1 else
+                 gaussian_patch(c, sigma=rng.uniform(0.8, 2.5)))
+        wf = (Sine(rng.uniform(0.5, 2), rng.uniform(0.5, 3), rng.uniform(0, np.pi)) if k % 4 == 0 else
+              Chirp(rng.uniform(0.5, 2), 0.5, 3.0, duration=5.0) if k % 4 == 1 else
+              Pulse(rng.uniform(0.5, 2), t0=rng.uniform(0, 3), width=0.5, omega=rng.uniform(0, 4))
+              if k % 4 == 2 else
+              Tabulated(t_tab, rng.normal(size=t_tab.size), period=4.0))
+        out.append(Source(shape, wf, component="xy"[k % 2]))
+    return out
+
+
+def naive_inject(sources, shape, t):
+    """逐源、逐条目的参考实现：每个源一张整网格源项"""
+    lap = [np.zeros(shape), np.zeros(shape)]
+    for s in sources:
+        S = np.zeros(shape)
+        amp = s.waveform(t)
+        for i, j, w in zip(s.i, s.j, s.w):
+            if 0 <= i < shape[0] and 0 <= j < shape[1]:
+                S[i, j] += w * amp
+        lap["xy".index(s.component)] += S
+    return lap
+
+
+def check_legacy(N):
+    ok = True
+    for kw, label in ((dict(), "单个"),
+                      (dict(batch=3, drive_amp=[0.5, 1.0, 1.5], drive_omega=[0.8, 1.0, 1.2]), "批量"),
+                      (dict(dtype=np.float32), "float32"),
+                      (dict(boundary="pml"), "PML")):
+        a = AbsorbingGaugeSolver(N, N, seed=1, **kw).step(300)
+        b = LegacySolver(N, N, seed=1, **kw).step(300)
+        diff = max(np.max(np.abs(a.Ax - b.Ax)), np.max(np.abs(a.Ay - b.Ay)))
+        scale = np.max(np.abs(b.Ax))
+        tol = 1e-5 if a.dtype == np.float32 else 1e-12
+        print(f"兼容（{label}）：与原点源 max|Δ| = {diff:.2e}（场幅 {scale:.2f}）")
+        ok &= diff <= tol * scale
+    return ok
+
+
+def check_multi(N):
+    srcs = make_sources(N)
+    ss = SourceSet(srcs).bind((N, N))
+    worst = 0.0
+    for t in np.linspace(0.0, 9.0, 7):
+        lap = [np.zeros((N, N)), np.zeros((N, N))]
+        ss.inject(lap[0], lap[1], t)
+        ref = naive_inject(srcs, (N, N), t)
+        worst = max(worst, max(np.max(np.abs(a - b)) for a, b in zip(lap, ref)))
+    n_entries = sum(len(ss.entries(c)[0]) for c in range(2))
+    print(f"{len(srcs)} 个源（{n_entries} 个条目）：与朴素累加最大相差 {worst:.2e}")
+    ok = worst < 1e-12
+
+    serial = AbsorbingGaugeSolver(N, N, sources=srcs).step(120)
+    par = AbsorbingGaugeSolver(N, N, sources=srcs)
+    with DecomposedGaugeSolver(par, workers=3) as dd:
+        dd.step(120)
+    same = np.array_equal(serial.Ax, par.Ax) and np.array_equal(serial.Ay, par.Ay)
+    print(f"区域分解（3 条带）：与串行逐位一致 {same}")
+
+    amr = AMRGaugeSolver(AbsorbingGaugeSolver(N, N, sources=srcs[:6]), threshold=2.0)
+    want = amr.source_tiles & amr.eligible
+    got = np.zeros_like(want)
+    got[tuple(amr.tiles.T)] = True
+    amr.step(8)
+    covered = bool(want.any()) and np.array_equal(got, want) and np.isfinite(amr.composite("Ax")).all()
+    print(f"AMR：含源的可加密块 {int(want.sum())} 个，全部加密 {covered}")
+    return ok and same and covered
+
+
+def check_cost(N):
+    srcs = make_sources(N)
+    ss = SourceSet(srcs).bind((N, N))
+    lap_x, lap_y = np.zeros((N, N)), np.zeros((N, N))
+    ss.inject(lap_x, lap_y, 0.0)                       # 预热
+    tracemalloc.start()
+    ss.inject(lap_x, lap_y, 1.0)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"注入期间内存峰值 {peak/1024:.1f} KiB（一个 {N}×{N} 场 {lap_x.nbytes/1024:.0f} KiB）")
+
+    reps = 200
+    t0 = time.perf_counter()
+    for k in range(reps):
+        ss.inject(lap_x, lap_y, 0.01*k)
+    t_set = (time.perf_counter() - t0) / reps
+    dense = [(np.zeros((N, N)), s) for s in srcs]     # 对照：每个源一张整网格空间剖面
+    for S, s in dense:
+        np.add.at(S, (np.clip(s.i, 0, N - 1), np.clip(s.j, 0, N - 1)), s.w)
+    t0 = time.perf_counter()
+    for k in range(reps):
+        for S, s in dense:
+            lap = lap_x if s.component == "x" else lap_y
+            lap += S * s.waveform(0.01*k)
+    t_dense = (time.perf_counter() - t0) / reps
+
+    one = AbsorbingGaugeSolver(N, N)
+    many = AbsorbingGaugeSolver(N, N, sources=srcs)
+    t0 = time.perf_counter(); one.step(100); t_one = time.perf_counter() - t0
+    t0 = time.perf_counter(); many.step(100); t_many = time.perf_counter() - t0
+    print(f"{len(srcs)} 个源一次注入 {1e6*t_set:.0f} µs，逐源整网格叠加 {1e6*t_dense:.0f} µs"
+          f"（{t_dense/t_set:.0f}×）；每步总耗时 1 个源 {10*t_one:.2f} ms，{len(srcs)} 个源 {10*t_many:.2f} ms")
+    return peak < lap_x.nbytes / 4 and t_set < t_dense
+
+
+if __name__ == "__main__":
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 128
+    results = [check_legacy(96), check_multi(96), check_cost(N)]
+    print("✅ 外源注入兼容原点源，多源稀疏注入正确且无整网格开销" if all(results) else "❌")
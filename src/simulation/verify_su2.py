@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+verify_su2.py
+SU(2) 四元数格点引擎的校验：
+  1) qmul 与 2×2 复矩阵乘法一致；
+  2) 小方格迹与 Wilson 作用量在随机规范变换下不变；staple 给出的局域作用量与整体差分一致；
+  3) 二维热浴的平均小方格与无穷体积精确解 ⟨½TrU_p⟩ = I2(β)/I1(β) 一致；
+  4) 三维格点的吞吐量与内存（四元数 vs 复矩阵）。
+"""
+import time
+import numpy as np
+
+from su2_lattice import SU2Lattice, qmul, qconj, to_matrix, random_su2
+
+
+def bessel_i(n, x, m=20001):
+    """I_n(x) = (1/π)∫₀^π e^{x cosθ} cos(nθ) dθ（梯形积分，周期被积函数收敛极快）"""
+    th = np.linspace(0.0, np.pi, m)
+    f = np.exp(x*np.cos(th)) * np.cos(n*th)
+    return (np.sum(f) - 0.5*(f[0] + f[-1])) * (th[1] - th[0]) / np.pi
+
+
+def check_algebra(rng):
+    a, b = random_su2(rng, (1000,)), random_su2(rng, (1000,))
+    err = np.max(np.abs(to_matrix(qmul(a, b)) - to_matrix(a) @ to_matrix(b)))
+    err_c = np.max(np.abs(to_matrix(qconj(a)) - np.conj(np.swapaxes(to_matrix(a), -1, -2))))
+    print(f"qmul 与矩阵乘法：{err:.2e}，qconj 与共轭转置：{err_c:.2e}")
+    return err < 1e-13 and err_c < 1e-13
+
+
+def check_gauge_invariance(rng):
+    lat = SU2Lattice((8, 8, 8), beta=2.3, seed=1, start="hot")
+    S0 = lat.wilson_action()
+    # staple：只改一条链时作用量的变化 = −β·½Tr(ΔU·V)
+    mu, x = 1, (3, 4, 5)
+    V = lat.staple(mu)[x]
+    new = random_su2(rng, ())
+    dS_pred = -lat.beta * (qmul(new, V)[0] - qmul(lat.U[mu][x], V)[0])
+    lat.U[mu][x] = new
+    dS = lat.wilson_action() - S0
+    S1 = lat.wilson_action()
+    lat.gauge_transform(random_su2(rng, lat.shape))
+    S2 = lat.wilson_action()
+    print(f"staple 局域作用量：ΔS = {dS:.12f}，预测 {dS_pred:.12f}")
+    print(f"规范变换前后 S：{S1:.12f} → {S2:.12f}")
+    return abs(dS - dS_pred) < 1e-8 and abs(S1 - S2) < 1e-8
+
+
+def check_2d_exact(betas=(1.0, 2.0, 4.0), L=32, therm=100, sweeps=400):
+    ok = True
+    for beta in betas:
+        lat = SU2Lattice((L, L), beta=beta, seed=7, start="hot")
+        lat.run(therm, overrelax=1, measure=False)
+        lat.run(sweeps, overrelax=1)
+        p = np.asarray(lat.plaquette_hist)
+        # 分块估计误差（块长 20 次扫描）
+        blocks = p[: len(p)//20*20].reshape(-1, 20).mean(axis=1)
+        err = blocks.std(ddof=1) / np.sqrt(len(blocks))
+        exact = bessel_i(2, beta) / bessel_i(1, beta)
+        dev = (p.mean() - exact) / err
+        ok &= abs(dev) < 4
+        print(f"β={beta:.1f}: ⟨P⟩ = {p.mean():.5f} ± {err:.5f}，精确 {exact:.5f}（{dev:+.1f}σ）")
+    return ok
+
+
+def bench_3d(L=24, sweeps=5):
+    lat = SU2Lattice((L, L, L), beta=2.5, seed=0, start="hot")
+    t0 = time.perf_counter()
+    lat.run(sweeps, overrelax=1, measure=False)
+    wall = time.perf_counter() - t0
+    links = lat.d * L**3
+    print(f"三维 {L}³：{sweeps} 次扫描（热浴 + 过松弛）{wall:.2f} s，"
+          f"{links*sweeps/wall/1e6:.2f} M 链/秒，⟨P⟩ = {lat.mean_plaquette():.4f}")
+    print(f"链内存：四元数 {lat.U.nbytes/2**20:.1f} MiB，2×2 complex128 {links*4*16/2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    ok = check_algebra(rng)
+    ok &= check_gauge_invariance(rng)
+    ok &= check_2d_exact()
+    bench_3d()
+    print("✅" if ok else "❌")
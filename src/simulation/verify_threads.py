@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+verify_threads.py
+线程池条带后端与单线程路径的逐位对比，并给出各线程数下的步进耗时。
+用法：python verify_threads.py [N] [steps] [threads...]
+"""
+import sys, time
+import numpy as np
+
+from gauge_solver import LeapfrogGaugeSolver, AbsorbingGaugeSolver
+
+
+def init_packet(solver):
+    X, Y = solver.X, solver.Y
+    r2 = X**2 + Y**2
+    sigma2 = (0.06 * solver.Nx * solver.dx)**2
+    return solver.set_initial(np.exp(-r2/(2*sigma2)) * np.cos(3*X),
+                              np.exp(-r2/(2*sigma2)) * np.sin(3*Y))
+
+
+def verify(make, steps, thread_counts):
+    ref = init_packet(make(1))
+    t0 = time.perf_counter()
+    ref.step(steps)
+    t_ref = time.perf_counter() - t0
+    print(f"{type(ref).__name__}: 1 线程 {t_ref/steps*1e3:.2f} ms/步")
+    ok_all = True
+    for T in thread_counts:
+        s = init_packet(make(T))
+        t0 = time.perf_counter()
+        s.step(steps)
+        t = time.perf_counter() - t0
+        s.close()
+        ok = np.array_equal(ref.Ax, s.Ax) and np.array_equal(ref.Ay, s.Ay)
+        ok_all &= ok
+        print(f"  {T} 线程 {t/steps*1e3:.2f} ms/步（加速 {t_ref/max(t, 1e-12):.2f}×）  "
+              f"{'✅ 与单线程逐位一致' if ok else '❌ 结果不一致'}")
+    return ok_all
+
+
+if __name__ == "__main__":
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    thread_counts = [int(a) for a in sys.argv[3:]] or [2, 4, 8]
+    verify(lambda T: LeapfrogGaugeSolver(N, N, 0.1, 0.1, threads=T), steps, thread_counts)
+    verify(lambda T: AbsorbingGaugeSolver(N, N, 0.1*N, 0.1*N, sponge_width=N//8, threads=T),
+           steps, thread_counts)